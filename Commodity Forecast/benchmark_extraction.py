@@ -0,0 +1,151 @@
+"""
+Benchmark: per-pattern regex scans vs the single-pass extraction engine
+Runs both over the `context` fields of the JSON exports and checks they find
+the same prices and dates, and that the price/date pairing picks the same dates
+
+Usage:
+    python benchmark_extraction.py                  # all *.json exports in this folder
+    python benchmark_extraction.py a.json b.json    # specific exports
+"""
+
+import glob
+import json
+import re
+import sys
+import time
+from typing import Dict, List
+
+from iron_ore_scraper import IronOreForecastScraper
+from extraction_engine import pair_prices_with_dates
+
+
+def legacy_extract_prices(scraper: IronOreForecastScraper, text: str) -> List[Dict]:
+    """extract_prices as it was before the extraction engine (one scan per pattern)"""
+    prices = []
+
+    for pattern in scraper.range_patterns:
+        for match in re.finditer(pattern, text, re.IGNORECASE):
+            try:
+                min_price = float(match.group(1))
+                max_price = float(match.group(2))
+                if 20 <= min_price <= 300 and 20 <= max_price <= 300:
+                    prices.append({'type': 'range', 'min': min_price, 'max': max_price,
+                                   'position': match.start()})
+            except (ValueError, IndexError):
+                continue
+
+    for pattern in scraper.price_patterns:
+        for match in re.finditer(pattern, text, re.IGNORECASE):
+            try:
+                price = float(match.group(1))
+                if 20 <= price <= 300:
+                    prices.append({'type': 'single', 'price': price, 'position': match.start()})
+            except (ValueError, IndexError):
+                continue
+
+    return prices
+
+
+def legacy_extract_dates(scraper: IronOreForecastScraper, text: str) -> List[Dict]:
+    """extract_dates as it was before the extraction engine (one scan per pattern)"""
+    dates = []
+
+    for pattern in scraper.date_patterns:
+        for match in re.finditer(pattern, text, re.IGNORECASE):
+            try:
+                date_info = {'text': match.group(0), 'position': match.start()}
+
+                if 'Q' in match.group(0).upper():
+                    date_info['parsed'] = f"{match.group(1)} {match.group(2)}"
+                elif 'H' in match.group(0).upper():
+                    date_info['parsed'] = f"{match.group(1)} {match.group(2)}"
+                elif len(match.groups()) == 2 and match.group(1).isalpha():
+                    date_info['parsed'] = f"{match.group(1)} {match.group(2)}"
+                else:
+                    date_info['parsed'] = match.group(1) if len(match.groups()) == 1 else match.group(2)
+
+                dates.append(date_info)
+            except (ValueError, IndexError):
+                continue
+
+    return dates
+
+
+def legacy_closest_dates(prices: List, dates: List) -> List:
+    """Closest date per price as analyze_document used to find it (loop over all dates)"""
+    closest = []
+    for price_info in prices:
+        closest_date = None
+        min_distance = float('inf')
+        for date_info in dates:
+            distance = abs(price_info.position - date_info.position)
+            if distance < min_distance and distance < 500:
+                min_distance = distance
+                closest_date = date_info
+        closest.append(closest_date)
+    return closest
+
+
+def load_contexts(files: List[str]) -> List[str]:
+    """context fields of all forecasts in the given JSON exports"""
+    contexts = []
+    for path in files:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if isinstance(data, list):
+            contexts.extend(row['context'] for row in data if isinstance(row, dict) and row.get('context'))
+    return contexts
+
+
+def main():
+    files = sys.argv[1:] or sorted(glob.glob('*.json'))
+    texts = load_contexts(files)
+    if not texts:
+        print("No forecast exports with context fields found")
+        return
+
+    # Short contexts and the same text as one long article-sized document
+    texts.append(' '.join(texts))
+
+    scraper = IronOreForecastScraper(cache_dir=None)
+    engine = scraper.extraction_engine  # Compile outside the timing
+
+    print(f"\nTexts: {len(texts)} ({sum(len(t) for t in texts) / 1e6:.1f} M characters) from {len(files)} files")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    legacy = [(legacy_extract_prices(scraper, t), legacy_extract_dates(scraper, t)) for t in texts]
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scanned = [engine.scan(t) for t in texts]
+    engine_time = time.perf_counter() - start
+
+    current = [([p.to_dict() for p in prices], [d.to_dict() for d in dates]) for prices, dates in scanned]
+    mismatches = sum(1 for a, b in zip(legacy, current) if a != b)
+
+    start = time.perf_counter()
+    legacy_pairs = [legacy_closest_dates(prices, dates) for prices, dates in scanned]
+    legacy_pair_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pairs = [[date for _, date in pair_prices_with_dates(prices, dates)] for prices, dates in scanned]
+    pair_time = time.perf_counter() - start
+
+    pair_mismatches = sum(1 for a, b in zip(legacy_pairs, pairs) if a != b)
+
+    print(f"{'per-pattern scans':20s} {legacy_time:8.3f}s")
+    print(f"{'extraction engine':20s} {engine_time:8.3f}s")
+    print(f"{'date loop':20s} {legacy_pair_time:8.3f}s")
+    print(f"{'date index':20s} {pair_time:8.3f}s")
+    print("=" * 60)
+    print(f"Speedup: {legacy_time / engine_time:.1f}x (scan), {legacy_pair_time / pair_time:.1f}x (date pairing)")
+    print(f"Texts with identical prices and dates: {len(texts) - mismatches}/{len(texts)}")
+    print(f"Texts with identical price/date pairs: {len(texts) - pair_mismatches}/{len(texts)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark: link extraction on listing pages
+Extracts the article links of a synthetic mining.com category page with the
+previous approach (BeautifulSoup find_all, urljoin per href, exclude/include
+lists scanned per URL) and with link_extractor.LinkRules, checks that both
+return the same URLs and reports the time per link
+
+Usage:
+    python benchmark_links.py            # page with 3,000 links
+    python benchmark_links.py 20000      # bigger page
+"""
+
+import sys
+import time
+from typing import List
+
+from bs4 import BeautifulSoup
+from urllib.parse import urljoin
+
+from comprehensive_mining_com import ARTICLE_LINKS
+from link_extractor import anchor_hrefs
+from url_canonical import dedupe_urls
+
+
+BASE_URL = 'https://www.mining.com/commodity/iron-ore/page/2/'
+
+# Rules of comprehensive_mining_com as they were written before LinkRules
+EXCLUDE = ['/commodity/', '/category/', '/tag/', '/region/', '/jobs', '/ranking',
+           '/advertise', '/contact', '/press-release', '/markets/', '/about', '/privacy',
+           '/terms', '/wp-content', '/wp-admin']
+
+
+def synthetic_page(count: int) -> bytes:
+    """Listing page with count links: articles, navigation, tags and external links"""
+    links = []
+    for i in range(count):
+        kind = i % 6
+        if kind == 0:
+            href = f"/web/iron-ore-price-outlook-{i}/"
+        elif kind == 1:
+            href = f"https://www.mining.com/china-steel-demand-{i}/?utm_source=rss"
+        elif kind == 2:
+            href = f"/tag/iron-ore-{i}/"
+        elif kind == 3:
+            href = f"../page/{i}/"
+        elif kind == 4:
+            href = f"https://twitter.com/share?url=https://www.mining.com/story-{i}/"
+        else:
+            href = f"#comments-{i}"
+        links.append(f'<div class="post"><h2><a class="title" href="{href}">Story {i}</a></h2>'
+                     f'<p>Teaser text for story {i} with <b>some</b> markup.</p></div>')
+    return ('<html><head><title>Iron ore</title></head><body><main>'
+            + '\n'.join(links) + '</main></body></html>').encode('utf-8')
+
+
+def legacy_extract(content: bytes, base_url: str) -> List[str]:
+    """The previous extract_article_urls"""
+    soup = BeautifulSoup(content, 'html.parser')
+    urls = []
+    for link in soup.find_all('a', href=True):
+        url = urljoin(base_url, link['href'])
+        if 'mining.com' in url:
+            if not any(pattern in url for pattern in EXCLUDE):
+                if '-' in url or '/web/' in url:
+                    urls.append(url)
+    return dedupe_urls(urls)
+
+
+def timed(function, *args, repeat: int = 3):
+    """Best time of a few runs, and the result"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    page = synthetic_page(count)
+    links = len(anchor_hrefs(page))
+
+    print(f"\nLink extraction, page of {len(page) / 1024:.0f} KB with {links:,} links")
+    print("=" * 72)
+
+    legacy_time, legacy_urls = timed(legacy_extract, page, BASE_URL)
+    new_time, new_urls = timed(ARTICLE_LINKS.extract, page, BASE_URL)
+
+    for name, elapsed in [('BeautifulSoup + urljoin', legacy_time), ('LinkRules', new_time)]:
+        print(f"{name:28s} {elapsed * 1000:8.1f} ms/page {elapsed / links * 1e6:7.2f} us/link")
+
+    print("=" * 72)
+    print(f"Speedup: {legacy_time / new_time:.1f}x, article URLs: {len(new_urls)}, "
+          f"same result: {legacy_urls == new_urls}")
+
+
+if __name__ == "__main__":
+    main()
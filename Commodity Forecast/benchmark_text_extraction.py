@@ -0,0 +1,97 @@
+"""
+Benchmark: html.parser (BeautifulSoup) vs lxml document backend
+Runs both backends over stored pages and checks they extract the same text
+
+Usage:
+    python benchmark_text_extraction.py                # pages from .http_cache/
+    python benchmark_text_extraction.py pages_dir/     # *.htm(l) files in a folder
+"""
+
+import glob
+import json
+import os
+import sys
+import time
+from typing import List, Tuple
+
+from document_backends import parse_document, BACKENDS
+from http_cache import DEFAULT_CACHE_DIR
+
+
+def load_cached_pages(cache_dir: str) -> List[Tuple[str, bytes]]:
+    """Load all HTML pages stored in the response cache"""
+    pages = []
+    for entry_file in glob.glob(os.path.join(cache_dir, 'entries', '*', '*.json')):
+        with open(entry_file, 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+
+        content_type = {k.lower(): v for k, v in entry['headers'].items()}.get('content-type', '')
+        if 'html' not in content_type:
+            continue
+
+        body_file = os.path.join(cache_dir, 'bodies', entry['body_hash'][:2], entry['body_hash'])
+        if os.path.exists(body_file):
+            with open(body_file, 'rb') as f:
+                pages.append((entry['url'], f.read()))
+    return pages
+
+
+def load_html_files(folder: str) -> List[Tuple[str, bytes]]:
+    """Load *.html / *.htm files from a folder"""
+    pages = []
+    for path in sorted(glob.glob(os.path.join(folder, '*.htm*'))):
+        with open(path, 'rb') as f:
+            pages.append((path, f.read()))
+    return pages
+
+
+def run_backend(pages: List[Tuple[str, bytes]], backend: str):
+    """Parse every page and extract main text and date, returns (seconds, results)"""
+    results = []
+    start = time.perf_counter()
+    for _, content in pages:
+        document = parse_document(content, backend)
+        results.append((document.main_text(), document.date_text()))
+    return time.perf_counter() - start, results
+
+
+def main():
+    source = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CACHE_DIR
+
+    if os.path.isdir(os.path.join(source, 'entries')):
+        pages = load_cached_pages(source)
+    else:
+        pages = load_html_files(source)
+
+    if not pages:
+        print(f"No pages found in '{source}'")
+        print("Run a scrape first (pages are cached in .http_cache/) or pass a folder of .html files")
+        return
+
+    total_mb = sum(len(content) for _, content in pages) / 1e6
+    print(f"\nPages: {len(pages)} ({total_mb:.1f} MB)")
+    print("=" * 60)
+
+    timings = {}
+    outputs = {}
+    for backend in BACKENDS:
+        seconds, results = run_backend(pages, backend)
+        timings[backend] = seconds
+        outputs[backend] = results
+        print(f"{backend:12s} {seconds:8.2f}s total  {seconds / len(pages) * 1000:8.2f} ms/page")
+
+    reference, candidate = outputs['html.parser'], outputs['lxml']
+    mismatches = [url for (url, _), a, b in zip(pages, reference, candidate) if a != b]
+
+    print("=" * 60)
+    print(f"Speedup lxml vs html.parser: {timings['html.parser'] / timings['lxml']:.1f}x")
+    print(f"Pages with identical text and date: {len(pages) - len(mismatches)}/{len(pages)}")
+
+    if mismatches:
+        print("\nPages that differ (first 10):")
+        for url in mismatches[:10]:
+            print(f"  - {url}")
+
+
+if __name__ == "__main__":
+    main()
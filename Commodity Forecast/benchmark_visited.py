@@ -0,0 +1,70 @@
+"""
+Benchmark: memory of the visited-URL sets
+Adds the same synthetic article URLs to a plain set of strings, a UrlSet
+and a BloomUrlSet, and reports the memory per million URLs, the time per URL
+and the false positive rate of the Bloom filter on URLs never added. Memory
+grows linearly, so it is measured on fewer URLs and scaled to a million.
+
+Usage:
+    python benchmark_visited.py             # 200,000 URLs
+    python benchmark_visited.py 1000000     # a real million (takes minutes)
+"""
+
+import sys
+import time
+import tracemalloc
+from typing import Iterator
+
+from url_canonical import BloomUrlSet, UrlSet, DEFAULT_ERROR_RATE
+
+
+def synthetic_urls(count: int, offset: int = 0) -> Iterator[str]:
+    """Article-like URLs, e.g. https://www.mining.com/web/iron-ore-price-outlook-123456/"""
+    sites = ['www.mining.com', 'capital.com', 'www.steelorbis.com', 'gmk.center']
+    slugs = ['iron-ore-price-outlook', 'china-steel-demand-weakens', 'vale-output-forecast',
+             'bhp-quarterly-production-report', 'iron-ore-futures-rally']
+    for i in range(offset, offset + count):
+        yield f"https://{sites[i % 4]}/web/{slugs[i % 5]}-{i}/?utm_source=rss"
+
+
+def measure(name: str, factory, count: int):
+    """Memory (tracemalloc) of adding count URLs, and the time without tracing"""
+    timed = min(count, 50_000)
+    container = factory()
+    start = time.perf_counter()
+    for url in synthetic_urls(timed):
+        container.add(url)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    container = factory()
+    for url in synthetic_urls(count):
+        container.add(url)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    per_million = memory * 1_000_000 / count
+    print(f"{name:28s} {per_million / 2**20:9.1f} MB/M URLs {memory / count:7.1f} B/URL "
+          f"{elapsed / timed * 1e6:6.1f} us/URL")
+    return container
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+    print(f"\nVisited-URL sets, {count:,} URLs")
+    print("=" * 72)
+
+    measure("set (URL strings)", set, count)
+    measure("UrlSet", UrlSet, count)
+    bloom = measure(f"BloomUrlSet (p={DEFAULT_ERROR_RATE:g})", lambda: BloomUrlSet(count), count)
+
+    misses = [url in bloom for url in synthetic_urls(count, offset=count)]
+    found = all(url in bloom for url in synthetic_urls(min(count, 100_000)))
+    print("=" * 72)
+    print(f"Bloom filter: {bloom.nbytes() / 2**20:.1f} MB of bits, false positives "
+          f"{sum(misses) / len(misses):.2e} on {len(misses):,} new URLs, added URLs all found: {found}")
+
+
+if __name__ == "__main__":
+    main()
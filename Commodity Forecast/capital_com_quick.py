@@ -3,10 +3,12 @@ Quick Capital.com scraper - targets forecast sections directly
 Based on debug output findings
 """
 
-import requests
+from http_client import create_session
+from url_canonical import UrlSet
+from page_probe import probe_page
+from crawl_budget import budget_from_args
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
-import time
 from datetime import datetime
 from iron_ore_scraper import IronOreForecastScraper
 
@@ -33,10 +35,9 @@ def scrape_capital_com_quick():
         "https://capital.com/analysis/commodities",
     ]
 
-    all_urls = set(known_articles)
+    all_urls = UrlSet(known_articles)  # The regional mirrors collapse to one URL
 
-    session = requests.Session()
-    session.headers.update({
+    session = create_session({
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
     })
 
@@ -63,7 +64,6 @@ def scrape_capital_com_quick():
                         all_urls.add(full_url)
 
             print(f"  Found {len(all_urls)} total URLs so far")
-            time.sleep(1)
 
         except Exception as e:
             print(f"  Error: {e}")
@@ -79,12 +79,8 @@ def scrape_capital_com_quick():
         print(f"[{i}/{len(all_urls)}] {url[:70]}... ", end='', flush=True)
 
         try:
-            response = session.get(url, timeout=30)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            # Check for iron ore
-            text = soup.get_text().lower()
+            # Check for iron ore in the title, description and opening text only
+            text = probe_page(session, url).summary.lower()
 
             # Must have "iron ore" (not just "ore" or "iron")
             if 'iron ore' in text or 'iron-ore' in text:
@@ -93,8 +89,6 @@ def scrape_capital_com_quick():
             else:
                 print("✗ not iron ore")
 
-            time.sleep(0.5)
-
         except Exception as e:
             print(f"error: {e}")
 
@@ -144,4 +138,5 @@ def scrape_capital_com_quick():
 
 
 if __name__ == "__main__":
-    scrape_capital_com_quick()
+    with budget_from_args():
+        scrape_capital_com_quick()
@@ -3,37 +3,32 @@ Capital.com Iron Ore Forecast Scraper
 Same approach as mining.com, adapted for capital.com structure
 """
 
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin
-import time
+from http_client import create_session
+from link_extractor import LinkRules
+from crawl_budget import budget_allows, budget_from_args, finish_domain
+from keyword_matcher import get_matcher
 from datetime import datetime
 
 
-def extract_article_urls(soup, base_url):
-    """Extract article URLs from a capital.com page"""
-    urls = []
+# Links kept by extract_article_urls
+ARTICLE_LINKS = LinkRules(
+    'capital.com',
+    # Include analysis articles, market guides, news
+    include=[
+        '/analysis/', '/market-guides/', '/news/'
+    ],
+    # Exclude non-article pages
+    exclude=[
+        '/login', '/signup', '/register', '/account', '/contact', '/about', '/privacy',
+        '/terms', '/cookie', '/help', '/faq', '/support', '/trading-platforms', '/pricing',
+        '/pro-account', '/api', '/demo', '/open-account'
+    ],
+)
 
-    for link in soup.find_all('a', href=True):
-        url = urljoin(base_url, link['href'])
 
-        # Filter for capital.com articles
-        if 'capital.com' in url and url not in urls:
-            # Exclude non-article pages
-            exclude_patterns = [
-                '/login', '/signup', '/register', '/account',
-                '/contact', '/about', '/privacy', '/terms',
-                '/cookie', '/help', '/faq', '/support',
-                '/trading-platforms', '/pricing', '/pro-account',
-                '/api', '/demo', '/open-account'
-            ]
-
-            if not any(pattern in url for pattern in exclude_patterns):
-                # Include analysis articles, market guides, news
-                if '/analysis/' in url or '/market-guides/' in url or '/news/' in url:
-                    urls.append(url)
-
-    return urls
+def extract_article_urls(page, base_url):
+    """Extract article URLs from a capital.com page (raw HTML or a parsed soup)"""
+    return ARTICLE_LINKS.extract(page, base_url)
 
 
 def get_urls_from_category(category_url, max_pages=50):
@@ -51,8 +46,7 @@ def get_urls_from_category(category_url, max_pages=50):
 
     all_urls = []
 
-    session = requests.Session()
-    session.headers.update({
+    session = create_session({
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
     })
 
@@ -64,6 +58,9 @@ def get_urls_from_category(category_url, max_pages=50):
             # Try common pagination patterns
             page_url = f"{category_url}?page={page}"
 
+        if not budget_allows(page_url):
+            break
+
         print(f"  Page {page}/{max_pages}: ", end='', flush=True)
 
         try:
@@ -74,10 +71,9 @@ def get_urls_from_category(category_url, max_pages=50):
                 break
 
             response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
 
             # Extract article URLs
-            page_urls = extract_article_urls(soup, category_url)
+            page_urls = extract_article_urls(response.content, category_url)
 
             # Remove duplicates
             new_urls = [u for u in page_urls if u not in all_urls]
@@ -89,8 +85,6 @@ def get_urls_from_category(category_url, max_pages=50):
                 print(f"no new articles found, stopping")
                 break
 
-            time.sleep(1)  # Be polite
-
         except Exception as e:
             print(f"error: {e}")
             break
@@ -111,7 +105,7 @@ def search_capital_com_categories(pages_per_category=50):
     print("#"*80)
     print(f"\nConfiguration:")
     print(f"  - Pages per category: {pages_per_category}")
-    print(f"  - Delay between pages: 1 second")
+    print(f"  - Rate limit: 2 requests/second per host (rate_limiter.py)")
 
     # Capital.com might have regional variants (en-au, en-gb, etc.)
     # We'll search multiple regions for broader coverage
@@ -158,10 +152,9 @@ def search_capital_com_categories(pages_per_category=50):
         elapsed = (datetime.now() - start_time).total_seconds()
         print(f"Running for: {elapsed/60:.1f} minutes | Total URLs so far: {len(list(set(all_urls)))}")
 
-        time.sleep(2)  # Be polite between categories
-
     # Remove duplicates
     all_urls = list(set(all_urls))
+    finish_domain('https://capital.com/')
 
     elapsed = (datetime.now() - start_time).total_seconds()
 
@@ -214,12 +207,8 @@ def filter_iron_ore_urls(all_urls):
         'commodity-forecast', 'commodities-forecast'
     ]
 
-    filtered_urls = []
-
-    for url in all_urls:
-        url_lower = url.lower()
-        if any(keyword in url_lower for keyword in iron_ore_keywords):
-            filtered_urls.append(url)
+    matcher = get_matcher(iron_ore_keywords)
+    filtered_urls = [url for url in all_urls if matcher.contains_any(url)]
 
     print(f"  URLs after filtering: {len(filtered_urls)}")
     print(f"  Filtered out: {len(all_urls) - len(filtered_urls)}")
@@ -380,4 +369,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with budget_from_args():
+        main()
@@ -0,0 +1,88 @@
+"""
+Watermarks for incremental category pagination
+Remembers per category (listing URL) which article URLs were seen in earlier
+runs. Category listings are newest first, so once a page lists only known
+articles, everything after it was collected before and paging can stop.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Set
+
+from url_canonical import canonicalize_url
+
+
+DEFAULT_WATERMARK_FILE = 'category_watermarks.json'
+
+
+class CategoryWatermark:
+    """
+    Known article URLs per category, kept in a JSON file
+
+    A category only stops early once one run has walked it to the end
+    (last page, or the page limit). Until then, a run that was cut off would
+    leave older pages that were never seen behind the stop, so the next run
+    pages through the whole category again.
+    """
+
+    def __init__(self, path: str = DEFAULT_WATERMARK_FILE):
+        self.path = path
+        self.categories: Dict[str, Dict] = {}
+        self.known: Dict[str, Set[str]] = {}
+        self.lock = threading.Lock()
+
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.categories = json.load(f)
+            for category, state in self.categories.items():
+                self.known[category] = set(state.get('urls', []))
+
+    def is_known_page(self, category_url: str, page_urls: Iterable[str]) -> bool:
+        """True if a listing page holds only articles seen before (paging can stop)"""
+        category = canonicalize_url(category_url)
+        state = self.categories.get(category)
+        if not state or not state.get('complete'):
+            return False
+
+        known = self.known[category]
+        urls = [canonicalize_url(url) for url in page_urls]
+        return bool(urls) and all(url in known for url in urls)
+
+    def record(self, category_url: str, urls: Iterable[str], complete: bool):
+        """
+        Add the article URLs found in a category and save
+
+        Args:
+            category_url: The category's first listing page
+            urls: Article URLs found on its listing pages in this run
+            complete: True if this run paged to the end (or to the page limit)
+                      or stopped at a known page
+        """
+        category = canonicalize_url(category_url)
+        with self.lock:
+            known = self.known.setdefault(category, set())
+            known.update(canonicalize_url(url) for url in urls)
+
+            state = self.categories.setdefault(category, {})
+            state['complete'] = state.get('complete', False) or complete
+            state['updated'] = datetime.now().isoformat(timespec='seconds')
+            state['urls'] = sorted(known)
+            self.save()
+
+    def save(self):
+        """Write the file (replaced atomically, a crash leaves the old version)"""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.categories, f, indent=1)
+        os.replace(tmp_path, self.path)
+
+
+def open_watermark(incremental: bool, path: str = DEFAULT_WATERMARK_FILE) -> Optional[CategoryWatermark]:
+    """The watermark file for incremental runs, None for full runs"""
+    if not incremental:
+        return None
+    watermark = CategoryWatermark(path)
+    print(f"Incremental mode: {len(watermark.categories)} categories known from earlier runs ({path})")
+    return watermark
@@ -5,6 +5,7 @@ This combines the URL finder and scraper for a complete solution
 
 from url_finder import IronOreArticleFinder
 from iron_ore_scraper import IronOreForecastScraper
+from crawl_budget import budget_from_args
 import json
 
 
@@ -266,10 +267,11 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
-
-    # Uncomment the workflow you want to use:
-    workflow_example_1()
-    # workflow_example_2()
-    # workflow_example_3()
-    # interactive_workflow()
+    with budget_from_args():
+        main()
+
+        # Uncomment the workflow you want to use:
+        workflow_example_1()
+        # workflow_example_2()
+        # workflow_example_3()
+        # interactive_workflow()
@@ -3,19 +3,40 @@ Comprehensive Mining.com Scraper
 Searches multiple categories and sections for iron ore content
 """
 
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin
-import time
-
-
-def get_urls_from_category(category_url, max_pages=20):
+import os
+
+from http_client import create_session
+from link_extractor import LinkRules
+from crawl_budget import budget_allows, budget_from_args, finish_domain
+from keyword_matcher import get_matcher
+from category_watermark import open_watermark
+
+
+# Links kept by extract_article_urls
+ARTICLE_LINKS = LinkRules(
+    'mining.com',
+    # Articles have hyphens in the slug or live under /web/
+    include=[
+        '-', '/web/'
+    ],
+    # Exclude non-article pages
+    exclude=[
+        '/commodity/', '/category/', '/tag/', '/region/', '/jobs', '/ranking',
+        '/advertise', '/contact', '/press-release', '/markets/', '/about', '/privacy',
+        '/terms', '/wp-content', '/wp-admin'
+    ],
+)
+
+
+def get_urls_from_category(category_url, max_pages=20, watermark=None):
     """
     Get all article URLs from a specific category with pagination
 
     Args:
         category_url: The category page URL (e.g., https://www.mining.com/commodity/iron-ore/)
         max_pages: Maximum number of pages to check (default 20)
+        watermark: Optional CategoryWatermark; paging stops at the first page
+                   that lists only articles found in earlier runs
     """
     print(f"\n{'='*80}")
     print(f"Extracting URLs from: {category_url}")
@@ -23,8 +44,7 @@ def get_urls_from_category(category_url, max_pages=20):
 
     all_urls = []
 
-    session = requests.Session()
-    session.headers.update({
+    session = create_session({
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
     })
 
@@ -33,9 +53,8 @@ def get_urls_from_category(category_url, max_pages=20):
     try:
         response = session.get(category_url, timeout=30)
         response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
 
-        page_urls = extract_article_urls(soup, category_url)
+        page_urls = extract_article_urls(response.content, category_url)
         all_urls.extend(page_urls)
         print(f"  Found {len(page_urls)} URLs")
 
@@ -43,9 +62,19 @@ def get_urls_from_category(category_url, max_pages=20):
         print(f"  Error: {e}")
         return all_urls
 
+    if watermark is not None and watermark.is_known_page(category_url, page_urls):
+        print(f"  Only articles from earlier runs, stopping")
+        watermark.record(category_url, all_urls, complete=True)
+        return all_urls
+
+    complete = True
+
     # Pagination
     for page in range(2, max_pages + 1):
         page_url = f"{category_url}page/{page}/"
+        if not budget_allows(page_url):
+            complete = False
+            break
         print(f"\nPage {page}: {page_url}")
 
         try:
@@ -56,9 +85,8 @@ def get_urls_from_category(category_url, max_pages=20):
                 break
 
             response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
 
-            page_urls = extract_article_urls(soup, category_url)
+            page_urls = extract_article_urls(response.content, category_url)
 
             if len(page_urls) == 0:
                 print(f"  No more articles, stopping")
@@ -67,47 +95,36 @@ def get_urls_from_category(category_url, max_pages=20):
             all_urls.extend(page_urls)
             print(f"  Found {len(page_urls)} URLs")
 
-            time.sleep(1)  # Be polite
+            if watermark is not None and watermark.is_known_page(category_url, page_urls):
+                print(f"  Only articles from earlier runs, stopping")
+                break
 
         except Exception as e:
             print(f"  Error: {e}")
+            complete = False
             break
 
     # Remove duplicates
     all_urls = list(set(all_urls))
+    if watermark is not None:
+        watermark.record(category_url, all_urls, complete)
     print(f"\n→ Total unique URLs from this category: {len(all_urls)}")
 
     return all_urls
 
 
-def extract_article_urls(soup, base_url):
-    """Extract article URLs from a page"""
-    urls = []
-
-    for link in soup.find_all('a', href=True):
-        url = urljoin(base_url, link['href'])
-
-        # Filter for actual articles
-        if 'mining.com' in url and url not in urls:
-            # Exclude non-article pages
-            exclude_patterns = [
-                '/commodity/', '/category/', '/tag/', '/region/',
-                '/jobs', '/ranking', '/advertise', '/contact',
-                '/press-release', '/markets/', '/about',
-                '/privacy', '/terms', '/wp-content', '/wp-admin'
-            ]
+def extract_article_urls(page, base_url):
+    """Extract article URLs from a page (raw HTML or a parsed soup)"""
+    return ARTICLE_LINKS.extract(page, base_url)
 
-            if not any(pattern in url for pattern in exclude_patterns):
-                # Check if it looks like an article (has hyphens or /web/)
-                if '-' in url or '/web/' in url:
-                    urls.append(url)
 
-    return urls
-
-
-def search_multiple_categories():
+def search_multiple_categories(incremental=False):
     """
     Search multiple categories on mining.com for iron ore content
+
+    With incremental=True, each category is only paged until the first page
+    with nothing new (see category_watermark.py), and the URLs found are
+    added to the existing URL file instead of replacing it.
     """
     print("\n" + "#"*80)
     print("# COMPREHENSIVE MINING.COM SCRAPER")
@@ -115,6 +132,7 @@ def search_multiple_categories():
     print("\nSearching multiple categories for iron ore articles...")
 
     all_urls = []
+    watermark = open_watermark(incremental)
 
     # Strategy: Search all relevant categories
     categories = {
@@ -131,7 +149,7 @@ def search_multiple_categories():
         print(f"Category: {name}")
         print(f"{'='*80}")
 
-        urls = get_urls_from_category(url, max_pages=10)
+        urls = get_urls_from_category(url, max_pages=10, watermark=watermark)
 
         if urls:
             all_urls.extend(urls)
@@ -139,10 +157,9 @@ def search_multiple_categories():
         else:
             print(f"✗ No URLs found in {name}")
 
-        time.sleep(2)  # Be polite between categories
-
     # Remove duplicates across all categories
     all_urls = list(set(all_urls))
+    finish_domain('https://www.mining.com/')
 
     print(f"\n{'='*80}")
     print(f"SUMMARY")
@@ -151,6 +168,13 @@ def search_multiple_categories():
 
     # Save to file
     filename = 'mining_com_comprehensive_urls.txt'
+    if watermark is not None and os.path.exists(filename):
+        with open(filename, 'r', encoding='utf-8') as f:
+            previous = [line.strip() for line in f if line.strip()]
+        new_count = len(set(all_urls) - set(previous))
+        all_urls = list(dict.fromkeys(previous + all_urls))
+        print(f"New since the last run: {new_count}")
+
     with open(filename, 'w', encoding='utf-8') as f:
         for url in all_urls:
             f.write(url + '\n')
@@ -179,8 +203,7 @@ def search_by_year(start_year=2013, end_year=2025):
 
     all_urls = []
 
-    session = requests.Session()
-    session.headers.update({
+    session = create_session({
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
     })
 
@@ -199,8 +222,7 @@ def search_by_year(start_year=2013, end_year=2025):
                 response = session.get(url, timeout=30)
 
                 if response.status_code == 200:
-                    soup = BeautifulSoup(response.content, 'html.parser')
-                    urls = extract_article_urls(soup, url)
+                    urls = extract_article_urls(response.content, url)
 
                     if urls:
                         print(f"    ✓ Found {len(urls)} URLs")
@@ -213,8 +235,6 @@ def search_by_year(start_year=2013, end_year=2025):
             except Exception as e:
                 print(f"    Error: {e}")
 
-        time.sleep(1)
-
     all_urls = list(set(all_urls))
     print(f"\nTotal URLs found by year: {len(all_urls)}")
 
@@ -237,12 +257,8 @@ def filter_iron_ore_urls(all_urls):
         'platts', 'cfr-china'
     ]
 
-    filtered_urls = []
-
-    for url in all_urls:
-        url_lower = url.lower()
-        if any(keyword in url_lower for keyword in iron_ore_keywords):
-            filtered_urls.append(url)
+    matcher = get_matcher(iron_ore_keywords)
+    filtered_urls = [url for url in all_urls if matcher.contains_any(url)]
 
     print(f"URLs before filtering: {len(all_urls)}")
     print(f"URLs after filtering: {len(filtered_urls)}")
@@ -332,8 +348,12 @@ def main():
 
     all_urls = []
 
+    incremental = False
+    if choice in ("1", "3"):
+        incremental = input("Incremental (stop at pages already seen in earlier runs)? (y/n): ").strip().lower() == 'y'
+
     if choice == "1":
-        all_urls = search_multiple_categories()
+        all_urls = search_multiple_categories(incremental)
 
     elif choice == "2":
         all_urls = search_by_year(2013, 2025)
@@ -347,7 +367,7 @@ def main():
 
     elif choice == "3":
         print("\n→ Step 1: Searching categories...")
-        urls1 = search_multiple_categories()
+        urls1 = search_multiple_categories(incremental)
 
         print("\n→ Step 2: Searching by year...")
         urls2 = search_by_year(2013, 2025)
@@ -382,4 +402,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with budget_from_args():
+        main()
@@ -0,0 +1,217 @@
+"""
+Offline batch extraction over stored documents
+Re-runs forecast extraction over pages we already have (the response cache,
+saved HTML or plain text) or over short texts such as Reddit posts, without
+fetching anything, spread over a process pool in chunks. Use it to reprocess
+the whole corpus after changing a pattern.
+
+Usage:
+    python corpus_extraction.py                               # pages in .http_cache/
+    python corpus_extraction.py pages_dir/ forecasts.jsonl    # *.htm(l) / *.txt files
+"""
+
+import glob
+import os
+import re
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+from document_backends import TextDocument
+from extraction_engine import PriceMatch, DateMatch
+from forecast_sinks import ForecastSink
+from http_cache import DEFAULT_CACHE_DIR, ResponseCache
+from iron_ore_scraper import IronOreForecastScraper, ForecastData
+
+
+# (url, html or text, metadata). Metadata keys, all optional:
+#   source_name  Name stored with the forecasts (default: the URL's host)
+#   date         Publication date, used when the document has none of its own
+#   format       'html' or 'text' (default: detected from the content)
+CorpusDocument = Tuple[str, Union[bytes, str], Optional[Dict]]
+
+_html_tag = re.compile(r'<\s*(?:!doctype|html|head|body|article|main|div|p|meta|title)\b', re.IGNORECASE)
+
+# Scraper instance of each worker process
+_worker_scraper: Optional[IronOreForecastScraper] = None
+
+
+def _init_worker(config: Dict):
+    global _worker_scraper
+    _worker_scraper = IronOreForecastScraper.from_extraction_config(config)
+
+
+def is_html(content: Union[bytes, str]) -> bool:
+    """Guess whether stored content is HTML (looks for a tag in the first 2 KB)"""
+    head = content[:2048]
+    if isinstance(head, bytes):
+        head = head.decode('utf-8', errors='replace')
+    return bool(_html_tag.search(head))
+
+
+def extract_document(scraper: IronOreForecastScraper, url: str, content: Union[bytes, str],
+                     metadata: Optional[Dict] = None) -> List[ForecastData]:
+    """Forecasts of one stored document"""
+    metadata = metadata or {}
+    source_name = metadata.get('source_name') or urlparse(url).netloc or url
+    date = metadata.get('date')
+    doc_format = metadata.get('format') or ('html' if is_html(content) else 'text')
+
+    if doc_format == 'text':
+        if isinstance(content, bytes):
+            content = content.decode('utf-8', errors='replace')
+        return scraper.analyze_document(url, TextDocument(content, date), source_name)
+
+    forecasts = scraper.analyze_document(url, scraper.parse_document(content), source_name)
+    if date:
+        for forecast in forecasts:
+            if forecast.forecast_date is None:
+                forecast.forecast_date = scraper.parse_date_string(date)
+    return forecasts
+
+
+def _extract_chunk(chunk: List[CorpusDocument]) -> List[ForecastData]:
+    """Forecasts of a chunk of documents, in document order (runs in a worker process)"""
+    forecasts = []
+    for document in chunk:
+        url, content = document[0], document[1]
+        metadata = document[2] if len(document) > 2 else None
+        try:
+            forecasts.extend(extract_document(_worker_scraper, url, content, metadata))
+        except Exception as e:
+            print(f"Error extracting {url}: {e}")
+    return forecasts
+
+
+def _scan_chunk(chunk: List[str]) -> List[Tuple[List[PriceMatch], List[DateMatch]]]:
+    """Prices and dates of a chunk of texts (runs in a worker process)"""
+    return [_worker_scraper.scan_text(text) for text in chunk]
+
+
+def _chunks(items: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _map_chunks(func: Callable[[List], List], items: Iterable, scraper: Optional[IronOreForecastScraper],
+                workers: Optional[int], chunk_size: int, max_pending: Optional[int]) -> Iterator:
+    """
+    Run func over chunks of items on a process pool, yielding its results in input order
+
+    Input that fits in one chunk (or workers=1) is processed in this
+    process, starting a pool would take longer than the work.
+    """
+    config = (scraper or IronOreForecastScraper(cache_dir=None)).extraction_config()
+    workers = workers or os.cpu_count() or 1
+    chunks = _chunks(items, chunk_size)
+
+    first = next(chunks, None)
+    second = next(chunks, None) if workers > 1 and first is not None else None
+    if second is None:
+        _init_worker(config)
+        for chunk in chain([first] if first is not None else [], chunks):
+            yield from func(chunk)
+        return
+
+    max_pending = max_pending or 2 * workers
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(config,))
+    pending = deque()
+    try:
+        for chunk in chain((first, second), chunks):
+            pending.append(pool.submit(func, chunk))
+            if len(pending) >= max_pending:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        # Stopped early: drop the chunks no worker has started yet
+        for future in pending:
+            future.cancel()
+        pool.shutdown()
+
+
+def extract_corpus(documents: Iterable[CorpusDocument], scraper: Optional[IronOreForecastScraper] = None,
+                   workers: Optional[int] = None, chunk_size: int = 64,
+                   max_pending: Optional[int] = None) -> Iterator[ForecastData]:
+    """
+    Extract forecasts from stored documents, yielded lazily in document order
+
+    Documents are read from the iterable only as fast as the workers keep
+    up, so a generator over a large corpus is never loaded into memory.
+
+    Args:
+        documents: (url, html_or_text, metadata) tuples, metadata may be None
+        scraper: Its patterns, keywords and document backend are used
+                 (default: a new IronOreForecastScraper)
+        workers: Number of worker processes (default: all cores, 1 runs in this process)
+        chunk_size: Documents sent to a worker at once
+        max_pending: Chunks queued or in progress at most (default: 2 per worker)
+    """
+    return _map_chunks(_extract_chunk, documents, scraper, workers, chunk_size, max_pending)
+
+
+def scan_texts(texts: Iterable[str], scraper: Optional[IronOreForecastScraper] = None,
+               workers: Optional[int] = None, chunk_size: int = 256,
+               max_pending: Optional[int] = None) -> Iterator[Tuple[List[PriceMatch], List[DateMatch]]]:
+    """
+    Prices and dates of many short texts (e.g. Reddit posts), in input order
+
+    Same extraction engine and patterns as scraper.scan_text, on a process
+    pool. Arguments as for extract_corpus.
+    """
+    return _map_chunks(_scan_chunk, texts, scraper, workers, chunk_size, max_pending)
+
+
+def cached_pages(cache_dir: str = DEFAULT_CACHE_DIR) -> Iterator[CorpusDocument]:
+    """HTML pages stored in the response cache (successful responses only)"""
+    cache = ResponseCache(cache_dir)
+    for entry in cache.iter_entries():
+        content_type = {k.lower(): v for k, v in entry['headers'].items()}.get('content-type', '')
+        if entry['status_code'] != 200 or 'html' not in content_type:
+            continue
+        yield entry['url'], cache.read_body(entry), {'format': 'html'}
+
+
+def stored_files(folder: str) -> Iterator[CorpusDocument]:
+    """*.htm(l) and *.txt files in a folder (the file path is used as URL)"""
+    paths = sorted(glob.glob(os.path.join(folder, '*.htm*')) + glob.glob(os.path.join(folder, '*.txt')))
+    for path in paths:
+        with open(path, 'rb') as f:
+            content = f.read()
+        yield path, content, {'format': 'text' if path.endswith('.txt') else 'html',
+                              'source_name': os.path.basename(folder.rstrip('/\\')) or folder}
+
+
+def main():
+    source = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CACHE_DIR
+    output = sys.argv[2] if len(sys.argv) > 2 else 'corpus_forecasts.jsonl'
+
+    if os.path.isdir(os.path.join(source, 'entries')):
+        documents = cached_pages(source)
+    elif os.path.isdir(source):
+        documents = stored_files(source)
+    else:
+        print(f"No response cache or folder at '{source}'")
+        return
+
+    # The lxml backend extracts the same text several times faster
+    scraper = IronOreForecastScraper(cache_dir=None, document_backend='lxml')
+
+    print(f"\nExtracting forecasts from {source} -> {output}")
+    start = time.perf_counter()
+    with ForecastSink(output) as sink:
+        for forecast in extract_corpus(documents, scraper=scraper):
+            sink.write([forecast])
+    print(f"Done in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,358 @@
+"""
+Crawl budgets per domain and per run
+Bounds the pages fetched, bytes downloaded and wall time of a crawl, for
+each domain and for the whole run, so scheduled runs have a predictable
+duration and cost. Budget a domain leaves unused goes to a shared pool that
+domains with a good yield of relevant articles can draw from.
+
+Once a budget is installed with set_crawl_budget(), every session from
+http_client.create_session enforces it: a request beyond the budget raises
+BudgetExhausted (a requests exception) before anything is sent. The page
+limits of the collectors (max_pages, max_crawl, ...) still apply on top.
+
+The collector and scraper scripts take the limits on the command line:
+    python steelorbis_scraper.py --max-seconds 600 --domain-pages 200
+    python url_finder.py --max-bytes 500M --min-yield 0.05
+"""
+
+import argparse
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, NamedTuple, Optional
+from urllib.parse import urlparse
+
+import requests
+
+
+# Share of a domain's own limit granted from the pool at a time
+POOL_GRANT = 0.25
+
+_KEYS = ('pages', 'bytes', 'seconds')
+
+
+class BudgetLimits(NamedTuple):
+    """Limits of a domain or of a whole run, None means unlimited"""
+    pages: Optional[int] = None
+    bytes: Optional[int] = None
+    seconds: Optional[float] = None
+
+
+class BudgetExhausted(requests.RequestException):
+    """A request was refused because the budget of its domain or of the run is used up"""
+
+
+class DomainUsage:
+    """What one domain has used, and what it may use (pool grants included)"""
+
+    def __init__(self, limits: BudgetLimits):
+        self.limits = limits
+        self.allowance: Dict[str, Optional[float]] = limits._asdict()
+        self.pages = 0
+        self.bytes = 0
+        self.articles = 0
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.stopped: Optional[str] = None  # Why requests are refused, None while allowed
+
+    def used(self, now: float) -> Dict[str, float]:
+        seconds = (self.finished or now) - self.started if self.started is not None else 0.0
+        return {'pages': self.pages, 'bytes': self.bytes, 'seconds': seconds}
+
+    @property
+    def yield_rate(self) -> float:
+        """Relevant articles per page fetched"""
+        return self.articles / self.pages if self.pages else 0.0
+
+
+class CrawlBudget:
+    """
+    Pages, bytes and wall time per domain and per run
+
+    A domain's wall time runs from its first request until finish() is
+    called for it or it is refused, the run's from the creation of the budget. When a domain
+    is finished or refused, whatever it has left goes to the pool. A domain
+    at its limit gets a further POOL_GRANT of its limit from the pool if it
+    has found articles and its yield is at least the run average; the
+    domains with the best yield keep crawling while the others stop.
+    Yield only counts if it is reported (record_articles / record_yield).
+    """
+
+    def __init__(self, run: BudgetLimits = BudgetLimits(),
+                 per_domain: BudgetLimits = BudgetLimits(),
+                 domains: Optional[Dict[str, BudgetLimits]] = None,
+                 min_yield: Optional[float] = None, min_pages: int = 20):
+        """
+        Args:
+            run: Limits of the whole run
+            per_domain: Limits of every domain without an entry in domains
+            domains: Limits of specific domains (subdomains included, e.g. 'mining.com')
+            min_yield: Stop a domain whose articles per page stay below this...
+            min_pages: ...after this many pages
+        """
+        self.run = run
+        self.per_domain = per_domain
+        self.domain_limits = {domain.lower(): limits for domain, limits in (domains or {}).items()}
+        self.min_yield = min_yield
+        self.min_pages = min_pages
+        self.usage: Dict[str, DomainUsage] = {}
+        self.pool: Dict[str, float] = {key: 0 for key in _KEYS}
+        self.started = time.monotonic()
+        self.lock = threading.Lock()
+
+    def domain_of(self, url: str) -> str:
+        """Budget key of a URL: a configured domain it belongs to, else its host without www."""
+        host = (urlparse(url).hostname or '').lower()
+        matches = [d for d in self.domain_limits if host == d or host.endswith('.' + d)]
+        if matches:
+            return max(matches, key=len)
+        return host[4:] if host.startswith('www.') else host
+
+    def _usage(self, domain: str) -> DomainUsage:
+        usage = self.usage.get(domain)
+        if usage is None:
+            usage = self.usage[domain] = DomainUsage(self.domain_limits.get(domain, self.per_domain))
+        return usage
+
+    def average_yield(self) -> float:
+        pages = sum(u.pages for u in self.usage.values())
+        return sum(u.articles for u in self.usage.values()) / pages if pages else 0.0
+
+    def _run_left(self, now: float) -> Optional[str]:
+        """Which run limit is used up, None if there is budget left"""
+        used = {
+            'pages': sum(u.pages for u in self.usage.values()),
+            'bytes': sum(u.bytes for u in self.usage.values()),
+            'seconds': now - self.started,
+        }
+        for key in _KEYS:
+            limit = getattr(self.run, key)
+            if limit is not None and used[key] >= limit:
+                return f"run {key}: {_format(key, used[key])} of {_format(key, limit)}"
+        return None
+
+    def _release(self, usage: DomainUsage, now: float):
+        """Move what a domain has left to the pool"""
+        for key, used in usage.used(now).items():
+            allowed = usage.allowance[key]
+            if allowed is not None and allowed > used:
+                self.pool[key] += allowed - used
+                usage.allowance[key] = used
+
+    def _grant(self, usage: DomainUsage, key: str) -> bool:
+        """Extend a domain's allowance from the pool, if its yield earns it"""
+        if self.pool[key] <= 0 or not usage.articles or usage.yield_rate < self.average_yield():
+            return False
+        amount = min(self.pool[key], getattr(usage.limits, key) * POOL_GRANT)
+        if key != 'seconds':
+            amount = max(1, int(amount))
+        self.pool[key] -= amount
+        usage.allowance[key] += amount
+        return True
+
+    def _refusal(self, domain: str, now: float) -> Optional[str]:
+        """Why a request to the domain is refused, None if it is allowed"""
+        reason = self._run_left(now)
+        if reason:
+            return reason
+
+        usage = self._usage(domain)
+        if usage.finished is not None:
+            # Crawled again after finish(): only what the pool grants
+            usage.started = now - (usage.finished - usage.started)
+            usage.finished = None
+
+        if (self.min_yield is not None and usage.pages >= self.min_pages
+                and usage.yield_rate < self.min_yield):
+            return f"yield {usage.yield_rate:.2f} articles/page after {usage.pages} pages"
+
+        used = usage.used(now)
+        for key in _KEYS:
+            allowed = usage.allowance[key]
+            if allowed is not None and used[key] >= allowed and not self._grant(usage, key):
+                return f"{key}: {_format(key, used[key])} of {_format(key, allowed)}"
+        return None
+
+    def _check(self, url: str) -> Optional[str]:
+        domain = self.domain_of(url)
+        now = time.monotonic()
+        with self.lock:
+            reason = self._refusal(domain, now)
+            usage = self._usage(domain)
+            if reason is None:
+                usage.stopped = None
+                if usage.started is None:
+                    usage.started = now
+                return None
+
+            first = usage.stopped is None
+            usage.stopped = reason
+            if usage.started is not None and usage.finished is None:
+                usage.finished = now  # Its wall time stops while it is refused
+            self._release(usage, now)
+
+        if first:
+            print(f"  Crawl budget for {domain} used up ({reason})")
+        return reason
+
+    def allows(self, url: str) -> bool:
+        """True if a request to the URL is within the budget"""
+        return self._check(url) is None
+
+    def check(self, url: str):
+        """Raise BudgetExhausted if a request to the URL is beyond the budget"""
+        reason = self._check(url)
+        if reason is not None:
+            raise BudgetExhausted(f"Crawl budget for {self.domain_of(url)} used up ({reason})")
+
+    def count_page(self, url: str):
+        """Count a fetched page (from the network or the cache)"""
+        with self.lock:
+            self._usage(self.domain_of(url)).pages += 1
+
+    def count_bytes(self, url: str, response: requests.Response):
+        """Count the body bytes of a network response as they are read"""
+        domain = self.domain_of(url)
+        iter_content = response.iter_content
+
+        # response.content reads through iter_content too
+        def counted(*args, **kwargs):
+            for chunk in iter_content(*args, **kwargs):
+                self.add_bytes(domain, len(chunk))
+                yield chunk
+
+        response.iter_content = counted
+
+    def add_bytes(self, domain: str, count: int):
+        with self.lock:
+            self._usage(domain).bytes += count
+
+    def record_articles(self, url: str, count: int = 1):
+        """Count relevant articles (or pages with forecasts) found on the URL's domain"""
+        with self.lock:
+            self._usage(self.domain_of(url)).articles += count
+
+    def finish(self, url_or_domain: str):
+        """Done with a domain for now: its wall time stops and its leftover goes to the pool"""
+        domain = self.domain_of(url_or_domain) if '://' in url_or_domain else url_or_domain.lower()
+        now = time.monotonic()
+        with self.lock:
+            usage = self.usage.get(domain)
+            if usage is None or usage.started is None:
+                return
+            if usage.finished is None:
+                usage.finished = now
+            self._release(usage, now)
+
+    def print_summary(self):
+        now = time.monotonic()
+        print(f"\nCrawl budget ({_format('seconds', now - self.started)} run time)")
+        print(f"{'domain':30s} {'pages':>6s} {'MB':>8s} {'seconds':>8s} {'articles':>8s} {'yield':>6s}  status")
+        with self.lock:
+            for domain, usage in sorted(self.usage.items(), key=lambda item: -item[1].yield_rate):
+                used = usage.used(now)
+                status = usage.stopped or ('finished' if usage.finished is not None else 'active')
+                print(f"{domain[:30]:30s} {usage.pages:6d} {usage.bytes / 2**20:8.2f} "
+                      f"{used['seconds']:8.1f} {usage.articles:8d} {usage.yield_rate:6.2f}  {status}")
+            print(f"Pool left: {int(self.pool['pages'])} pages, {self.pool['bytes'] / 2**20:.1f} MB, "
+                  f"{self.pool['seconds']:.1f} s")
+
+
+def _format(key: str, value: float) -> str:
+    if key == 'bytes':
+        return f"{value / 2**20:.1f} MB"
+    if key == 'seconds':
+        return f"{value:.1f} s"
+    return f"{int(value)}"
+
+
+_current_budget: Optional[CrawlBudget] = None
+
+
+def set_crawl_budget(budget: Optional[CrawlBudget]) -> Optional[CrawlBudget]:
+    """Install the budget all sessions enforce from now on (None removes it)"""
+    global _current_budget
+    _current_budget = budget
+    return budget
+
+
+def get_crawl_budget() -> Optional[CrawlBudget]:
+    """The installed budget, None if crawling is unlimited"""
+    return _current_budget
+
+
+def budget_allows(url: str) -> bool:
+    """True if no budget is installed or a request to the URL is within it"""
+    budget = _current_budget
+    return budget is None or budget.allows(url)
+
+
+def record_yield(url: str, count: int = 1):
+    """Report relevant articles found on the URL's domain to the installed budget"""
+    budget = _current_budget
+    if budget is not None:
+        budget.record_articles(url, count)
+
+
+def finish_domain(url: str):
+    """Tell the installed budget a collector is done with the URL's domain"""
+    budget = _current_budget
+    if budget is not None:
+        budget.finish(url)
+
+
+_SIZE_UNITS = {'K': 2**10, 'M': 2**20, 'G': 2**30}
+
+
+def _size(text: str) -> int:
+    """Byte count with an optional K/M/G suffix ('500M')"""
+    unit = text[-1:].upper()
+    if unit in _SIZE_UNITS:
+        return int(float(text[:-1]) * _SIZE_UNITS[unit])
+    return int(text)
+
+
+def parse_budget_args(argv: Optional[List[str]] = None) -> Optional[CrawlBudget]:
+    """
+    Budget from command line options, None if no limit is given
+
+    Options:
+        --max-pages N, --max-bytes N, --max-seconds S            limits of the whole run
+        --domain-pages N, --domain-bytes N, --domain-seconds S   limits of each domain
+        --min-yield R    stop domains with fewer articles per page (after 20 pages)
+    Byte counts take a K, M or G suffix. Other arguments are ignored.
+    """
+    parser = argparse.ArgumentParser(add_help=False)
+    for scope in ('max', 'domain'):
+        parser.add_argument(f'--{scope}-pages', type=int)
+        parser.add_argument(f'--{scope}-bytes', type=_size)
+        parser.add_argument(f'--{scope}-seconds', type=float)
+    parser.add_argument('--min-yield', type=float)
+    args, _ = parser.parse_known_args(sys.argv[1:] if argv is None else argv)
+
+    run = BudgetLimits(args.max_pages, args.max_bytes, args.max_seconds)
+    per_domain = BudgetLimits(args.domain_pages, args.domain_bytes, args.domain_seconds)
+    if run == BudgetLimits() and per_domain == BudgetLimits() and args.min_yield is None:
+        return None
+    return CrawlBudget(run=run, per_domain=per_domain, min_yield=args.min_yield)
+
+
+@contextmanager
+def budget_from_args(argv: Optional[List[str]] = None) -> Iterator[Optional[CrawlBudget]]:
+    """
+    Install the budget given on the command line (see parse_budget_args) for a
+    script's run, and print its summary at the end
+    """
+    budget = parse_budget_args(argv)
+    if budget is None:
+        yield None
+        return
+
+    previous = get_crawl_budget()
+    set_crawl_budget(budget)
+    try:
+        yield budget
+    finally:
+        set_crawl_budget(previous)
+        budget.print_summary()
@@ -0,0 +1,247 @@
+"""
+Crawl frontier for the URL finders
+A priority queue of URLs still to visit: the most promising link is crawled
+next, and each URL is queued only once. CrawlFrontier lives in memory,
+PersistentFrontier in a SQLite file, so a crawl can be paused and resumed
+and several processes can crawl from the same queue.
+"""
+
+import heapq
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from url_canonical import canonicalize_url
+
+
+class CrawlFrontier:
+    """
+    Priority queue of (url, depth) with deduplication at enqueue time
+
+    Higher scores are popped first; equal scores in the order they were
+    pushed, so with constant scores the crawl is breadth-first. Pushing a
+    queued URL again only raises its priority (if the new score is higher),
+    and URLs that were already popped are never queued again. push and pop
+    are O(log n).
+    """
+
+    def __init__(self):
+        self.heap: List[Tuple[float, int, str, int]] = []   # (-score, order, url, depth)
+        self.queued: Dict[str, float] = {}                  # Canonical URL -> best score
+        self.popped = set()
+        self.counter = itertools.count()
+
+    def push(self, url: str, depth: int, score: float = 0.0) -> bool:
+        """Queue a URL, returns False if it was already visited or queued with a higher score"""
+        key = canonicalize_url(url)
+        if key in self.popped:
+            return False
+        if key in self.queued and self.queued[key] >= score:
+            return False
+
+        # A higher score for a queued URL leaves a stale heap entry, skipped by pop()
+        self.queued[key] = score
+        heapq.heappush(self.heap, (-score, next(self.counter), key, depth))
+        return True
+
+    def pop(self) -> Optional[Tuple[str, int, float]]:
+        """Most promising (url, depth, score), None if the frontier is empty"""
+        while self.heap:
+            negative_score, _, url, depth = heapq.heappop(self.heap)
+            if url in self.popped or self.queued.get(url) != -negative_score:
+                continue  # Stale entry
+            del self.queued[url]
+            self.popped.add(url)
+            return url, depth, -negative_score
+        return None
+
+    def mark_visited(self, url: str):
+        """Never queue this URL (e.g. visited by another search)"""
+        key = canonicalize_url(url)
+        self.queued.pop(key, None)
+        self.popped.add(key)
+
+    def complete(self, url: str, status: str = 'done', data: Optional[Dict] = None):
+        """Nothing to record in memory (see PersistentFrontier.complete)"""
+
+    def close(self):
+        pass
+
+    def __contains__(self, url: str) -> bool:
+        return canonicalize_url(url) in self.queued
+
+    def __len__(self) -> int:
+        return len(self.queued)
+
+    def __bool__(self) -> bool:
+        return bool(self.queued)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self.queued))
+
+
+class PersistentFrontier:
+    """
+    Crawl frontier stored in a SQLite file
+
+    Same queue as CrawlFrontier (highest score first, each URL once), but
+    every URL stays in the file with its depth, score, status and fetch
+    time. A stopped crawl continues where it stopped when the same file is
+    opened again, and several processes can pop from one file: pop() claims
+    a URL atomically, so no URL is handed out twice.
+
+    Statuses: 'queued', 'claimed' (being crawled), then whatever complete()
+    records ('done', 'failed', 'article', ...). Claims of a process that died
+    are handed out again once they are older than the lease.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS frontier (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            url TEXT NOT NULL UNIQUE,
+            depth INTEGER NOT NULL,
+            score REAL NOT NULL,
+            status TEXT NOT NULL DEFAULT 'queued',
+            claimed_by TEXT,
+            claimed_at REAL,
+            fetched_at REAL,
+            data TEXT
+        );
+        CREATE INDEX IF NOT EXISTS frontier_queue ON frontier (status, score DESC, id);
+    """
+
+    def __init__(self, path: str, lease: float = 600.0, poll_interval: float = 0.5):
+        """
+        Args:
+            path: SQLite file (created if missing)
+            lease: Seconds after which a claim of another process is taken over
+            poll_interval: Seconds pop() waits between checks while other
+                           processes are still crawling (and may queue links)
+        """
+        self.path = path
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self.worker = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.lock = threading.Lock()
+
+        # Autocommit mode; writes that read first run in BEGIN IMMEDIATE transactions
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(self.SCHEMA)
+
+    def push(self, url: str, depth: int, score: float = 0.0) -> bool:
+        """Queue a URL, returns False if it was already crawled or queued with a higher score"""
+        with self.lock:
+            cursor = self.conn.execute(
+                """INSERT INTO frontier (url, depth, score) VALUES (?, ?, ?)
+                   ON CONFLICT (url) DO UPDATE SET depth = excluded.depth, score = excluded.score
+                   WHERE status = 'queued' AND score < excluded.score""",
+                (canonicalize_url(url), depth, score))
+            return cursor.rowcount > 0
+
+    def _claim(self) -> Tuple[Optional[Tuple[str, int, float]], bool]:
+        """Claim the best queued URL: (url, depth, score) or None, and whether others still crawl"""
+        now = time.time()
+        with self.lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                self.conn.execute(
+                    "UPDATE frontier SET status = 'queued', claimed_by = NULL "
+                    "WHERE status = 'claimed' AND claimed_at < ?", (now - self.lease,))
+                row = self.conn.execute(
+                    "SELECT id, url, depth, score FROM frontier WHERE status = 'queued' "
+                    "ORDER BY score DESC, id LIMIT 1").fetchone()
+                if row:
+                    self.conn.execute(
+                        "UPDATE frontier SET status = 'claimed', claimed_by = ?, claimed_at = ? WHERE id = ?",
+                        (self.worker, now, row[0]))
+                    busy = False
+                else:
+                    busy = self.conn.execute(
+                        "SELECT 1 FROM frontier WHERE status = 'claimed' AND claimed_by != ? LIMIT 1",
+                        (self.worker,)).fetchone() is not None
+                self.conn.execute('COMMIT')
+            except BaseException:
+                self.conn.execute('ROLLBACK')
+                raise
+        return (tuple(row[1:]) if row else None), busy
+
+    def pop(self) -> Optional[Tuple[str, int, float]]:
+        """
+        Claim the most promising (url, depth, score), None when the crawl is finished
+
+        While the queue is empty but other processes are still crawling pages
+        (whose links may be queued next), waits for them.
+        """
+        while True:
+            item, busy = self._claim()
+            if item or not busy:
+                return item
+            time.sleep(self.poll_interval)
+
+    def complete(self, url: str, status: str = 'done', data: Optional[Dict] = None):
+        """Record a crawled URL with its status and optional data (e.g. the article found)"""
+        with self.lock:
+            self.conn.execute(
+                "UPDATE frontier SET status = ?, fetched_at = ?, data = ?, claimed_by = NULL WHERE url = ?",
+                (status, time.time(), json.dumps(data) if data is not None else None, canonicalize_url(url)))
+
+    def mark_visited(self, url: str):
+        """Never queue this URL (e.g. visited by another search)"""
+        with self.lock:
+            self.conn.execute(
+                """INSERT INTO frontier (url, depth, score, status) VALUES (?, 0, 0, 'done')
+                   ON CONFLICT (url) DO UPDATE SET status = 'done' WHERE status = 'queued'""",
+                (canonicalize_url(url),))
+
+    def release(self):
+        """Put the URLs this process claimed but did not complete back in the queue"""
+        with self.lock:
+            self.conn.execute(
+                "UPDATE frontier SET status = 'queued', claimed_by = NULL "
+                "WHERE status = 'claimed' AND claimed_by = ?", (self.worker,))
+
+    def results(self, status: str) -> List[Dict]:
+        """Data recorded for the URLs completed with a status, in crawl order"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT data FROM frontier WHERE status = ? AND data IS NOT NULL ORDER BY fetched_at, id",
+                (status,)).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def counts(self) -> Dict[str, int]:
+        """Number of URLs per status"""
+        with self.lock:
+            return dict(self.conn.execute("SELECT status, COUNT(*) FROM frontier GROUP BY status"))
+
+    def close(self):
+        """Release unfinished claims and close the file"""
+        if self.conn is not None:
+            self.release()
+            self.conn.close()
+            self.conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __contains__(self, url: str) -> bool:
+        with self.lock:
+            return self.conn.execute(
+                "SELECT 1 FROM frontier WHERE url = ? AND status = 'queued'",
+                (canonicalize_url(url),)).fetchone() is not None
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM frontier WHERE status = 'queued'").fetchone()[0]
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
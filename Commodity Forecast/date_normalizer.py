@@ -0,0 +1,113 @@
+"""
+Date normalization for publication dates and outlook periods
+Turns raw date strings into structured dates (year, month, day, quarter,
+half). ISO dates take a regex fast path, everything else the strptime
+formats; results are memoized since the same strings repeat across pages.
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Optional
+
+
+# Formats tried for publication dates, on the first 10 characters, in this order
+DATE_FORMATS = ['%Y-%m-%d', '%Y/%m/%d', '%d-%m-%Y', '%d/%m/%Y', '%B %d, %Y', '%d %B %Y']
+
+# Distinct raw strings remembered per process
+DATE_CACHE_SIZE = 4096
+
+MONTHS = ['January', 'February', 'March', 'April', 'May', 'June', 'July',
+          'August', 'September', 'October', 'November', 'December']
+
+_iso_date = re.compile(r'(\d{4})-(\d\d)-(\d\d)')
+_period = re.compile(r'(?:([QH])([1-4])|([A-Za-z]+))?\s*(\d{4})', re.IGNORECASE)
+_month_numbers = {name.lower(): number for number, name in enumerate(MONTHS, 1)}
+
+
+@dataclass(frozen=True)
+class ParsedDate:
+    """A calendar date or a period (year, half, quarter or month)"""
+    year: int
+    month: Optional[int] = None
+    day: Optional[int] = None
+    quarter: Optional[int] = None   # 1-4, outlook periods like 'Q3 2025'
+    half: Optional[int] = None      # 1-2, outlook periods like 'H1 2025'
+
+    def iso(self) -> str:
+        """'2025-03-14', '2025-03' or '2025' (quarters and halves give the year)"""
+        if self.day is not None:
+            return f"{self.year:04d}-{self.month:02d}-{self.day:02d}"
+        if self.month is not None:
+            return f"{self.year:04d}-{self.month:02d}"
+        return f"{self.year:04d}"
+
+    def start(self) -> date:
+        """First day of the date or period"""
+        if self.quarter is not None:
+            return date(self.year, 3 * self.quarter - 2, 1)
+        if self.half is not None:
+            return date(self.year, 6 * self.half - 5, 1)
+        return date(self.year, self.month or 1, self.day or 1)
+
+    def __str__(self) -> str:
+        """Same notation as the extracted outlook dates ('Q3 2025', 'March 2025', ...)"""
+        if self.quarter is not None:
+            return f"Q{self.quarter} {self.year}"
+        if self.half is not None:
+            return f"H{self.half} {self.year}"
+        if self.day is None and self.month is not None:
+            return f"{MONTHS[self.month - 1]} {self.year}"
+        return self.iso()
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def normalize_date(raw: str) -> Optional[ParsedDate]:
+    """
+    Calendar date of a publication date string, None if no format matches
+
+    Only the first 10 characters are parsed, so '2025-03-14T08:00:00Z'
+    works. Same results as trying DATE_FORMATS with strptime one after
+    another, but ISO dates skip the strptime calls.
+    """
+    head = raw[:10]
+
+    match = _iso_date.fullmatch(head)
+    if match:
+        year, month, day = map(int, match.groups())
+        try:
+            date(year, month, day)
+            return ParsedDate(year, month, day)
+        except ValueError:
+            pass  # Not a valid date, the other formats may still match
+
+    for fmt in DATE_FORMATS:
+        try:
+            parsed = datetime.strptime(head, fmt)
+        except ValueError:
+            continue
+        return ParsedDate(parsed.year, parsed.month, parsed.day)
+
+    return None
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def normalize_period(text: str) -> Optional[ParsedDate]:
+    """Period of an outlook date ('2025', 'Q3 2025', 'H1 2025', 'March 2025'), None if unknown"""
+    match = _period.fullmatch(text.strip())
+    if not match:
+        return None
+
+    kind, number, month_name, year = match.groups()
+    year = int(year)
+    if kind:
+        if kind.upper() == 'Q':
+            return ParsedDate(year, quarter=int(number))
+        if int(number) <= 2:
+            return ParsedDate(year, half=int(number))
+        return None
+    if month_name:
+        month = _month_numbers.get(month_name.lower())
+        return ParsedDate(year, month=month) if month else None
+    return ParsedDate(year)
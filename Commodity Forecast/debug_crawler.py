@@ -4,6 +4,7 @@ This helps identify why articles aren't being found
 """
 
 from url_finder import IronOreArticleFinder
+from crawl_frontier import CrawlFrontier
 
 
 class DebugIronOreFinder(IronOreArticleFinder):
@@ -29,11 +30,12 @@ class DebugIronOreFinder(IronOreArticleFinder):
         print(f"{'='*80}")
         print(f"Max pages: {max_pages}, Max depth: {max_depth}\n")
 
-        to_visit = [(start_url, 0)]
+        to_visit = CrawlFrontier()
+        to_visit.push(start_url, 0)
         pages_crawled = 0
 
         while to_visit and pages_crawled < max_pages:
-            current_url, depth = to_visit.pop(0)
+            current_url, depth, score = to_visit.pop()
 
             if current_url in self.visited_urls or depth > max_depth:
                 continue
@@ -42,7 +44,7 @@ class DebugIronOreFinder(IronOreArticleFinder):
             pages_crawled += 1
             self.debug_stats['total_pages_checked'] += 1
 
-            print(f"\n[{pages_crawled}/{max_pages}] Depth {depth}: {current_url[:100]}")
+            print(f"\n[{pages_crawled}/{max_pages}] Depth {depth}, score {score:.0f}: {current_url[:100]}")
 
             soup = self.fetch_page(current_url)
             if not soup:
@@ -113,9 +115,8 @@ class DebugIronOreFinder(IronOreArticleFinder):
                 print(f"     - {len(article_links)} look like articles")
                 print(f"     - {len(other_links)} other links")
 
-                for link in article_links + other_links:
-                    if link not in self.visited_urls:
-                        to_visit.append((link, depth + 1))
+                queued = self.queue_links(to_visit, soup, current_url, depth)
+                print(f"     - {queued} newly queued ({len(to_visit)} in the frontier)")
 
         self.print_debug_summary()
         return self.found_articles
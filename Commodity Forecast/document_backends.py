@@ -0,0 +1,226 @@
+"""
+Document backends for article analysis
+The scraper only needs two things from a page: the visible text of the main
+content container and the raw publication date. Both backends here produce
+the same values; the lxml one does it without building a BeautifulSoup tree.
+"""
+
+import re
+from typing import List, Optional, Tuple, Dict
+
+from bs4 import BeautifulSoup, UnicodeDammit
+import lxml.html
+from lxml import etree
+
+
+# Main content containers, tried in this order (first match wins)
+CONTENT_SELECTORS = [
+    'article', 'main', '.article-content', '.post-content',
+    '.entry-content', '#content', '.story-body'
+]
+
+# Elements carrying the publication date, as (tag name, attributes)
+DATE_SELECTORS: List[Tuple[str, Dict[str, str]]] = [
+    ('meta', {'property': 'article:published_time'}),
+    ('meta', {'name': 'publication_date'}),
+    ('meta', {'name': 'date'}),
+    ('time', {'class': 'published'}),
+    ('time', {}),
+    ('.publish-date', {}),
+    ('.article-date', {}),
+]
+
+# BeautifulSoup's get_text() leaves out the content of these elements
+NON_TEXT_TAGS = ('script', 'style', 'template')
+
+BACKENDS = ('html.parser', 'lxml')
+
+
+class SoupDocument:
+    """Document backed by a BeautifulSoup tree (html.parser), the reference behaviour"""
+
+    def __init__(self, soup: BeautifulSoup):
+        self.soup = soup
+
+    @classmethod
+    def from_bytes(cls, content: bytes) -> 'SoupDocument':
+        return cls(BeautifulSoup(content, 'html.parser'))
+
+    def main_text(self, selectors: List[str] = CONTENT_SELECTORS) -> Optional[str]:
+        """Visible text of the first matching content container, or None if there is none"""
+        content = None
+        for selector in selectors:
+            content = self.soup.select_one(selector)
+            if content:
+                break
+
+        if not content:
+            content = self.soup.find('body')
+
+        if not content:
+            return None
+
+        return content.get_text(separator=' ', strip=True)
+
+    def date_text(self, selectors: List[Tuple[str, Dict[str, str]]] = DATE_SELECTORS) -> Optional[str]:
+        """Raw text of the first date element that has any, or None"""
+        for selector, attrs in selectors:
+            element = self.soup.find(selector, attrs)
+            if element:
+                date_text = element.get('content') or element.get('datetime') or element.get_text()
+                if date_text:
+                    return date_text
+        return None
+
+
+def _class_test(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def _css_to_xpath(selector: str) -> str:
+    """Translate the simple selectors we use (tag, .class, #id) to XPath"""
+    if selector.startswith('.'):
+        return f"//*[{_class_test(selector[1:])}]"
+    if selector.startswith('#'):
+        return f"//*[@id='{selector[1:]}']"
+    return f"//{selector}"
+
+
+def _find_to_xpath(tag: str, attrs: Dict[str, str]) -> Optional[str]:
+    """Translate a soup.find(tag, attrs) call to XPath, None if it can never match"""
+    # soup.find() takes a tag *name*, so '.publish-date' only matches a tag
+    # literally named like that - i.e. never
+    if not re.fullmatch(r'[A-Za-z][\w:-]*', tag):
+        return None
+
+    tests = []
+    for name, value in attrs.items():
+        tests.append(_class_test(value) if name == 'class' else f"@{name}='{value}'")
+    return f"//{tag}" + ''.join(f"[{test}]" for test in tests)
+
+
+class LxmlDocument:
+    """
+    Document backed by an lxml tree
+
+    Parsing with lxml and walking text nodes directly is several times faster
+    than building a BeautifulSoup tree, and gives the same text.
+    """
+
+    _content_xpaths = [etree.XPath(_css_to_xpath(s)) for s in CONTENT_SELECTORS]
+    _date_xpaths = [
+        etree.XPath(x) if x else None
+        for x in (_find_to_xpath(tag, attrs) for tag, attrs in DATE_SELECTORS)
+    ]
+    _body_tag = re.compile(rb'<body[\s>/]', re.IGNORECASE)
+
+    def __init__(self, content: bytes):
+        # Decode like BeautifulSoup does, libxml2 would fall back to latin-1
+        markup = UnicodeDammit(content, is_html=True).unicode_markup or ''
+        try:
+            self.root = lxml.html.document_fromstring(markup)
+        except (ValueError, etree.ParserError):
+            # Unicode input with an XML encoding declaration, or an empty page
+            parser = lxml.html.HTMLParser(encoding='utf-8')
+            self.root = lxml.html.document_fromstring(markup.encode('utf-8') or b'<html/>', parser=parser)
+
+        # lxml always adds a <body>, html.parser only has one if the page does
+        raw = content if isinstance(content, bytes) else content.encode('utf-8')
+        self.has_body = bool(self._body_tag.search(raw))
+
+    @classmethod
+    def from_bytes(cls, content: bytes) -> 'LxmlDocument':
+        return cls(content)
+
+    @staticmethod
+    def _strings(element):
+        """Text nodes of an element in document order, like BeautifulSoup's _all_strings"""
+        stack = [(element, False)]
+        while stack:
+            node, is_tail = stack.pop()
+            if is_tail:
+                if node.tail:
+                    yield node.tail
+                continue
+
+            # Comments and processing instructions have no text of their own
+            if isinstance(node.tag, str) and node.tag not in NON_TEXT_TAGS:
+                if node.text:
+                    yield node.text
+                for child in reversed(node):
+                    stack.append((child, True))
+                    stack.append((child, False))
+
+    def _get_text(self, element, separator: str = '', strip: bool = False) -> str:
+        strings = self._strings(element)
+        if strip:
+            strings = (s.strip() for s in strings)
+            strings = (s for s in strings if s)
+        return separator.join(strings)
+
+    def main_text(self, selectors: List[str] = CONTENT_SELECTORS) -> Optional[str]:
+        """Visible text of the first matching content container, or None if there is none"""
+        xpaths = self._content_xpaths if selectors is CONTENT_SELECTORS else \
+            [etree.XPath(_css_to_xpath(s)) for s in selectors]
+
+        content = None
+        for xpath in xpaths:
+            matches = xpath(self.root)
+            if matches:
+                content = matches[0]
+                break
+
+        if content is None and self.has_body:
+            content = self.root.find('body')
+
+        if content is None:
+            return None
+
+        return self._get_text(content, separator=' ', strip=True)
+
+    def date_text(self, selectors: List[Tuple[str, Dict[str, str]]] = DATE_SELECTORS) -> Optional[str]:
+        """Raw text of the first date element that has any, or None"""
+        xpaths = self._date_xpaths if selectors is DATE_SELECTORS else [
+            etree.XPath(x) if x else None
+            for x in (_find_to_xpath(tag, attrs) for tag, attrs in selectors)
+        ]
+
+        for xpath in xpaths:
+            if xpath is None:
+                continue
+            matches = xpath(self.root)
+            if matches:
+                element = matches[0]
+                date_text = element.get('content') or element.get('datetime') or self._get_text(element)
+                if date_text:
+                    return date_text
+        return None
+
+
+class TextDocument:
+    """Plain article text without markup (e.g. text stored by another tool)"""
+
+    def __init__(self, text: str, date: Optional[str] = None):
+        """
+        Args:
+            text: The article text
+            date: Publication date, if known (returned by date_text)
+        """
+        self.text = text
+        self.date = date
+
+    def main_text(self, selectors: List[str] = CONTENT_SELECTORS) -> Optional[str]:
+        """The whole text, or None if it is empty"""
+        return self.text.strip() or None
+
+    def date_text(self, selectors: List[Tuple[str, Dict[str, str]]] = DATE_SELECTORS) -> Optional[str]:
+        return self.date
+
+
+def parse_document(content: bytes, backend: str = 'html.parser'):
+    """Parse page content (bytes, or an already decoded str) with the given backend ('html.parser' or 'lxml')"""
+    if backend == 'lxml':
+        return LxmlDocument(content)
+    if backend == 'html.parser':
+        return SoupDocument.from_bytes(content)
+    raise ValueError(f"Unknown document backend: {backend} (choose from {BACKENDS})")
@@ -3,28 +3,48 @@ Expand your search to find MORE iron ore articles
 Builds on what you already have
 """
 
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin
-import time
-
-
-def quick_category_search(category_urls, max_pages_per_category=15):
+import os
+
+from http_client import create_session
+from url_canonical import UrlSet
+from link_extractor import LinkRules
+from crawl_budget import budget_allows, budget_from_args, finish_domain
+from category_watermark import open_watermark
+
+
+# Links counted as articles on a category page
+ARTICLE_LINKS = LinkRules(
+    'mining.com',
+    include=[
+        '-', '/web/'
+    ],
+    # Exclude non-article pages
+    exclude=[
+        '/commodity/', '/category/', '/tag/', '/region/',
+        '/jobs', '/ranking', '/advertise', '/contact',
+        '/press-release', '/markets/', '/video/'
+    ],
+)
+
+
+def quick_category_search(category_urls, max_pages_per_category=15, incremental=False):
     """
     Quick search of multiple categories
 
     Args:
         category_urls: List of category URLs to search
         max_pages_per_category: How many pages to check in each category
+        incremental: Stop paging a category at the first page with only URLs
+                     from earlier runs (see category_watermark.py)
     """
     print("\n" + "="*80)
     print("EXPANDING SEARCH - Multiple Categories")
     print("="*80)
 
-    all_urls = []
+    all_urls = UrlSet()
+    watermark = open_watermark(incremental)
 
-    session = requests.Session()
-    session.headers.update({
+    session = create_session({
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
     })
 
@@ -32,6 +52,8 @@ def quick_category_search(category_urls, max_pages_per_category=15):
         print(f"\n→ Searching: {category_url}")
 
         category_urls_found = []
+        category_articles = []  # Also those found in an earlier category, for the watermark
+        complete = True
 
         # Search through pages
         for page in range(1, max_pages_per_category + 1):
@@ -40,6 +62,10 @@ def quick_category_search(category_urls, max_pages_per_category=15):
             else:
                 page_url = f"{category_url}page/{page}/"
 
+            if not budget_allows(page_url):
+                complete = False
+                break
+
             try:
                 response = session.get(page_url, timeout=30)
 
@@ -48,23 +74,16 @@ def quick_category_search(category_urls, max_pages_per_category=15):
                     break
 
                 response.raise_for_status()
-                soup = BeautifulSoup(response.content, 'html.parser')
 
                 # Extract article URLs
-                page_urls = []
-                for link in soup.find_all('a', href=True):
-                    url = urljoin(category_url, link['href'])
-
-                    if 'mining.com' in url and url not in all_urls:
-                        # Exclude non-article pages
-                        exclude = ['/commodity/', '/category/', '/tag/', '/region/',
-                                 '/jobs', '/ranking', '/advertise', '/contact',
-                                 '/press-release', '/markets/', '/video/']
+                page_articles = ARTICLE_LINKS.extract(response.content, category_url)
+                page_urls = [url for url in page_articles if all_urls.add(url)]
 
-                        if not any(ex in url for ex in exclude):
-                            if '-' in url or '/web/' in url:
-                                page_urls.append(url)
-                                all_urls.append(url)
+                category_articles.extend(page_articles)
+                if watermark is not None and watermark.is_known_page(category_url, page_articles):
+                    category_urls_found.extend(page_urls)
+                    print(f"  Page {page}: Only articles from earlier runs, stopping")
+                    break
 
                 if page_urls:
                     category_urls_found.extend(page_urls)
@@ -73,17 +92,18 @@ def quick_category_search(category_urls, max_pages_per_category=15):
                     print(f"  Page {page}: No articles found, stopping")
                     break
 
-                time.sleep(0.5)
-
             except Exception as e:
                 print(f"  Page {page}: Error - {e}")
+                complete = False
                 break
 
+        if watermark is not None:
+            watermark.record(category_url, category_articles, complete)
         print(f"  ✓ Total from this category: {len(category_urls_found)}")
-        time.sleep(1)
 
     # Remove duplicates
-    all_urls = list(set(all_urls))
+    all_urls = list(all_urls)
+    finish_domain('https://www.mining.com/')
 
     print(f"\n{'='*80}")
     print(f"TOTAL UNIQUE URLs FOUND: {len(all_urls)}")
@@ -154,22 +174,29 @@ def main():
     pages = input("\nHow many pages per category? (default 15, more = slower): ").strip()
     max_pages = int(pages) if pages.isdigit() else 15
 
+    incremental = input("Incremental (stop at pages already seen in earlier runs)? (y/n): ").strip().lower() == 'y'
+
     # Search!
     print(f"\nStarting search...")
     print(f"Categories: {len(selected_urls)}")
     print(f"Pages per category: {max_pages}")
     print(f"Estimated time: {len(selected_urls) * max_pages * 2} seconds\n")
 
-    all_urls = quick_category_search(selected_urls, max_pages)
+    all_urls = quick_category_search(selected_urls, max_pages, incremental)
 
     if all_urls:
-        # Save to file
+        # Save to file (incremental runs add to the URLs of earlier runs)
         filename = 'mining_com_expanded_urls.txt'
+        saved_urls = all_urls
+        if incremental and os.path.exists(filename):
+            with open(filename, 'r', encoding='utf-8') as f:
+                saved_urls = list(dict.fromkeys([line.strip() for line in f if line.strip()] + all_urls))
+
         with open(filename, 'w', encoding='utf-8') as f:
-            for url in all_urls:
+            for url in saved_urls:
                 f.write(url + '\n')
 
-        print(f"\n✅ Saved {len(all_urls)} URLs to '{filename}'")
+        print(f"\n✅ Saved {len(saved_urls)} URLs to '{filename}'")
 
         # Show sample
         print(f"\nSample URLs (first 10):")
@@ -209,4 +236,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with budget_from_args():
+        main()
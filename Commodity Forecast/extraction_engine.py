@@ -0,0 +1,275 @@
+"""
+Single-pass extraction engine for prices, price ranges and dates
+Compiles all rules into one scanner that walks the article text once and
+returns typed match records - the same matches, in the same order, as
+running re.finditer once per rule
+"""
+
+import re
+from bisect import bisect_right
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import re._parser as _sre_parse   # Python 3.11+
+except ImportError:                    # pragma: no cover - older Pythons
+    import sre_parse as _sre_parse
+
+
+# Prices outside this range (USD per tonne) are not iron ore prices
+MIN_PRICE = 20
+MAX_PRICE = 300
+
+# A date further than this (characters) from a price is not its outlook date
+MAX_DATE_DISTANCE = 500
+
+
+@dataclass(frozen=True)
+class PriceMatch:
+    """A single price or a price range found in the text"""
+    kind: str                   # 'single' or 'range'
+    position: int               # Start of the match in the text
+    end: int
+    price: Optional[float] = None   # kind == 'single'
+    min: Optional[float] = None     # kind == 'range'
+    max: Optional[float] = None
+
+    def to_dict(self) -> Dict:
+        """Same dict as IronOreForecastScraper.extract_prices used to return"""
+        if self.kind == 'range':
+            return {'type': 'range', 'min': self.min, 'max': self.max, 'position': self.position}
+        return {'type': 'single', 'price': self.price, 'position': self.position}
+
+
+@dataclass(frozen=True)
+class DateMatch:
+    """An outlook date found in the text"""
+    position: int
+    end: int
+    text: str       # Matched text, e.g. 'by 2025'
+    parsed: str     # e.g. '2025', 'Q3 2024', 'March 2025'
+
+    def to_dict(self) -> Dict:
+        """Same dict as IronOreForecastScraper.extract_dates used to return"""
+        return {'text': self.text, 'position': self.position, 'parsed': self.parsed}
+
+
+def _group(groups: Tuple, number: int) -> str:
+    """groups[number - 1], raising IndexError like Match.group() for missing groups"""
+    if not 1 <= number <= len(groups):
+        raise IndexError("no such group")
+    return groups[number - 1]
+
+
+def parse_date_match(text: str, groups: Tuple) -> Optional[str]:
+    """Normalized outlook date of a date rule match, None if it can't be parsed"""
+    try:
+        if 'Q' in text.upper():
+            return f"{_group(groups, 1)} {_group(groups, 2)}"
+        if 'H' in text.upper():
+            return f"{_group(groups, 1)} {_group(groups, 2)}"
+        if len(groups) == 2 and _group(groups, 1).isalpha():
+            return f"{_group(groups, 1)} {_group(groups, 2)}"
+        return _group(groups, 1) if len(groups) == 1 else _group(groups, 2)
+    except (ValueError, IndexError, AttributeError):
+        return None
+
+
+def _without_groups(pattern: str) -> str:
+    """Turn capturing groups into non-capturing ones (patterns must not use backreferences)"""
+    pattern = re.sub(r'(?<!\\)\(\?P<\w+>', '(?:', pattern)
+    return re.sub(r'(?<!\\)\((?!\?)', '(?:', pattern)
+
+
+def _first_char_class(items) -> Optional[List[str]]:
+    """Regex class items for the characters a parsed pattern can start with, None if unknown"""
+    if not items:
+        return None
+    op, av = items[0]
+    name = str(op)
+
+    if name == 'LITERAL':
+        return [re.escape(chr(av))]
+    if name == 'IN':
+        chars = []
+        for item_op, item_av in av:
+            item_name = str(item_op)
+            if item_name == 'LITERAL':
+                chars.append(re.escape(chr(item_av)))
+            elif item_name == 'RANGE':
+                chars.append(f"{re.escape(chr(item_av[0]))}-{re.escape(chr(item_av[1]))}")
+            elif item_name == 'CATEGORY' and str(item_av) in ('CATEGORY_DIGIT', 'CATEGORY_WORD', 'CATEGORY_SPACE'):
+                chars.append({'CATEGORY_DIGIT': r'\d', 'CATEGORY_WORD': r'\w', 'CATEGORY_SPACE': r'\s'}[str(item_av)])
+            else:
+                return None
+        return chars
+    if name == 'SUBPATTERN':
+        return _first_char_class(list(av[-1]))
+    if name == 'BRANCH':
+        chars = []
+        for branch in av[1]:
+            branch_chars = _first_char_class(list(branch))
+            if branch_chars is None:
+                return None
+            chars.extend(branch_chars)
+        return chars
+    if name in ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT') and av[0] >= 1:
+        return _first_char_class(list(av[2]))
+    if name == 'AT':
+        return _first_char_class(items[1:])
+    return None
+
+
+def first_char_class(patterns: Sequence[str], flags: int = 0) -> Optional[str]:
+    """Character class matching every character a match of any pattern can start with"""
+    chars = []
+    for pattern in patterns:
+        try:
+            pattern_chars = _first_char_class(list(_sre_parse.parse(pattern, flags)))
+        except Exception:
+            return None
+        if pattern_chars is None:
+            return None
+        chars.extend(pattern_chars)
+    return '[' + ''.join(dict.fromkeys(chars)) + ']'
+
+
+class ExtractionEngine:
+    """
+    One compiled scanner for all price, range and date rules
+
+    At every position where some rule can start (a cheap character class
+    check), a single lookahead tests all rules and captures each rule's match.
+    Per rule, matches overlapping that rule's previous match are dropped,
+    which gives exactly the matches of re.finditer(rule, text).
+    """
+
+    def __init__(self, range_patterns: Sequence[str], price_patterns: Sequence[str],
+                 date_patterns: Sequence[str], flags: int = re.IGNORECASE):
+        # (kind, group of the rule's whole match, number of groups inside it)
+        self.rules: List[Tuple[str, int, int]] = []
+        patterns = [('range', p) for p in range_patterns] + \
+                   [('single', p) for p in price_patterns] + \
+                   [('date', p) for p in date_patterns]
+
+        lookaheads = []
+        group = 1
+        for kind, pattern in patterns:
+            inner_groups = re.compile(pattern, flags).groups
+            self.rules.append((kind, group, inner_groups))
+            lookaheads.append(f"(?=({pattern}))?")
+            group += 1 + inner_groups
+
+        # Fail fast where no rule matches, before capturing anything
+        any_rule = '|'.join(_without_groups(pattern) for _, pattern in patterns)
+        start = first_char_class([pattern for _, pattern in patterns], flags) or '(?s:.)'
+
+        # Consume the start character (so the regex engine can skip ahead
+        # quickly between candidates), then look at the rules from one
+        # character back. Lookbehind width is exactly that one character.
+        self.scanner = re.compile(
+            f"{start}(?<=(?=(?:{any_rule})){''.join(lookaheads)}(?s:.))", flags)
+
+    def scan(self, text: str) -> Tuple[List[PriceMatch], List[DateMatch]]:
+        """
+        Find all prices/ranges and dates in one pass over the text
+
+        Prices are ordered by rule (ranges first) and then by position, like
+        the sequential per-rule scans did; dates likewise.
+        """
+        per_rule: List[List] = [[] for _ in self.rules]
+        last_end = [0] * len(self.rules)
+
+        for match in self.scanner.finditer(text):
+            all_groups = None
+            for index, (kind, group, inner_groups) in enumerate(self.rules):
+                start = match.start(group)
+                if start < 0 or start < last_end[index]:
+                    continue
+                end = match.end(group)
+                last_end[index] = end
+
+                if all_groups is None:
+                    all_groups = match.groups()
+                groups = all_groups[group:group + inner_groups]
+                record = self._record(kind, text[start:end], start, end, groups)
+                if record is not None:
+                    per_rule[index].append(record)
+
+        prices = [m for (kind, _, _), matches in zip(self.rules, per_rule) if kind != 'date' for m in matches]
+        dates = [m for (kind, _, _), matches in zip(self.rules, per_rule) if kind == 'date' for m in matches]
+        return prices, dates
+
+    @staticmethod
+    def _record(kind: str, text: str, start: int, end: int, groups: Tuple):
+        try:
+            if kind == 'range':
+                low, high = float(_group(groups, 1)), float(_group(groups, 2))
+                if MIN_PRICE <= low <= MAX_PRICE and MIN_PRICE <= high <= MAX_PRICE:
+                    return PriceMatch('range', start, end, min=low, max=high)
+                return None
+            if kind == 'single':
+                price = float(_group(groups, 1))
+                if MIN_PRICE <= price <= MAX_PRICE:
+                    return PriceMatch('single', start, end, price=price)
+                return None
+        except (ValueError, IndexError, TypeError):
+            return None
+
+        parsed = parse_date_match(text, groups)
+        if parsed is None:
+            return None
+        return DateMatch(start, end, text, parsed)
+
+
+class DateIndex:
+    """
+    Dates of one text indexed by position, for finding the date closest to a price
+
+    Same rule as the nested loop it replaces: the date with the smallest
+    distance below max_distance wins, and on equal distance the date that
+    comes first in the list. Lookups are a binary search instead of a scan
+    over all dates.
+    """
+
+    def __init__(self, dates: Sequence[DateMatch], max_distance: int = MAX_DATE_DISTANCE):
+        self.dates = list(dates)
+        self.max_distance = max_distance
+
+        # Position -> first date (in list order) at that position
+        first_at: Dict[int, int] = {}
+        for index, date in enumerate(self.dates):
+            first_at.setdefault(date.position, index)
+        self.positions = sorted(first_at)
+        self.first_at = [first_at[position] for position in self.positions]
+
+    def nearest(self, position: int) -> Optional[DateMatch]:
+        """Closest date to a text position, None if there is none within max_distance"""
+        right = bisect_right(self.positions, position)
+        best_distance, best_index = self.max_distance, None
+
+        # The closest date at or before the position and the closest after it
+        for candidate in (right - 1, right):
+            if not 0 <= candidate < len(self.positions):
+                continue
+            distance = abs(position - self.positions[candidate])
+            index = self.first_at[candidate]
+            if distance < best_distance or (distance == best_distance and best_index is not None and index < best_index):
+                best_distance, best_index = distance, index
+
+        return self.dates[best_index] if best_index is not None else None
+
+
+def pair_prices_with_dates(prices: Sequence[PriceMatch], dates: Sequence[DateMatch],
+                           max_distance: int = MAX_DATE_DISTANCE) -> List[Tuple[PriceMatch, Optional[DateMatch]]]:
+    """Each price with its closest date (None if no date is within max_distance)"""
+    index = DateIndex(dates, max_distance)
+    return [(price, index.nearest(price.position)) for price in prices]
+
+
+@lru_cache(maxsize=32)
+def get_engine(range_patterns: Tuple[str, ...], price_patterns: Tuple[str, ...],
+               date_patterns: Tuple[str, ...]) -> ExtractionEngine:
+    """Compiled engine for a set of rules (compiled once per process)"""
+    return ExtractionEngine(range_patterns, price_patterns, date_patterns)
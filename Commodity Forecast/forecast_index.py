@@ -0,0 +1,213 @@
+"""
+Duplicate detection for forecast rows
+The same forecast often shows up on several pages (listing pages, category
+pages, URL variants). A hash index over the normalized text around the price
+and the forecast values finds those duplicates in O(1) per row.
+
+Usage:
+    python forecast_index.py forecasts.json [deduped.json]    # dedupe an export (.json or .csv)
+"""
+
+import csv
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+from typing import Dict, Iterable, List, Optional, Set
+
+from iron_ore_scraper import ForecastData, FORECAST_FIELDS
+
+
+# Characters of normalized context kept on each side of the price
+CONTEXT_KEY_CHARS = 40
+
+_non_word = re.compile(r'\W+')
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, punctuation and whitespace runs collapsed to single spaces"""
+    return _non_word.sub(' ', text.lower()).strip()
+
+
+def _number_token(value: float) -> str:
+    """A price as it appears in normalized text (93.0 -> '93', 92.5 -> '92 5')"""
+    return normalize_text(format(value, 'g'))
+
+
+def context_snippet(forecast: ForecastData, chars: int = CONTEXT_KEY_CHARS) -> str:
+    """
+    Normalized text right around the forecast's price
+
+    The context is 200 characters on each side of the price, so on listing
+    pages it also covers neighbouring headlines that differ from page to
+    page. Only the text closest to the price identifies the forecast.
+    """
+    text = normalize_text(forecast.context or '')
+    value = forecast.price_usd if forecast.price_usd is not None else forecast.price_range_min
+
+    # The price is (usually) in the middle of the context
+    center = len(text) // 2
+    if value is not None:
+        token = re.escape(_number_token(value))
+        hits = [m.start() for m in re.finditer(rf'(?<!\w){token}(?!\w)', text)]
+        if hits:
+            center = min(hits, key=lambda hit: abs(hit - center))
+
+    start, end = max(0, center - chars), center + chars
+    snippet = text[start:end]
+    # Drop the words cut in half at the edges
+    if start > 0:
+        snippet = snippet.partition(' ')[2]
+    if end < len(text):
+        snippet = snippet.rpartition(' ')[0]
+    return snippet
+
+
+def forecast_key(forecast: ForecastData) -> str:
+    """Hash of (context snippet, price, range, outlook date) identifying a forecast"""
+    parts = (context_snippet(forecast), forecast.price_usd, forecast.price_range_min,
+             forecast.price_range_max, forecast.outlook_date)
+    return hashlib.blake2b(json.dumps(parts).encode('utf-8'), digest_size=16).hexdigest()
+
+
+class ForecastIndex:
+    """
+    Hash index of the forecasts seen so far
+
+    In 'drop' mode duplicates are simply left out. In 'merge' mode they are
+    left out too, but what they add is folded into the row kept: a missing
+    forecast_date is filled in and their URL is listed in sources(). Rows
+    already written to a stream are not rewritten, so merging only shows in
+    the rows kept in memory.
+
+    With a path, the keys are appended to a file and loaded again on the
+    next run, so forecasts exported earlier are not exported twice.
+    Thread-safe.
+    """
+
+    MODES = ('drop', 'merge')
+
+    def __init__(self, mode: str = 'drop', path: Optional[str] = None):
+        """
+        Args:
+            mode: 'drop' or 'merge'
+            path: Optional file the keys are persisted in (one JSON line per key)
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown dedupe mode: {mode} (choose from {self.MODES})")
+
+        self.mode = mode
+        self.path = path
+        self.keys: Set[str] = set()
+        self.rows: Dict[str, ForecastData] = {}   # Rows kept for merging ('merge' mode only)
+        self.urls: Dict[str, List[str]] = {}
+        self.duplicates = 0
+        self.lock = threading.Lock()
+
+        self.file = None
+        if path:
+            if os.path.exists(path):
+                self._load()
+            self.file = open(path, 'a', encoding='utf-8')
+
+    def _load(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # Last line cut off by a crash
+                self.keys.add(record['key'])
+
+    def add(self, forecast: ForecastData) -> bool:
+        """Add a row, returns False if it duplicates one already in the index"""
+        key = forecast_key(forecast)
+        with self.lock:
+            if key not in self.keys:
+                self.keys.add(key)
+                if self.mode == 'merge':
+                    self.rows[key] = forecast
+                    self.urls[key] = [forecast.source_url]
+                if self.file:
+                    self.file.write(json.dumps({'key': key, 'url': forecast.source_url}) + '\n')
+                    self.file.flush()
+                return True
+
+            self.duplicates += 1
+            kept = self.rows.get(key)  # None in 'drop' mode or if seen in an earlier run
+            if kept is not None:
+                if kept.forecast_date is None:
+                    kept.forecast_date = forecast.forecast_date
+                if forecast.source_url not in self.urls[key]:
+                    self.urls[key].append(forecast.source_url)
+            return False
+
+    def filter(self, forecasts: Iterable[ForecastData]) -> List[ForecastData]:
+        """The rows that are not duplicates, in their original order"""
+        return [forecast for forecast in forecasts if self.add(forecast)]
+
+    def sources(self, forecast: ForecastData) -> List[str]:
+        """All URLs a forecast was found on ('merge' mode)"""
+        return list(self.urls.get(forecast_key(forecast), [forecast.source_url]))
+
+    def __contains__(self, forecast: ForecastData) -> bool:
+        return forecast_key(forecast) in self.keys
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_export(path: str) -> List[ForecastData]:
+    """Forecasts from a CSV or JSON export"""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if path.lower().endswith('.csv'):
+            rows = list(csv.DictReader(f))
+            for row in rows:
+                for field in ('price_usd', 'price_range_min', 'price_range_max'):
+                    row[field] = float(row[field]) if row[field] else None
+                for field in ('forecast_date', 'outlook_date'):
+                    row[field] = row[field] or None
+        else:
+            rows = json.load(f)
+    return [ForecastData(**{field: row.get(field) for field in FORECAST_FIELDS}) for row in rows]
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return
+
+    source = sys.argv[1]
+    base, ext = os.path.splitext(source)
+    output = sys.argv[2] if len(sys.argv) > 2 else f"{base}_deduped{ext}"
+
+    forecasts = load_export(source)
+    index = ForecastIndex()
+    unique = index.filter(forecasts)
+
+    with open(output, 'w', encoding='utf-8', newline='') as f:
+        if output.lower().endswith('.csv'):
+            writer = csv.DictWriter(f, fieldnames=FORECAST_FIELDS)
+            writer.writeheader()
+            writer.writerows(forecast.to_dict() for forecast in unique)
+        else:
+            json.dump([forecast.to_dict() for forecast in unique], f, indent=2)
+
+    print(f"{len(forecasts)} forecasts, {index.duplicates} duplicates removed, {len(unique)} written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Streaming export of forecast rows
+Writes every ForecastData row to CSV or JSON Lines as soon as it is extracted,
+so long crawls reach disk continuously and don't have to be kept in memory
+"""
+
+import csv
+import json
+import threading
+from typing import Iterable, Optional
+
+from iron_ore_scraper import ForecastData, FORECAST_FIELDS
+
+
+class ForecastSink:
+    """
+    Append forecast rows to a CSV or JSON Lines file
+
+    The format is taken from the file extension (.csv, .jsonl / .ndjson) unless
+    given. Rows are buffered by the file object and flushed to disk every
+    flush_interval seconds by a background thread, and when the sink is closed.
+    """
+
+    FORMATS = ('csv', 'jsonl')
+
+    def __init__(self, path: str, format: Optional[str] = None, flush_interval: float = 5.0):
+        if format is None:
+            format = 'csv' if path.lower().endswith('.csv') else 'jsonl'
+        if format not in self.FORMATS:
+            raise ValueError(f"Unknown sink format: {format} (choose from {self.FORMATS})")
+
+        self.path = path
+        self.format = format
+        self.rows_written = 0
+        self.lock = threading.Lock()
+
+        self.file = open(path, 'w', newline='' if format == 'csv' else None, encoding='utf-8')
+        if format == 'csv':
+            self.writer = csv.DictWriter(self.file, fieldnames=FORECAST_FIELDS)
+            self.writer.writeheader()
+
+        self.closed = threading.Event()
+        self.flusher = None
+        if flush_interval:
+            self.flusher = threading.Thread(target=self._flush_loop, args=(flush_interval,), daemon=True)
+            self.flusher.start()
+
+    def _flush_loop(self, interval: float):
+        while not self.closed.wait(interval):
+            self.flush()
+
+    def write(self, forecasts: Iterable[ForecastData]):
+        """Write rows (the file is flushed by the timer, not on every call)"""
+        with self.lock:
+            for forecast in forecasts:
+                if self.format == 'csv':
+                    self.writer.writerow(forecast.to_dict())
+                else:
+                    self.file.write(json.dumps(forecast.to_dict()) + '\n')
+                self.rows_written += 1
+
+    def flush(self):
+        with self.lock:
+            if not self.file.closed:
+                self.file.flush()
+
+    def close(self):
+        self.closed.set()
+        if self.flusher:
+            self.flusher.join()
+        with self.lock:
+            self.file.close()
+        print(f"Streamed {self.rows_written} forecasts to {self.path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -3,7 +3,9 @@ Get all iron ore article URLs from mining.com category page
 This is the FASTEST approach - just grab all URLs from the category page
 """
 
-import requests
+from http_client import create_session
+from url_canonical import UrlSet
+from crawl_budget import budget_from_args
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 
@@ -18,10 +20,9 @@ def get_all_iron_ore_urls_from_category():
     print("="*80)
 
     base_url = "https://www.mining.com/commodity/iron-ore/"
-    all_urls = []
+    all_urls = UrlSet()
 
-    session = requests.Session()
-    session.headers.update({
+    session = create_session({
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
     })
 
@@ -48,7 +49,7 @@ def get_all_iron_ore_urls_from_category():
 
                 if not any(pattern in url for pattern in exclude_patterns):
                     # This looks like an article
-                    all_urls.append(url)
+                    all_urls.add(url)
 
         print(f"Found {len(all_urls)} potential article URLs")
 
@@ -82,7 +83,7 @@ def get_all_iron_ore_urls_from_category():
                         ]
 
                         if not any(pattern in url for pattern in exclude_patterns):
-                            all_urls.append(url)
+                            all_urls.add(url)
                             page_urls.append(url)
 
                 print(f"  Found {len(page_urls)} more URLs on page {page}")
@@ -96,7 +97,7 @@ def get_all_iron_ore_urls_from_category():
                 break
 
         # Remove duplicates
-        all_urls = list(set(all_urls))
+        all_urls = list(all_urls)
 
         print(f"\n{'='*80}")
         print(f"TOTAL URLS FOUND: {len(all_urls)}")
@@ -183,4 +184,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with budget_from_args():
+        main()
@@ -3,38 +3,36 @@ GMK Center Scraper - Steel and Iron Ore Market Analytics
 Same expanded approach as other scrapers
 """
 
-import requests
+from http_client import create_session
+from url_canonical import UrlSet
+from link_extractor import LinkRules
+from crawl_budget import budget_allows, budget_from_args, finish_domain
+from category_watermark import open_watermark
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
-import time
 from datetime import datetime
 
 
-def extract_article_urls(soup, base_url):
-    """Extract article URLs from GMK Center page"""
-    urls = []
+# Links kept by extract_article_urls
+ARTICLE_LINKS = LinkRules(
+    'gmk.center',
+    # Include news, analytics, interviews, posts
+    include=[
+        '/en/news/', '/en/analitycs/', '/en/interview/', '/en/posts/', '/en/opinion/',
+        '/en/infographic/', '/en/companies/', '/en/global-market/', '/en/industry/',
+        '/en/technologies/'
+    ],
+    # Exclude non-content pages
+    exclude=[
+        '/login', '/register', '/signup', '/subscribe', '/contact', '/about', '/privacy',
+        '/terms', '/user', '/account', '/profile', '/ru/'
+    ],
+)
 
-    for link in soup.find_all('a', href=True):
-        url = urljoin(base_url, link['href'])
 
-        # Filter for GMK Center content
-        if 'gmk.center' in url and url not in urls:
-            # Exclude non-content pages
-            exclude_patterns = [
-                '/login', '/register', '/signup', '/subscribe',
-                '/contact', '/about', '/privacy', '/terms',
-                '/user', '/account', '/profile', '/ru/'  # Exclude Russian version
-            ]
-
-            if not any(pattern in url for pattern in exclude_patterns):
-                # Include news, analytics, interviews, posts
-                if any(pattern in url for pattern in ['/en/news/', '/en/analitycs/', '/en/interview/',
-                                                      '/en/posts/', '/en/opinion/', '/en/infographic/',
-                                                      '/en/companies/', '/en/global-market/',
-                                                      '/en/industry/', '/en/technologies/']):
-                    urls.append(url)
-
-    return urls
+def extract_article_urls(page, base_url):
+    """Extract article URLs from GMK Center page (raw HTML or a parsed soup)"""
+    return ARTICLE_LINKS.extract(page, base_url)
 
 
 def get_direct_iron_ore_pages():
@@ -84,16 +82,18 @@ def get_direct_iron_ore_pages():
     return iron_ore_pages
 
 
-def search_gmkcenter(max_crawl=50):
+def search_gmkcenter(max_crawl=50, incremental=False):
     """
     Search GMK Center for iron ore content (EXPANDED)
+
+    With incremental=True, news and analytics pagination stops at the first
+    page with only URLs from earlier runs (see category_watermark.py)
     """
     print("\n" + "#"*80)
     print("# GMK CENTER IRON ORE SCRAPER (EXPANDED)")
     print("#"*80)
 
-    session = requests.Session()
-    session.headers.update({
+    session = create_session({
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
         'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
         'Accept-Language': 'en-US,en;q=0.9',
@@ -119,10 +119,13 @@ def search_gmkcenter(max_crawl=50):
         'companies', 'global-market', 'industry', 'technologies',
         'ecology', 'green-steel', 'infrastructure'
     ]
+    watermark = open_watermark(incremental)
 
     for category in news_categories:
         category_url = f"https://gmk.center/en/news/{category}/"
         print(f"\nChecking: {category}")
+        category_links = []
+        complete = True
 
         # Try multiple pages (pagination)
         for page in range(1, 6):  # First 5 pages per category
@@ -132,6 +135,10 @@ def search_gmkcenter(max_crawl=50):
                 # GMK Center pagination pattern (may vary)
                 page_url = f"{category_url}?page={page}"
 
+            if not budget_allows(page_url):
+                complete = False
+                break
+
             try:
                 response = session.get(page_url, timeout=30)
 
@@ -156,6 +163,11 @@ def search_gmkcenter(max_crawl=50):
                         if 'gmk.center/en/' in full_url:
                             page_links.append(full_url)
 
+                category_links.extend(page_links)
+                if watermark is not None and watermark.is_known_page(category_url, page_links):
+                    print(f"  Page {page}: only URLs from earlier runs, stopping")
+                    break
+
                 new_links = [u for u in page_links if u not in all_urls]
 
                 if new_links:
@@ -165,12 +177,14 @@ def search_gmkcenter(max_crawl=50):
                     if page > 1:
                         break
 
-                time.sleep(1.5)
-
             except Exception as e:
                 print(f"  Error on page {page}: {e}")
+                complete = False
                 break
 
+        if watermark is not None:
+            watermark.record(category_url, category_links, complete)
+
     # Strategy 3: Analytics sections with pagination
     print("\n" + "="*80)
     print("STRATEGY 3: Analytics Sections")
@@ -181,6 +195,8 @@ def search_gmkcenter(max_crawl=50):
     for category in analytics_categories:
         category_url = f"https://gmk.center/en/analitycs/{category}/"
         print(f"\nChecking analytics: {category}")
+        category_links = []
+        complete = True
 
         for page in range(1, 6):  # First 5 pages
             if page == 1:
@@ -188,6 +204,10 @@ def search_gmkcenter(max_crawl=50):
             else:
                 page_url = f"{category_url}?page={page}"
 
+            if not budget_allows(page_url):
+                complete = False
+                break
+
             try:
                 response = session.get(page_url, timeout=30)
 
@@ -209,6 +229,11 @@ def search_gmkcenter(max_crawl=50):
                         if 'gmk.center/en/' in full_url:
                             page_links.append(full_url)
 
+                category_links.extend(page_links)
+                if watermark is not None and watermark.is_known_page(category_url, page_links):
+                    print(f"  Page {page}: only URLs from earlier runs, stopping")
+                    break
+
                 new_links = [u for u in page_links if u not in all_urls]
 
                 if new_links:
@@ -218,12 +243,14 @@ def search_gmkcenter(max_crawl=50):
                     if page > 1:
                         break
 
-                time.sleep(1.5)
-
             except Exception as e:
                 print(f"  Error: {e}")
+                complete = False
                 break
 
+        if watermark is not None:
+            watermark.record(category_url, category_links, complete)
+
     # Strategy 4: Deep Crawl - Find Sublinks
     print("\n" + "="*80)
     print("STRATEGY 4: Deep Crawl - Find Sublinks")
@@ -232,11 +259,13 @@ def search_gmkcenter(max_crawl=50):
     print(f"\nCrawling {min(len(all_urls), max_crawl)} pages to find sublinks...")
 
     urls_to_crawl = list(all_urls.copy())
-    crawled = set()
+    crawled = UrlSet()
 
     for i, page_url in enumerate(urls_to_crawl[:max_crawl], 1):
         if page_url in crawled:
             continue
+        if not budget_allows(page_url):
+            break
 
         print(f"[{i}/{max_crawl}] Crawling: {page_url[:60]}... ", end='', flush=True)
         crawled.add(page_url)
@@ -272,13 +301,13 @@ def search_gmkcenter(max_crawl=50):
             else:
                 print(f"no new links")
 
-            time.sleep(1.5)
-
         except Exception as e:
             print(f"error: {e}")
 
     all_urls = list(all_urls)
 
+    finish_domain('https://gmk.center/')
+
     print(f"\n{'='*80}")
     print(f"SEARCH COMPLETE")
     print(f"{'='*80}")
@@ -401,6 +430,8 @@ def main():
     crawl_pages = input("Max pages to crawl (default 50): ").strip()
     max_crawl = int(crawl_pages) if crawl_pages.isdigit() else 50
 
+    incremental = input("Incremental (stop at pages already seen in earlier runs)? (y/n): ").strip().lower() == 'y'
+
     print("\nWhat would you like to do?")
     print("1. Search for URLs (Step 1)")
     print("2. Scrape existing URL file (Step 2)")
@@ -409,7 +440,7 @@ def main():
     choice = input("\nEnter choice (1-3): ").strip()
 
     if choice == "1":
-        urls, filename = search_gmkcenter(max_crawl)
+        urls, filename = search_gmkcenter(max_crawl, incremental)
 
         if urls:
             print(f"\n✅ URLs collected: {len(urls)}")
@@ -428,10 +459,11 @@ def main():
             scrape_gmkcenter_urls(filename)
 
     elif choice == "3":
-        urls, filename = search_gmkcenter(max_crawl)
+        urls, filename = search_gmkcenter(max_crawl, incremental)
         if urls:
             scrape_gmkcenter_urls(filename)
 
 
 if __name__ == "__main__":
-    main()
+    with budget_from_args():
+        main()
@@ -0,0 +1,167 @@
+"""
+HTTP Response Cache
+Keeps downloaded pages on disk so repeat runs don't download them again
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Dict, Iterator, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+
+DEFAULT_CACHE_DIR = '.http_cache'
+
+# Headers that describe the transfer, not the (already decoded) body we store
+TRANSFER_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection'}
+
+
+class ResponseCache:
+    """
+    Content-addressed on-disk store for HTTP responses
+
+    Layout:
+        <cache_dir>/bodies/<aa>/<sha256 of body>    raw page content
+        <cache_dir>/entries/<aa>/<sha256 of url>.json
+            status, headers, ETag, Last-Modified and the body hash for one URL
+
+    Bodies are stored once per distinct content, so mirror URLs serving the same
+    page share one file.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.entries_dir = os.path.join(cache_dir, 'entries')
+        self.bodies_dir = os.path.join(cache_dir, 'bodies')
+        os.makedirs(self.entries_dir, exist_ok=True)
+        os.makedirs(self.bodies_dir, exist_ok=True)
+
+    @staticmethod
+    def _hash(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def _entry_path(self, url: str) -> str:
+        key = self._hash(url.encode('utf-8'))
+        return os.path.join(self.entries_dir, key[:2], key + '.json')
+
+    def _body_path(self, body_hash: str) -> str:
+        return os.path.join(self.bodies_dir, body_hash[:2], body_hash)
+
+    @staticmethod
+    def _write_atomic(path: str, data: bytes):
+        # Write to a temp file first so a crash never leaves a half-written entry.
+        # Each call gets its own temp file: threads may store the same body at once.
+        folder = os.path.dirname(path)
+        os.makedirs(folder, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=folder, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def get(self, url: str) -> Optional[Dict]:
+        """Get the cache entry for a URL, or None if it was never stored"""
+        try:
+            with open(self._entry_path(url), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        # An entry without its body is useless (e.g. body deleted by hand)
+        if not os.path.exists(self._body_path(entry['body_hash'])):
+            return None
+        return entry
+
+    def __contains__(self, url: str) -> bool:
+        return self.get(url) is not None
+
+    def iter_entries(self) -> Iterator[Dict]:
+        """All stored entries that still have their body, read lazily one at a time"""
+        for folder in sorted(os.listdir(self.entries_dir)):
+            folder_path = os.path.join(self.entries_dir, folder)
+            if not os.path.isdir(folder_path):
+                continue
+            for name in sorted(os.listdir(folder_path)):
+                if not name.endswith('.json'):
+                    continue
+                try:
+                    with open(os.path.join(folder_path, name), 'r', encoding='utf-8') as f:
+                        entry = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                if os.path.exists(self._body_path(entry['body_hash'])):
+                    yield entry
+
+    def read_body(self, entry: Dict) -> bytes:
+        """Read the stored content of a cache entry"""
+        with open(self._body_path(entry['body_hash']), 'rb') as f:
+            return f.read()
+
+    def store(self, url: str, response: requests.Response) -> Dict:
+        """Store a downloaded response (reads the full body)"""
+        body = response.content
+        body_hash = self._hash(body)
+
+        body_path = self._body_path(body_hash)
+        if not os.path.exists(body_path):
+            self._write_atomic(body_path, body)
+
+        headers = {k: v for k, v in response.headers.items()
+                   if k.lower() not in TRANSFER_HEADERS}
+
+        entry = {
+            'url': url,
+            'status_code': response.status_code,
+            'headers': headers,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'body_hash': body_hash,
+            'fetched_at': time.time(),
+        }
+        self._write_atomic(self._entry_path(url), json.dumps(entry).encode('utf-8'))
+        return entry
+
+    def refresh(self, url: str, entry: Dict, response: requests.Response) -> Dict:
+        """Update an entry after the server answered 304 Not Modified"""
+        for header, key in (('ETag', 'etag'), ('Last-Modified', 'last_modified')):
+            if response.headers.get(header):
+                entry[key] = response.headers[header]
+                entry['headers'][header] = response.headers[header]
+        entry['fetched_at'] = time.time()
+        self._write_atomic(self._entry_path(url), json.dumps(entry).encode('utf-8'))
+        return entry
+
+    @staticmethod
+    def conditional_headers(entry: Dict) -> Dict[str, str]:
+        """Headers for a conditional request revalidating a cached entry"""
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def build_response(self, request: requests.PreparedRequest, entry: Dict) -> requests.Response:
+        """Build a requests.Response from a cache entry"""
+        response = requests.Response()
+        response.status_code = entry['status_code']
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.reason = 'OK'
+        response.url = request.url
+        response.request = request
+        response._content = self.read_body(entry)
+        response._content_consumed = True
+        response.from_cache = True
+        return response
@@ -0,0 +1,235 @@
+"""
+Shared HTTP client for all scrapers and URL collectors
+Every fetch goes through a session created here, so caching, per-host
+rate limiting, retries and crawl budgets apply everywhere
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from crawl_budget import CrawlBudget, get_crawl_budget
+from http_cache import ResponseCache, DEFAULT_CACHE_DIR
+from rate_limiter import HostRateLimiter, get_rate_limiter
+from retry_policy import RetryPolicy, get_retry_policy
+
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+
+# Connect time of the current thread's last request (0 if a pooled connection was reused)
+_connect_timing = threading.local()
+
+
+class TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        _connect_timing.seconds = time.perf_counter() - start
+
+
+class TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()  # Includes the TLS handshake
+        _connect_timing.seconds = time.perf_counter() - start
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class ScraperAdapter(HTTPAdapter):
+    """
+    Transport adapter that serves GET requests from the response cache and
+    rate-limits everything that goes to the network
+
+    Cached pages are revalidated with a conditional request (ETag /
+    Last-Modified) and reused on 304. In offline mode cached pages are
+    returned without touching the network (and without waiting for the
+    rate limiter). Connection errors, timeouts and retryable status codes
+    are retried according to the retry policy. Requests beyond the crawl
+    budget raise crawl_budget.BudgetExhausted.
+
+    Every response gets a `timings` dict: cache ('hit', 'revalidated' or
+    None), rate_wait, connect and ttfb (seconds, of the last attempt),
+    retries and backoff (seconds spent waiting between attempts).
+    """
+
+    def __init__(self, cache: Optional[ResponseCache] = None, offline: bool = False,
+                 rate_limiter: Optional[HostRateLimiter] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 budget: Optional[CrawlBudget] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache
+        self.offline = offline
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self.budget = budget
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': TimedHTTPConnectionPool,
+            'https': TimedHTTPSConnectionPool,
+        }
+
+    def serves_offline(self, url: str) -> bool:
+        """True if a GET of the URL is answered from the cache without the network"""
+        if not self.offline or self.cache is None:
+            return False
+        return self.cache.get(requests.Request('GET', url).prepare().url) is not None
+
+    def wait_before_retry(self, url: str, delay: float) -> float:
+        """Back off before a retry (the whole host backs off), returns the time waited"""
+        if self.rate_limiter is not None:
+            self.rate_limiter.defer(url, delay)
+            # Reserve directly: callers that prepaid their first slot still wait here
+            delay = self.rate_limiter.reserve(url)
+
+        time.sleep(delay)
+        return delay
+
+    def send_to_network(self, request, stream=False, **kwargs):
+        """
+        Send a request over the network, waiting for the host's rate limit first
+        and retrying transient failures
+        """
+        rate_wait = 0.0
+        if self.rate_limiter is not None:
+            rate_wait = self.rate_limiter.wait(request.url)
+
+        policy = self.retry_policy
+        if policy is not None:
+            policy.budget.record_request()
+
+        attempt = 0
+        backoff = 0.0
+        while True:
+            _connect_timing.seconds = 0.0
+            start = time.perf_counter()
+            try:
+                response = super().send(request, stream=stream, **kwargs)
+                # The body is read later by the session, so this is the time to first byte
+                response.timings = {
+                    'cache': None,
+                    'rate_wait': rate_wait,
+                    'connect': _connect_timing.seconds,
+                    'ttfb': time.perf_counter() - start,
+                    'retries': attempt,
+                    'backoff': backoff,
+                }
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                delay = policy.delay(attempt, request.method, error=e) if policy else None
+                if delay is None:
+                    raise
+                reason = type(e).__name__
+            else:
+                delay = policy.delay(attempt, request.method, response=response) if policy else None
+                if delay is None:
+                    budget = self.budget or get_crawl_budget()
+                    if budget is not None:
+                        budget.count_bytes(request.url, response)
+                    return response
+                reason = f"HTTP {response.status_code}"
+                response.close()
+
+            attempt += 1
+            print(f"  {reason} for {request.url[:60]}, retry {attempt} in {delay:.1f}s")
+            backoff += self.wait_before_retry(request.url, delay)
+
+    def send(self, request, stream=False, **kwargs):
+        # The installed budget is looked up per request, so it also covers older sessions
+        budget = self.budget or get_crawl_budget()
+        if budget is None:
+            return self.send_cached(request, stream=stream, **kwargs)
+
+        budget.check(request.url)
+        response = self.send_cached(request, stream=stream, **kwargs)
+        budget.count_page(request.url)
+        return response
+
+    def send_cached(self, request, stream=False, **kwargs):
+        """Serve a GET from the response cache if possible, else send it to the network"""
+        if self.cache is None or request.method != 'GET':
+            return self.send_to_network(request, stream=stream, **kwargs)
+
+        entry = self.cache.get(request.url)
+        if entry and self.offline:
+            response = self.cache.build_response(request, entry)
+            response.timings = {'cache': 'hit', 'rate_wait': 0.0, 'connect': 0.0, 'ttfb': 0.0,
+                                'retries': 0, 'backoff': 0.0}
+            return response
+
+        if entry:
+            request.headers.update(self.cache.conditional_headers(entry))
+
+        response = self.send_to_network(request, stream=stream, **kwargs)
+
+        if entry and response.status_code == 304:
+            response.close()
+            entry = self.cache.refresh(request.url, entry, response)
+            timings = dict(response.timings, cache='revalidated')
+            response = self.cache.build_response(request, entry)
+            response.timings = timings
+            return response
+
+        # Streamed responses are read by the caller, possibly only in part
+        if response.status_code == 200 and not stream:
+            self.cache.store(request.url, response)
+
+        return response
+
+
+def create_session(headers: Optional[Dict[str, str]] = None,
+                   cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+                   offline: bool = False,
+                   rate_limiter: Optional[HostRateLimiter] = None,
+                   rate_limit: bool = True,
+                   retry_policy: Optional[RetryPolicy] = None,
+                   retry: bool = True,
+                   budget: Optional[CrawlBudget] = None) -> requests.Session:
+    """
+    Create a requests session with the shared scraper setup
+
+    Args:
+        headers: Extra headers (override the default User-Agent if given)
+        cache_dir: Directory of the on-disk response cache, None disables caching
+        offline: Serve cached pages without revalidating them (no network time
+                 for pages we already have, e.g. when re-running extraction)
+        rate_limiter: Per-host limiter, defaults to the process-wide shared one
+        rate_limit: False disables rate limiting (e.g. for local tests)
+        retry_policy: Retry rules, defaults to the process-wide shared policy
+        retry: False disables retries
+        budget: Crawl budget, defaults to the one installed with
+                crawl_budget.set_crawl_budget (none: unlimited)
+    """
+    session = requests.Session()
+    session.headers.update({'User-Agent': DEFAULT_USER_AGENT})
+    if headers:
+        session.headers.update(headers)
+
+    cache = ResponseCache(cache_dir) if cache_dir else None
+    if rate_limit and rate_limiter is None:
+        rate_limiter = get_rate_limiter()
+
+    if retry and retry_policy is None:
+        retry_policy = get_retry_policy()
+
+    adapter = ScraperAdapter(cache=cache, offline=offline,
+                             rate_limiter=rate_limiter if rate_limit else None,
+                             retry_policy=retry_policy if retry else None,
+                             budget=budget)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+    return session
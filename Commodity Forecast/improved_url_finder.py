@@ -3,12 +3,29 @@ Improved URL Finder with more flexible search strategies
 """
 
 from url_finder import IronOreArticleFinder
-from typing import List
+from keyword_matcher import get_matcher
+from sitemap_reader import SitemapReader
+from crawl_budget import budget_allows, budget_from_args, record_yield
+import time
+from typing import List, Optional
 
 
 class ImprovedIronOreFinder(IronOreArticleFinder):
     """Improved finder with relaxed matching and better strategies"""
 
+    # More flexible keyword matching than the base finder (see contains_iron_ore_keywords)
+    IRON_ORE_TERMS = ['iron ore', 'iron-ore', 'ironore', 'iron_ore']
+    FORECAST_TERMS = [
+        'forecast', 'outlook', 'prediction', 'expect',
+        'plummeted', 'raise', 'fall', 'increasing',
+        'long-term', 'short-term', 'price', 'prices',
+        'market', 'analysis', 'trend', '2024', '2025',
+        'quarterly', 'annual', 'projection'
+    ]
+
+    # URL prefilter for sitemap entries: only these pages are fetched
+    SITEMAP_URL_TERMS = ['iron']
+
     def __init__(self, strict_mode=False):
         """
         Args:
@@ -17,146 +34,132 @@ class ImprovedIronOreFinder(IronOreArticleFinder):
         super().__init__()
         self.strict_mode = strict_mode
 
-    def contains_iron_ore_keywords(self, text: str, url: str) -> bool:
-        """More flexible keyword matching"""
-        text_lower = text.lower()
-        url_lower = url.lower()
-
-        # Must contain "iron ore" or "iron-ore"
-        iron_ore_found = any(keyword in text_lower or keyword in url_lower
-                            for keyword in ['iron ore', 'iron-ore', 'ironore', 'iron_ore'])
-
-        if not iron_ore_found:
-            return False
-
-        # Check for forecast/price keywords (more relaxed)
-        forecast_keywords = [
-            'forecast', 'outlook', 'prediction', 'expect',
-            'plummeted', 'raise', 'fall', 'increasing',
-            'long-term', 'short-term', 'price', 'prices',
-            'market', 'analysis', 'trend', '2024', '2025',
-            'quarterly', 'annual', 'projection'
-        ]
-
-        forecast_found = any(keyword in text_lower or keyword in url_lower
-                           for keyword in forecast_keywords)
-
-        return iron_ore_found and forecast_found
-
-    def search_website_flexible(self, start_url: str, max_pages: int = 50, max_depth: int = 2):
+    def search_website_flexible(self, start_url: str, max_pages: int = 50, max_depth: int = 2,
+                                frontier_path: Optional[str] = None):
         """
         More flexible search - accepts pages with keywords even without article URL pattern
+        (frontier_path as for search_website)
         """
         print(f"\nFlexible search: {start_url}")
         print(f"Max pages: {max_pages}, Max depth: {max_depth}")
         print(f"Strict mode (requires article URL pattern): {self.strict_mode}\n")
 
-        to_visit = [(start_url, 0)]
+        to_visit = self.open_frontier(start_url, frontier_path)
         pages_crawled = 0
 
-        while to_visit and pages_crawled < max_pages:
-            current_url, depth = to_visit.pop(0)
-
-            if current_url in self.visited_urls or depth > max_depth:
-                continue
-
-            self.visited_urls.add(current_url)
-            pages_crawled += 1
-
-            print(f"[{pages_crawled}/{max_pages}] Depth {depth}: {current_url[:80]}...")
-
-            soup = self.fetch_page(current_url)
-            if not soup:
-                continue
-
-            # Get page info
-            page_text = soup.get_text(separator=' ', strip=True)[:2000]  # More text
-            title = soup.find('title')
-            title_text = title.get_text() if title else ""
-
-            is_article = self.is_article_url(current_url)
-            has_keywords = self.contains_iron_ore_keywords(page_text + title_text, current_url)
-
-            # In flexible mode, accept if has keywords (even without article URL pattern)
-            # In strict mode, require both
-            should_include = has_keywords if not self.strict_mode else (is_article and has_keywords)
-
-            if should_include:
-                article_info = {
-                    'url': current_url,
-                    'title': title_text.strip(),
-                    'found_at_depth': depth,
-                    'is_article_url': is_article
-                }
-                self.found_articles.append(article_info)
-                print(f"  ✓ Found: {title_text[:60]}...")
-
-            # Extract and queue more links
-            if depth < max_depth:
-                links = self.extract_links(soup, current_url)
-
-                # In flexible mode, prioritize any link
-                # In strict mode, prioritize article-looking URLs
-                if self.strict_mode:
-                    article_links = [l for l in links if self.is_article_url(l)]
-                    other_links = [l for l in links if not self.is_article_url(l)]
-                    sorted_links = article_links + other_links
-                else:
-                    sorted_links = links
-
-                for link in sorted_links:
-                    if link not in self.visited_urls:
-                        to_visit.append((link, depth + 1))
-
-            import time
-            time.sleep(0.5)  # Be polite
+        try:
+            while pages_crawled < max_pages:
+                item = to_visit.pop()
+                if item is None:
+                    break
+                current_url, depth, _ = item
+
+                if current_url in self.visited_urls or depth > max_depth:
+                    to_visit.complete(current_url, 'skipped')
+                    continue
+
+                # Stop when the crawl budget of the site (or the run) is used up;
+                # the URL stays queued in a persistent frontier
+                if not budget_allows(current_url):
+                    break
+
+                self.visited_urls.add(current_url)
+                pages_crawled += 1
+
+                print(f"[{pages_crawled}/{max_pages}] Depth {depth}: {current_url[:80]}...")
+
+                timing = {}
+                soup = self.fetch_page(current_url, timing)
+                if not soup:
+                    self.record_metrics(current_url, timing)
+                    to_visit.complete(current_url, 'failed')
+                    continue
+                start = time.perf_counter()
+
+                # Get page info
+                page_text = soup.get_text(separator=' ', strip=True)[:2000]  # More text
+                title = soup.find('title')
+                title_text = title.get_text() if title else ""
+
+                is_article = self.is_article_url(current_url)
+                has_keywords = self.contains_iron_ore_keywords(page_text + title_text, current_url)
+
+                # In flexible mode, accept if has keywords (even without article URL pattern)
+                # In strict mode, require both
+                should_include = has_keywords if not self.strict_mode else (is_article and has_keywords)
+
+                article_info = None
+                if should_include:
+                    article_info = {
+                        'url': current_url,
+                        'title': title_text.strip(),
+                        'found_at_depth': depth,
+                        'is_article_url': is_article
+                    }
+                    self.found_articles.append(article_info)
+                    record_yield(current_url)
+                    print(f"  ✓ Found: {title_text[:60]}...")
+
+                # Extract and queue more links
+                if depth < max_depth:
+                    # In flexible mode, an article-looking URL gets no extra priority
+                    # In strict mode, prioritize article-looking URLs
+                    self.queue_links(to_visit, soup, current_url, depth, article_bonus=self.strict_mode)
+                to_visit.complete(current_url, 'article' if article_info else 'done', article_info)
+
+                timing.update(extract=time.perf_counter() - start, rows=int(should_include))
+                self.record_metrics(current_url, timing)
+        finally:
+            to_visit.close()
 
         print(f"\nSearch complete! Found {len(self.found_articles)} pages")
         return self.found_articles
 
-    def search_by_sitemap(self, sitemap_url: str):
+    def search_by_sitemap(self, sitemap_url: str, max_articles: int = 100):
         """
         Try to find articles via sitemap (if available)
         Common sitemap URLs: /sitemap.xml, /sitemap_index.xml
+
+        Nested sitemap indexes and .xml.gz sitemaps are followed. Only pages
+        whose <lastmod> lies in DATE_RANGE and whose URL contains one of
+        SITEMAP_URL_TERMS are fetched, at most max_articles of them.
         """
         print(f"\nSearching sitemap: {sitemap_url}")
 
-        soup = self.fetch_page(sitemap_url)
-        if not soup:
-            print("  Could not fetch sitemap")
-            return []
+        reader = SitemapReader(self.session, url_filter=get_matcher(self.SITEMAP_URL_TERMS).contains_any)
+        fetched = 0
 
-        # Extract URLs from sitemap
-        urls = []
-        for loc in soup.find_all('loc'):
-            url = loc.get_text()
-            urls.append(url)
+        for entry in reader.iter_entries(sitemap_url):
+            if fetched >= max_articles:  # Limit to prevent too many requests
+                break
 
-        print(f"  Found {len(urls)} URLs in sitemap")
-
-        # Filter for iron ore articles
-        for url in urls[:100]:  # Limit to prevent too many requests
+            url = entry.url
             if url in self.visited_urls:
                 continue
+            if not budget_allows(url):
+                break
 
             self.visited_urls.add(url)
-
-            # Check URL first
-            if 'iron' in url.lower():
-                soup = self.fetch_page(url)
-                if soup:
-                    page_text = soup.get_text(separator=' ', strip=True)[:1000]
-                    title = soup.find('title')
-                    title_text = title.get_text() if title else ""
-
-                    if self.contains_iron_ore_keywords(page_text + title_text, url):
-                        article_info = {
-                            'url': url,
-                            'title': title_text.strip(),
-                            'found_at_depth': 0
-                        }
-                        self.found_articles.append(article_info)
-                        print(f"  ✓ Found: {title_text[:60]}")
+            fetched += 1
+
+            soup = self.fetch_page(url)
+            if soup:
+                page_text = soup.get_text(separator=' ', strip=True)[:1000]
+                title = soup.find('title')
+                title_text = title.get_text() if title else ""
+
+                if self.contains_iron_ore_keywords(page_text + title_text, url):
+                    article_info = {
+                        'url': url,
+                        'title': title_text.strip(),
+                        'found_at_depth': 0,
+                        'lastmod': entry.lastmod
+                    }
+                    self.found_articles.append(article_info)
+                    record_yield(url)
+                    print(f"  ✓ Found: {title_text[:60]}")
+
+        reader.print_stats()
 
         print(f"Found {len(self.found_articles)} articles from sitemap")
         return self.found_articles
@@ -263,4 +266,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with budget_from_args():
+        main()
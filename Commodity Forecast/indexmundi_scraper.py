@@ -3,34 +3,33 @@ IndexMundi Scraper - Iron Ore Forecasts and Data
 Same expanded approach as Trading Economics
 """
 
-import requests
+from http_client import create_session
+from url_canonical import UrlSet
+from link_extractor import LinkRules
+from crawl_budget import budget_allows, budget_from_args, finish_domain
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
-import time
 from datetime import datetime
 
 
-def extract_article_urls(soup, base_url):
-    """Extract article URLs from IndexMundi page"""
-    urls = []
+# Links kept by extract_article_urls
+ARTICLE_LINKS = LinkRules(
+    'indexmundi.com',
+    # Include commodity, forecast, data pages
+    include=[
+        '/commodities/', '/commodity=', '/graph', '/data', '/forecast'
+    ],
+    # Exclude non-content pages
+    exclude=[
+        '/login', '/register', '/contact', '/about', '/privacy', '/terms', '/sitemap',
+        '/rss'
+    ],
+)
 
-    for link in soup.find_all('a', href=True):
-        url = urljoin(base_url, link['href'])
 
-        # Filter for IndexMundi content
-        if 'indexmundi.com' in url and url not in urls:
-            # Exclude non-content pages
-            exclude_patterns = [
-                '/login', '/register', '/contact', '/about',
-                '/privacy', '/terms', '/sitemap', '/rss'
-            ]
-
-            if not any(pattern in url for pattern in exclude_patterns):
-                # Include commodity, forecast, data pages
-                if any(pattern in url for pattern in ['/commodities/', '/commodity=', '/graph', '/data', '/forecast']):
-                    urls.append(url)
-
-    return urls
+def extract_article_urls(page, base_url):
+    """Extract article URLs from IndexMundi page (raw HTML or a parsed soup)"""
+    return ARTICLE_LINKS.extract(page, base_url)
 
 
 def get_direct_iron_ore_pages():
@@ -100,8 +99,7 @@ def search_indexmundi(max_crawl=50):
     print("# INDEXMUNDI IRON ORE SCRAPER (EXPANDED)")
     print("#"*80)
 
-    session = requests.Session()
-    session.headers.update({
+    session = create_session({
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
         'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
         'Accept-Language': 'en-US,en;q=0.9',
@@ -151,7 +149,6 @@ def search_indexmundi(max_crawl=50):
                         all_urls.add(full_url)
 
             print(f"  Found {len(all_urls)} total URLs so far")
-            time.sleep(2)
 
         except Exception as e:
             print(f"  Error: {e}")
@@ -164,11 +161,13 @@ def search_indexmundi(max_crawl=50):
     print(f"\nCrawling {min(len(all_urls), max_crawl)} pages to find sublinks...")
 
     urls_to_crawl = list(all_urls.copy())
-    crawled = set()
+    crawled = UrlSet()
 
     for i, page_url in enumerate(urls_to_crawl[:max_crawl], 1):
         if page_url in crawled:
             continue
+        if not budget_allows(page_url):
+            break
 
         print(f"[{i}/{max_crawl}] Crawling: {page_url[:60]}... ", end='', flush=True)
         crawled.add(page_url)
@@ -203,8 +202,6 @@ def search_indexmundi(max_crawl=50):
             else:
                 print(f"no new links")
 
-            time.sleep(1.5)
-
         except Exception as e:
             print(f"error: {e}")
 
@@ -230,6 +227,8 @@ def search_indexmundi(max_crawl=50):
 
     all_urls = list(all_urls)
 
+    finish_domain('https://www.indexmundi.com/')
+
     print(f"\n{'='*80}")
     print(f"SEARCH COMPLETE")
     print(f"{'='*80}")
@@ -385,4 +384,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with budget_from_args():
+        main()
@@ -3,15 +3,24 @@ Iron Ore Price Forecast Scraper
 Scrapes financial websites for 62% iron ore price forecasts between 2013-2025
 """
 
-import requests
+from http_client import ScraperAdapter, create_session, DEFAULT_CACHE_DIR
+from crawl_budget import BudgetExhausted, record_yield
+from rate_limiter import HostRateLimiter, get_rate_limiter
+from document_backends import SoupDocument, parse_document
+from url_canonical import UrlSet, find_canonical_link, unique_urls
+from scrape_metrics import ScrapeMetrics, fetch_timing
+from extraction_engine import ExtractionEngine, PriceMatch, DateMatch, get_engine, pair_prices_with_dates
+from keyword_matcher import get_matcher
+from date_normalizer import ParsedDate, normalize_date, normalize_period
 from bs4 import BeautifulSoup
-import re
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import json
 import csv
 from dataclasses import dataclass, asdict
 from urllib.parse import urljoin, urlparse
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import time
 
 
@@ -31,17 +40,61 @@ class ForecastData:
     def to_dict(self):
         return asdict(self)
 
+    def published(self) -> Optional[ParsedDate]:
+        """forecast_date as a structured date (None if missing or not a date)"""
+        return normalize_date(self.forecast_date) if self.forecast_date else None
+
+    def outlook_period(self) -> Optional[ParsedDate]:
+        """outlook_date as a structured period: year, quarter, half or month"""
+        return normalize_period(self.outlook_date) if self.outlook_date else None
+
+
+# Column order of the CSV exports
+FORECAST_FIELDS = [
+    'source_name', 'source_url', 'forecast_date', 'outlook_date',
+    'price_usd', 'price_range_min', 'price_range_max',
+    'context', 'scraped_date'
+]
+
+# Scraper attributes that define the extraction, copied to parse worker processes
+EXTRACTION_SETTINGS = ('range_patterns', 'price_patterns', 'date_patterns', 'iron_ore_keywords')
+
 
 class IronOreForecastScraper:
     """Main scraper class for iron ore price forecasts"""
 
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
+    def __init__(self, cache_dir: Optional[str] = DEFAULT_CACHE_DIR, offline: bool = False,
+                 rate_limiter: Optional[HostRateLimiter] = None,
+                 document_backend: str = 'html.parser',
+                 metrics: Optional[ScrapeMetrics] = None):
+        """
+        Args:
+            cache_dir: Directory of the on-disk response cache (None disables it)
+            offline: Reuse cached pages without revalidating them
+            rate_limiter: Per-host limiter, defaults to the shared one
+            document_backend: 'html.parser' (BeautifulSoup) or 'lxml' (faster,
+                              same text - see document_backends.py)
+            metrics: Records per-URL timings (see scrape_metrics.py)
+        """
+        self.document_backend = document_backend
+        self.metrics = metrics
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.session = create_session({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        }, cache_dir=cache_dir, offline=offline, rate_limiter=self.rate_limiter)
         self.forecasts: List[ForecastData] = []
 
+        # Canonical URLs of every page scraped (or skipped as a duplicate) so far
+        self.seen_urls = UrlSet()
+
+        # Streaming export (see stream_to)
+        self.sink = None
+        self.keep_forecasts = True
+        self.forecast_count = 0
+
+        # Duplicate forecast rows across pages (see dedupe)
+        self.dedupe_index = None
+
         # Patterns for extracting iron ore prices and dates
         self.price_patterns = [
             r'\$(\d+(?:\.\d{1,2})?)\s*(?:per|/|a)\s*(?:tonne|ton|mt|t)',
@@ -74,96 +127,90 @@ class IronOreForecastScraper:
             'cfr china', 'cfr qingdao', 'platts'
         ]
 
-    def fetch_page(self, url: str, timeout: int = 30) -> Optional[BeautifulSoup]:
-        """Fetch and parse a webpage"""
+    def fetch_html(self, url: str, timeout: int = 30, timing: Optional[Dict] = None) -> Optional[bytes]:
+        """
+        Fetch a webpage without parsing it
+
+        If a timing dict is given, the fetch metrics are added to it
+        """
+        start = time.perf_counter()
+        response = None
         try:
             response = self.session.get(url, timeout=timeout)
             response.raise_for_status()
-            return BeautifulSoup(response.content, 'html.parser')
+            return response.content
+        except BudgetExhausted:
+            return None  # Reported once by the budget
         except Exception as e:
             print(f"Error fetching {url}: {e}")
             return None
+        finally:
+            if timing is not None:
+                timing.update(fetch_timing(response, time.perf_counter() - start))
+
+    def fetch_page(self, url: str, timeout: int = 30) -> Optional[BeautifulSoup]:
+        """Fetch and parse a webpage"""
+        content = self.fetch_html(url, timeout)
+        if content is None:
+            return None
+        return BeautifulSoup(content, 'html.parser')
+
+    def parse_document(self, content: bytes):
+        """Parse page content with the configured document backend"""
+        return parse_document(content, self.document_backend)
+
+    def extract_from_content(self, url: str, content: bytes, source_name: str,
+                             timing: Optional[Dict] = None) -> List[ForecastData]:
+        """Parse a downloaded page and analyze it, adding parse/extract times to timing"""
+        start = time.perf_counter()
+        document = self.parse_document(content)
+        parsed = time.perf_counter()
+        forecasts = self.analyze_document(url, document, source_name)
+
+        if timing is not None:
+            timing.update(parse=parsed - start, extract=time.perf_counter() - parsed, rows=len(forecasts))
+        return forecasts
+
+    def record_metrics(self, url: str, timing: Dict):
+        if self.metrics is not None:
+            self.metrics.record(url, **timing)
 
     def is_iron_ore_content(self, text: str) -> bool:
         """Check if text contains iron ore related content"""
-        text_lower = text.lower()
-        return any(keyword in text_lower for keyword in self.iron_ore_keywords)
+        return get_matcher(self.iron_ore_keywords).contains_any(text)
+
+    def extraction_config(self) -> Dict:
+        """Picklable copy of the extraction settings, see from_extraction_config"""
+        config = {name: list(getattr(self, name)) for name in EXTRACTION_SETTINGS}
+        config['document_backend'] = self.document_backend
+        return config
+
+    @classmethod
+    def from_extraction_config(cls, config: Dict) -> 'IronOreForecastScraper':
+        """Scraper without cache that extracts like the one the config was taken from"""
+        scraper = cls(cache_dir=None, document_backend=config['document_backend'])
+        for name in EXTRACTION_SETTINGS:
+            setattr(scraper, name, config[name])
+        return scraper
+
+    @property
+    def extraction_engine(self) -> ExtractionEngine:
+        """Single-pass scanner for the current price, range and date patterns"""
+        return get_engine(tuple(self.range_patterns), tuple(self.price_patterns), tuple(self.date_patterns))
+
+    def scan_text(self, text: str) -> Tuple[List[PriceMatch], List[DateMatch]]:
+        """Find all prices/ranges and dates in one pass (see extraction_engine.py)"""
+        return self.extraction_engine.scan(text)
 
     def extract_prices(self, text: str) -> List[Dict]:
         """Extract price information from text"""
-        prices = []
-
-        # Check for price ranges
-        for pattern in self.range_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                try:
-                    min_price = float(match.group(1))
-                    max_price = float(match.group(2))
-                    # Filter reasonable iron ore prices (typically $20-$200 per tonne)
-                    if 20 <= min_price <= 300 and 20 <= max_price <= 300:
-                        prices.append({
-                            'type': 'range',
-                            'min': min_price,
-                            'max': max_price,
-                            'position': match.start()
-                        })
-                except (ValueError, IndexError):
-                    continue
-
-        # Check for single prices
-        for pattern in self.price_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                try:
-                    price = float(match.group(1))
-                    # Filter reasonable iron ore prices
-                    if 20 <= price <= 300:
-                        prices.append({
-                            'type': 'single',
-                            'price': price,
-                            'position': match.start()
-                        })
-                except (ValueError, IndexError):
-                    continue
-
-        return prices
+        prices, _ = self.scan_text(text)
+        return [price.to_dict() for price in prices]
 
     def extract_dates(self, text: str) -> List[Dict]:
         """Extract date information from text"""
-        dates = []
-
-        for pattern in self.date_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                try:
-                    date_info = {
-                        'text': match.group(0),
-                        'position': match.start()
-                    }
-
-                    # Parse different date formats
-                    if 'Q' in match.group(0).upper():
-                        quarter = match.group(1)
-                        year = match.group(2)
-                        date_info['parsed'] = f"{quarter} {year}"
-                    elif 'H' in match.group(0).upper():
-                        half = match.group(1)
-                        year = match.group(2)
-                        date_info['parsed'] = f"{half} {year}"
-                    elif len(match.groups()) == 2 and match.group(1).isalpha():
-                        month = match.group(1)
-                        year = match.group(2)
-                        date_info['parsed'] = f"{month} {year}"
-                    else:
-                        year = match.group(1) if len(match.groups()) == 1 else match.group(2)
-                        date_info['parsed'] = year
-
-                    dates.append(date_info)
-                except (ValueError, IndexError):
-                    continue
-
-        return dates
+        _, dates = self.scan_text(text)
+        return [date.to_dict() for date in dates]
 
     def extract_context(self, text: str, position: int, context_size: int = 200) -> str:
         """Extract surrounding context from text around a position"""
@@ -173,62 +220,39 @@ class IronOreForecastScraper:
 
     def analyze_article(self, url: str, soup: BeautifulSoup, source_name: str) -> List[ForecastData]:
         """Analyze an article and extract forecast data"""
-        forecasts = []
-
-        # Extract main content (try common article containers)
-        content_selectors = [
-            'article', 'main', '.article-content', '.post-content',
-            '.entry-content', '#content', '.story-body'
-        ]
-
-        content = None
-        for selector in content_selectors:
-            content = soup.select_one(selector)
-            if content:
-                break
+        return self.analyze_document(url, SoupDocument(soup), source_name)
 
-        if not content:
-            content = soup.find('body')
+    def analyze_document(self, url: str, document, source_name: str) -> List[ForecastData]:
+        """Analyze a parsed document (any backend from document_backends.py)"""
+        forecasts = []
 
-        if not content:
+        # Get the text of the main content (common article containers, else body)
+        text = document.main_text()
+        if text is None:
             return forecasts
 
-        # Get all text
-        text = content.get_text(separator=' ', strip=True)
-
         # Check if this is iron ore related content
         if not self.is_iron_ore_content(text):
             return forecasts
 
         # Extract article date (publication date)
-        article_date = self.extract_article_date(soup)
+        article_date = self.extract_article_date(document)
 
-        # Find all prices and dates
-        prices = self.extract_prices(text)
-        dates = self.extract_dates(text)
-
-        # Match prices with nearby dates
-        for price_info in prices:
-            # Find closest date to this price
-            closest_date = None
-            min_distance = float('inf')
-
-            for date_info in dates:
-                distance = abs(price_info['position'] - date_info['position'])
-                if distance < min_distance and distance < 500:  # Within 500 characters
-                    min_distance = distance
-                    closest_date = date_info
+        # Find all prices and dates (one pass over the text)
+        prices, dates = self.scan_text(text)
 
+        # Match each price with the closest date (within 500 characters)
+        for price_info, closest_date in pair_prices_with_dates(prices, dates):
             # Create forecast entry
             forecast = ForecastData(
                 source_url=url,
                 source_name=source_name,
                 forecast_date=article_date,
-                outlook_date=closest_date['parsed'] if closest_date else None,
-                price_usd=price_info.get('price'),
-                price_range_min=price_info.get('min'),
-                price_range_max=price_info.get('max'),
-                context=self.extract_context(text, price_info['position']),
+                outlook_date=closest_date.parsed if closest_date else None,
+                price_usd=price_info.price,
+                price_range_min=price_info.min,
+                price_range_max=price_info.max,
+                context=self.extract_context(text, price_info.position),
                 scraped_date=datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             )
 
@@ -236,64 +260,287 @@ class IronOreForecastScraper:
 
         return forecasts
 
-    def extract_article_date(self, soup: BeautifulSoup) -> Optional[str]:
-        """Extract publication date from article"""
-        # Common date meta tags and selectors
-        date_selectors = [
-            ('meta', {'property': 'article:published_time'}),
-            ('meta', {'name': 'publication_date'}),
-            ('meta', {'name': 'date'}),
-            ('time', {'class': 'published'}),
-            ('time', {}),
-            ('.publish-date', {}),
-            ('.article-date', {}),
-        ]
+    def extract_article_date(self, soup) -> Optional[str]:
+        """Extract publication date from article (BeautifulSoup or parsed document)"""
+        document = SoupDocument(soup) if isinstance(soup, BeautifulSoup) else soup
 
-        for selector, attrs in date_selectors:
-            element = soup.find(selector, attrs)
-            if element:
-                date_text = element.get('content') or element.get('datetime') or element.get_text()
-                if date_text:
-                    try:
-                        # Try to parse and format the date
-                        return self.parse_date_string(date_text)
-                    except:
-                        return date_text[:10] if len(date_text) >= 10 else date_text
+        # Common date meta tags and selectors (see document_backends.DATE_SELECTORS)
+        date_text = document.date_text()
+        if date_text:
+            return self.parse_date_string(date_text)
 
         return None
 
     def parse_date_string(self, date_str: str) -> str:
-        """Parse various date string formats"""
-        # Try common date formats
-        formats = ['%Y-%m-%d', '%Y/%m/%d', '%d-%m-%Y', '%d/%m/%Y', '%B %d, %Y', '%d %B %Y']
-
-        for fmt in formats:
-            try:
-                dt = datetime.strptime(date_str[:10], fmt)
-                return dt.strftime('%Y-%m-%d')
-            except:
-                continue
+        """Parse various date string formats to YYYY-MM-DD (unknown formats are returned as they are)"""
+        parsed = normalize_date(date_str)
+        return parsed.iso() if parsed else date_str
+
+    def add_forecasts(self, forecasts: List[ForecastData]):
+        """Hand newly extracted forecasts to the sink and/or self.forecasts"""
+        if self.dedupe_index is not None:
+            forecasts = self.dedupe_index.filter(forecasts)
+        self.forecast_count += len(forecasts)
+        if self.sink:
+            self.sink.write(forecasts)
+        if self.keep_forecasts:
+            self.forecasts.extend(forecasts)
 
-        return date_str
+    def stream_to(self, path: str, format: Optional[str] = None, flush_interval: float = 5.0,
+                  keep_forecasts: bool = False):
+        """
+        Write forecasts to a CSV or JSON Lines file as soon as they are extracted
+
+        Args:
+            path: Output file (.csv for CSV, anything else is JSON Lines)
+            format: 'csv' or 'jsonl', overrides the file extension
+            flush_interval: Seconds between flushes to disk
+            keep_forecasts: Also keep the rows in self.forecasts. Off by default,
+                            so memory stays flat on long crawls.
+
+        Returns:
+            The ForecastSink, close it (or use it as a context manager) when done
+        """
+        from forecast_sinks import ForecastSink  # forecast_sinks imports this module
+
+        self.sink = ForecastSink(path, format=format, flush_interval=flush_interval)
+        self.keep_forecasts = keep_forecasts
+        return self.sink
+
+    def dedupe(self, mode: str = 'drop', path: Optional[str] = None):
+        """
+        Leave out forecasts already found on another page
+
+        Rows are keyed on the normalized text around the price, the price or
+        range and the outlook date (see forecast_index.py).
+
+        Args:
+            mode: 'drop' duplicates, or 'merge' them into the row kept
+                  (missing forecast date filled in, URLs in index.sources())
+            path: Optional file the index is kept in across runs
+
+        Returns:
+            The ForecastIndex, close it when done if a path was given
+        """
+        from forecast_index import ForecastIndex  # forecast_index imports this module
+
+        self.dedupe_index = ForecastIndex(mode=mode, path=path)
+        return self.dedupe_index
+
+    def is_duplicate_page(self, url: str, content: bytes) -> bool:
+        """True if the page's rel=canonical URL was already scraped under another address"""
+        return not self.seen_urls.add_canonical(url, find_canonical_link(content, url))
+
+    def scrape_url(self, url: str, source_name: str = None) -> Optional[List[ForecastData]]:
+        """
+        Scrape a single URL
+
+        The URL is fetched as given; pages already scraped under an
+        equivalent URL (same canonical form, see url_canonical.py) are skipped. A URL whose download
+        fails is not marked as seen, so it can be tried again.
+
+        Returns:
+            The forecasts found on the page, None if the page could not be fetched
+        """
+        url = url.strip()
+        if not self.seen_urls.add(url):
+            print(f"Skipping duplicate: {url}")
+            return []
 
-    def scrape_url(self, url: str, source_name: str = None):
-        """Scrape a single URL"""
         if source_name is None:
             source_name = urlparse(url).netloc
 
         print(f"Scraping: {url}")
-        soup = self.fetch_page(url)
+        timing = {}
+        content = self.fetch_html(url, timing=timing)
 
-        if soup:
-            forecasts = self.analyze_article(url, soup, source_name)
-            self.forecasts.extend(forecasts)
-            print(f"  Found {len(forecasts)} forecast entries")
-            time.sleep(1)  # Be polite to servers
+        if not content:
+            self.seen_urls.discard(url)
+            self.record_metrics(url, timing)
+            return None
+
+        if self.is_duplicate_page(url, content):
+            print(f"  Duplicate of an already scraped page (rel=canonical)")
+            self.record_metrics(url, timing)
+            return []
+
+        forecasts = self.extract_from_content(url, content, source_name, timing)
+        self.record_metrics(url, timing)
+        self.add_forecasts(forecasts)
+        if forecasts:
+            record_yield(url)
+        print(f"  Found {len(forecasts)} forecast entries")
+        return forecasts
+
+    def scrape_urls(self, urls: List[str], concurrent: bool = False, max_concurrency: int = 16,
+                    journal=None):
+        """
+        Scrape multiple URLs
+
+        Requests to the same host are spaced by the per-host rate limiter
+        (see rate_limiter.py) in both modes.
+
+        Args:
+            urls: Article URLs to scrape
+            concurrent: If True, keep many requests in flight across hosts
+                        (see scrape_urls_async). Default is one URL at a time.
+            max_concurrency: Maximum requests in flight (concurrent mode only)
+            journal: Optional ScrapeJournal (scrape_journal.py). Every processed
+                     URL is recorded in it, and URLs completed by an earlier run
+                     are skipped - their forecasts are taken from the journal.
+        """
+        if concurrent:
+            asyncio.run(self.scrape_urls_async(urls, max_concurrency, journal))
+            return
+
+        urls = unique_urls(urls)
+        if journal:
+            print(f"Resuming: {len(urls) - len(journal.pending(urls))} of {len(urls)} URLs already done")
 
-    def scrape_urls(self, urls: List[str]):
-        """Scrape multiple URLs"""
         for url in urls:
-            self.scrape_url(url)
+            if journal and journal.is_done(url):
+                self.seen_urls.add(url)
+                self.add_forecasts(journal.forecasts_for(url))
+                continue
+
+            forecasts = self.scrape_url(url)
+            if journal:
+                journal.record(url, forecasts)
+
+    async def scrape_urls_async(self, urls: List[str], max_concurrency: int = 16,
+                                journal=None) -> int:
+        """
+        Scrape multiple URLs concurrently
+
+        Requests to different hosts run in parallel, requests to the same host
+        wait for their slot from the rate limiter on the event loop, so no
+        worker thread is blocked by a slow host. Forecasts are added (and
+        streamed) in the order of the input URLs as soon as all earlier URLs
+        are done, so the result is the same as with the sequential scrape_urls
+        (including the journal, see there).
+
+        Returns:
+            Number of forecasts found
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(max_concurrency)
+        host_locks: Dict[str, asyncio.Lock] = {}
+
+        def fetch_prepaid(url: str, timing: Dict) -> Optional[bytes]:
+            with self.rate_limiter.prepaid():
+                return self.fetch_html(url, timing=timing)
+
+        def served_offline(url: str) -> bool:
+            adapter = self.session.get_adapter(url)
+            return isinstance(adapter, ScraperAdapter) and adapter.serves_offline(url)
+
+        async def scrape_one(executor, url: str) -> List[ForecastData]:
+            if journal and journal.is_done(url):
+                self.seen_urls.add(url)
+                return journal.forecasts_for(url)
+            if not self.seen_urls.add(url):
+                return []
+
+            source_name = urlparse(url).netloc
+
+            # Only one task per host waits for a rate limiter slot at a time,
+            # the others wait on the host lock without taking a worker slot
+            timing = {}
+            if served_offline(url):
+                # Cached pages never touch the host, so they take no rate limiter slot
+                await semaphore.acquire()
+                fetch, delay = self.fetch_html, None
+            else:
+                async with host_locks.setdefault(source_name, asyncio.Lock()):
+                    await semaphore.acquire()
+                    delay = self.rate_limiter.reserve(url)
+                    await asyncio.sleep(delay)
+                fetch = fetch_prepaid
+
+            try:
+                print(f"Scraping: {url}")
+                content = await loop.run_in_executor(executor, fetch, url, timing)
+                if delay is not None:
+                    timing['rate_wait'] = delay  # The prepaid fetch reports no wait
+                if not content:
+                    self.seen_urls.discard(url)
+                    self.record_metrics(url, timing)
+                    if journal:
+                        journal.record(url, None)
+                    return []
+                if self.is_duplicate_page(url, content):
+                    forecasts = []
+                else:
+                    forecasts = await loop.run_in_executor(executor, self.extract_from_content,
+                                                           url, content, source_name, timing)
+            finally:
+                semaphore.release()
+
+            self.record_metrics(url, timing)
+            if journal:
+                journal.record(url, forecasts)
+            if forecasts:
+                record_yield(url)
+            print(f"  Found {len(forecasts)} forecast entries ({url[:60]})")
+            return forecasts
+
+        # Finished pages wait here until all pages before them are done
+        results: Dict[int, List[ForecastData]] = {}
+        next_index = 0
+        found = 0
+
+        async def scrape_in_order(executor, index: int, url: str):
+            nonlocal next_index, found
+            results[index] = await scrape_one(executor, url)
+            while next_index in results:
+                forecasts = results.pop(next_index)
+                self.add_forecasts(forecasts)
+                found += len(forecasts)
+                next_index += 1
+
+        urls = unique_urls(urls)
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            await asyncio.gather(*(scrape_in_order(executor, i, url) for i, url in enumerate(urls)))
+
+        return found
+
+    def scrape_urls_pipelined(self, urls: List[str], fetch_workers: int = 8,
+                              parse_workers: Optional[int] = None, queue_size: int = 64,
+                              journal=None) -> int:
+        """
+        Scrape multiple URLs with a fetch -> parse/extract -> sink pipeline
+
+        Downloads run on fetch_workers threads while parsing and extraction
+        run on a process pool (all cores by default). Use this for large
+        crawls where parsing, not the network, limits throughput. Forecasts
+        are added to self.forecasts in completion order. journal works as in
+        scrape_urls.
+
+        Returns:
+            Number of forecasts found
+        """
+        from scrape_pipeline import ScrapePipeline  # scrape_pipeline imports this module
+
+        pipeline = ScrapePipeline(self, fetch_workers=fetch_workers, parse_workers=parse_workers,
+                                  queue_size=queue_size, journal=journal)
+        return pipeline.run(unique_urls(urls))
+
+    def extract_corpus(self, documents, workers: Optional[int] = None, chunk_size: int = 64):
+        """
+        Re-run extraction over stored documents without fetching them
+
+        Args:
+            documents: Iterable of (url, html_or_text, metadata) tuples
+            workers: Number of worker processes (default: all cores)
+            chunk_size: Documents sent to a worker at once
+
+        Returns:
+            Iterator over the ForecastData rows, in document order. The rows
+            are not added to self.forecasts. See corpus_extraction.py.
+        """
+        from corpus_extraction import extract_corpus  # corpus_extraction imports this module
+
+        return extract_corpus(documents, scraper=self, workers=workers, chunk_size=chunk_size)
 
     def export_to_csv(self, filename: str = 'iron_ore_forecasts.csv'):
         """Export forecasts to CSV"""
@@ -302,11 +549,7 @@ class IronOreForecastScraper:
             return
 
         with open(filename, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=[
-                'source_name', 'source_url', 'forecast_date', 'outlook_date',
-                'price_usd', 'price_range_min', 'price_range_max',
-                'context', 'scraped_date'
-            ])
+            writer = csv.DictWriter(f, fieldnames=FORECAST_FIELDS)
             writer.writeheader()
             for forecast in self.forecasts:
                 writer.writerow(forecast.to_dict())
@@ -329,7 +572,11 @@ class IronOreForecastScraper:
         print(f"\n{'='*60}")
         print(f"Scraping Summary")
         print(f"{'='*60}")
-        print(f"Total forecasts found: {len(self.forecasts)}")
+        print(f"Total forecasts found: {self.forecast_count or len(self.forecasts)}")
+        if self.dedupe_index is not None:
+            print(f"Duplicate forecasts left out: {self.dedupe_index.duplicates}")
+        if self.sink:
+            print(f"Streamed to: {self.sink.path}")
 
         if self.forecasts:
             sources = set(f.source_name for f in self.forecasts)
@@ -341,6 +588,9 @@ class IronOreForecastScraper:
             with_prices = sum(1 for f in self.forecasts if f.price_usd or f.price_range_min)
             print(f"Forecasts with prices: {with_prices}")
 
+        if self.metrics is not None:
+            self.metrics.print_summary()
+
 
 if __name__ == "__main__":
     # Example usage
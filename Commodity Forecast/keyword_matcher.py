@@ -0,0 +1,93 @@
+"""
+Multi-keyword matcher for relevance checks
+Finds any number of keywords in one pass over a text or URL, instead of one
+substring scan per keyword. Used by the scraper, the URL finders, the URL
+filters and the Reddit post filter.
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+
+def _trie_regex(trie: Dict) -> str:
+    """Regex for the keywords stored in a character trie ('' marks a keyword end)"""
+    ends = '' in trie
+    branches = [re.escape(char) + _trie_regex(child) for char, child in sorted(trie.items()) if char]
+
+    if not branches:
+        return ''
+    body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    if ends:
+        # Keyword ends here, longer ones continue: prefer the longer match
+        body = ('(?:' + body + ')?') if len(branches) == 1 else body + '?'
+    return body
+
+
+class KeywordMatcher:
+    """
+    All keywords of a list compiled into one matcher
+
+    The keywords are merged into a trie and compiled to a single regex, so at
+    each position of the text the regex engine follows one trie path (an
+    Aho-Corasick-style scan without per-keyword rescans). Matching is
+    case-insensitive by default, like the `kw in text.lower()` checks it
+    replaces: the text is lowercased and matched against the lowercased
+    keywords (much faster than a re.IGNORECASE regex).
+    """
+
+    def __init__(self, keywords: Iterable[str], ignore_case: bool = True):
+        self.ignore_case = ignore_case
+        self.keywords: Tuple[str, ...] = tuple(dict.fromkeys(
+            keyword.lower() if ignore_case else keyword for keyword in keywords if keyword))
+        self.keyword_set = frozenset(self.keywords)
+
+        trie: Dict = {}
+        for keyword in self.keywords:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[''] = {}
+
+        pattern = _trie_regex(trie)
+        # Matches nothing for an empty keyword list
+        self.regex = re.compile(pattern or r'(?!)')
+        # Longest keyword starting at each position, overlapping matches included
+        self.scanner = re.compile(f"(?=({pattern}))" if pattern else r'(?!)')
+
+    def search(self, text: str) -> Optional[str]:
+        """First keyword found in the text (leftmost, longest), None if there is none"""
+        match = self.regex.search(text.lower() if self.ignore_case else text)
+        return match.group(0) if match else None
+
+    def contains_any(self, *texts: str) -> bool:
+        """True if any of the texts contains any keyword"""
+        search = self.regex.search
+        if self.ignore_case:
+            return any(search(text.lower()) for text in texts)
+        return any(search(text) for text in texts)
+
+    def find_all(self, text: str) -> Set[str]:
+        """All keywords that occur in the text, found in one pass"""
+        keywords = self.keyword_set
+        found = set()
+        for match in self.scanner.finditer(text.lower() if self.ignore_case else text):
+            longest = match.group(1)
+            # Shorter keywords starting at the same position are prefixes of the longest one
+            for length in range(1, len(longest) + 1):
+                if longest[:length] in keywords:
+                    found.add(longest[:length])
+        return found
+
+    def __repr__(self) -> str:
+        return f"KeywordMatcher({list(self.keywords)!r})"
+
+
+@lru_cache(maxsize=64)
+def _cached_matcher(keywords: Tuple[str, ...], ignore_case: bool) -> KeywordMatcher:
+    return KeywordMatcher(keywords, ignore_case)
+
+
+def get_matcher(keywords: Iterable[str], ignore_case: bool = True) -> KeywordMatcher:
+    """Matcher for a keyword list, compiled once per process and keyword set"""
+    return _cached_matcher(tuple(keywords), ignore_case)
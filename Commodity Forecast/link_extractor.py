@@ -0,0 +1,121 @@
+"""
+Link extraction for listing pages
+Collects the <a href> values of a page without building a document tree
+(an lxml parser target that only looks at anchor start tags), resolves them
+against the page URL with the base split only once, and keeps the ones
+matching a site's compiled include/exclude rules
+"""
+
+import re
+from typing import Iterable, Iterator, List, Optional, Union
+from urllib.parse import urljoin, urlsplit
+
+from bs4 import BeautifulSoup
+from lxml import etree
+
+from url_canonical import dedupe_urls
+
+
+# Raw HTML (bytes or str) or an already parsed page
+Page = Union[bytes, str, BeautifulSoup]
+
+
+class _AnchorTarget:
+    """lxml parser target keeping the href of every <a>, no tree is built"""
+
+    def __init__(self):
+        self.hrefs: List[str] = []
+
+    def start(self, tag, attrib):
+        if tag == 'a':
+            href = attrib.get('href')
+            if href is not None:
+                self.hrefs.append(href)
+
+    def end(self, tag):
+        pass
+
+    def data(self, data):
+        pass
+
+    def close(self) -> List[str]:
+        return self.hrefs
+
+
+def anchor_hrefs(page: Page) -> List[str]:
+    """href values of all <a> elements, in page order"""
+    if isinstance(page, BeautifulSoup):
+        return [link['href'] for link in page.find_all('a', href=True)]
+    if not page:
+        return []
+
+    parser = etree.HTMLParser(target=_AnchorTarget())
+    try:
+        return etree.fromstring(page, parser)
+    except etree.XMLSyntaxError:
+        return []  # Nothing parseable
+
+
+def resolve_links(hrefs: Iterable[str], base_url: str) -> Iterator[str]:
+    """
+    Absolute URLs of hrefs, same results as urljoin(base_url, href)
+
+    Absolute and root-relative links, the bulk of a listing page, are joined
+    with string operations; everything else goes through urljoin.
+    """
+    base = urlsplit(base_url)
+    scheme = base.scheme + ':'
+    origin = f"{base.scheme}://{base.netloc}"
+
+    for href in hrefs:
+        if href.startswith(('http://', 'https://')) and href.startswith(scheme):
+            yield href
+        elif href.startswith('/') and not href.startswith('//') and '/.' not in href and base.netloc:
+            yield origin + href
+        else:
+            yield urljoin(base_url, href)
+
+
+def _any_of(patterns: Iterable[str]) -> Optional['re.Pattern']:
+    """One regex finding any of the substrings, None for an empty list"""
+    patterns = [p for p in patterns if p]
+    if not patterns:
+        return None
+    # Longest first, so a longer pattern is not shadowed by its prefix
+    return re.compile('|'.join(re.escape(p) for p in sorted(set(patterns), key=len, reverse=True)))
+
+
+class LinkRules:
+    """
+    Which links of a site are articles: compiled include/exclude substrings
+
+    A URL matches if it contains the domain, none of the exclude substrings
+    and (if any are given) one of the include substrings. Each list is
+    compiled to a single regex, so a URL is checked in one pass per list.
+    """
+
+    def __init__(self, domain: str, include: Iterable[str] = (), exclude: Iterable[str] = ()):
+        """
+        Args:
+            domain: Substring every kept URL contains (e.g. 'mining.com')
+            include: Kept URLs contain one of these (empty: no restriction)
+            exclude: Kept URLs contain none of these
+        """
+        self.domain = domain
+        self.include = _any_of(include)
+        self.exclude = _any_of(exclude)
+
+    def matches(self, url: str) -> bool:
+        if self.domain not in url:
+            return False
+        if self.exclude is not None and self.exclude.search(url):
+            return False
+        return self.include is None or self.include.search(url) is not None
+
+    def filter(self, urls: Iterable[str]) -> List[str]:
+        """Matching URLs in canonical form, duplicates removed, page order kept"""
+        return dedupe_urls(url for url in urls if self.matches(url))
+
+    def extract(self, page: Page, base_url: str) -> List[str]:
+        """Matching links of a page (raw HTML or a parsed soup)"""
+        return self.filter(resolve_links(anchor_hrefs(page), base_url))
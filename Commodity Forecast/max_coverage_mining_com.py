@@ -4,39 +4,67 @@ Searches extensively - designed to run for extended periods
 Adjust max_pages based on how long you want to run
 """
 
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin
-import time
+from http_client import create_session
+from url_canonical import UrlSet, dedupe_urls
+from link_extractor import LinkRules
+from crawl_budget import budget_allows, budget_from_args, finish_domain
+from category_watermark import open_watermark
+from rate_limiter import get_rate_limiter
+from scrape_metrics import ScrapeMetrics, estimate_scrape_seconds
 from datetime import datetime
 
 
-def get_urls_from_category(category_url, max_pages=50):
+# Links counted as articles on a category page
+ARTICLE_LINKS = LinkRules(
+    'mining.com',
+    # Check if it looks like an article
+    include=[
+        '-', '/web/'
+    ],
+    # Exclude non-article pages
+    exclude=[
+        '/commodity/', '/category/', '/tag/', '/region/',
+        '/jobs', '/ranking', '/advertise', '/contact',
+        '/press-release', '/markets/', '/about',
+        '/privacy', '/terms', '/wp-content', '/wp-admin',
+        '/video/'  # Skip videos unless you want them
+    ],
+)
+
+
+def get_urls_from_category(category_url, max_pages=50, watermark=None):
     """
     Get all article URLs from a specific category with pagination
 
     Args:
         category_url: The category page URL
         max_pages: Maximum number of pages to check (default 50, can go much higher)
+        watermark: Optional CategoryWatermark; paging stops at the first page
+                   that lists only articles found in earlier runs
     """
     print(f"\n{'='*80}")
     print(f"Extracting URLs from: {category_url}")
     print(f"Max pages to check: {max_pages}")
     print(f"{'='*80}")
 
-    all_urls = []
+    all_urls = UrlSet()
 
-    session = requests.Session()
-    session.headers.update({
+    session = create_session({
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
     })
 
+    complete = True
+
     for page in range(1, max_pages + 1):
         if page == 1:
             page_url = category_url
         else:
             page_url = f"{category_url}page/{page}/"
 
+        if not budget_allows(page_url):
+            complete = False
+            break
+
         print(f"  Page {page}/{max_pages}: ", end='', flush=True)
 
         try:
@@ -47,28 +75,14 @@ def get_urls_from_category(category_url, max_pages=50):
                 break
 
             response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
 
             # Extract article URLs
-            page_urls = []
-            for link in soup.find_all('a', href=True):
-                url = urljoin(category_url, link['href'])
-
-                if 'mining.com' in url and url not in all_urls:
-                    # Exclude non-article pages
-                    exclude_patterns = [
-                        '/commodity/', '/category/', '/tag/', '/region/',
-                        '/jobs', '/ranking', '/advertise', '/contact',
-                        '/press-release', '/markets/', '/about',
-                        '/privacy', '/terms', '/wp-content', '/wp-admin',
-                        '/video/'  # Skip videos unless you want them
-                    ]
-
-                    if not any(pattern in url for pattern in exclude_patterns):
-                        # Check if it looks like an article
-                        if '-' in url or '/web/' in url:
-                            page_urls.append(url)
-                            all_urls.append(url)
+            page_articles = ARTICLE_LINKS.extract(response.content, category_url)
+            page_urls = [url for url in page_articles if all_urls.add(url)]
+
+            if watermark is not None and watermark.is_known_page(category_url, page_articles):
+                print(f"only articles from earlier runs, stopping")
+                break
 
             if len(page_urls) > 0:
                 print(f"found {len(page_urls)} URLs (total: {len(all_urls)})")
@@ -76,31 +90,34 @@ def get_urls_from_category(category_url, max_pages=50):
                 print(f"no articles found, stopping")
                 break
 
-            time.sleep(1)  # Be polite - 1 second delay between pages
-
         except Exception as e:
             print(f"error: {e}")
+            complete = False
             break
 
+    if watermark is not None:
+        watermark.record(category_url, all_urls, complete)
+
     print(f"\n→ Total unique URLs from this category: {len(all_urls)}")
-    return all_urls
+    return list(all_urls)
 
 
-def search_maximum_categories(pages_per_category=50):
+def search_maximum_categories(pages_per_category=50, incremental=False):
     """
     Search ALL relevant categories extensively
 
     Args:
         pages_per_category: How many pages to check in each category
                           Default 50, can increase to 100+ for maximum coverage
+        incremental: Stop paging a category at the first page with only URLs
+                     from earlier runs (see category_watermark.py)
     """
     print("\n" + "#"*80)
     print("# MAXIMUM COVERAGE MINING.COM SCRAPER")
     print("#"*80)
     print(f"\nConfiguration:")
     print(f"  - Pages per category: {pages_per_category}")
-    print(f"  - Delay between pages: 1 second")
-    print(f"  - Delay between categories: 2 seconds")
+    print(f"  - Rate limit: 1 request/second per host (rate_limiter.py)")
 
     # Calculate estimated time
     num_categories = 13  # See below
@@ -116,7 +133,8 @@ def search_maximum_categories(pages_per_category=50):
         return []
 
     start_time = datetime.now()
-    all_urls = []
+    all_urls = UrlSet()
+    watermark = open_watermark(incremental)
 
     # COMPREHENSIVE category list - all relevant sections
     categories = {
@@ -151,22 +169,20 @@ def search_maximum_categories(pages_per_category=50):
         print(f"\n[{i}/{len(categories)}] Category: {name}")
         print(f"URL: {url}")
 
-        urls = get_urls_from_category(url, max_pages=pages_per_category)
+        urls = get_urls_from_category(url, max_pages=pages_per_category, watermark=watermark)
 
         if urls:
-            all_urls.extend(urls)
+            all_urls.update(urls)
             print(f"✓ Added {len(urls)} URLs from {name}")
         else:
             print(f"✗ No URLs found in {name}")
 
         # Progress update
         elapsed = (datetime.now() - start_time).total_seconds()
-        print(f"Running for: {elapsed/60:.1f} minutes | Total URLs so far: {len(list(set(all_urls)))}")
-
-        time.sleep(2)  # Be polite between categories
+        print(f"Running for: {elapsed/60:.1f} minutes | Total URLs so far: {len(all_urls)}")
 
-    # Remove duplicates
-    all_urls = list(set(all_urls))
+    all_urls = list(all_urls)
+    finish_domain('https://www.mining.com/')
 
     elapsed = (datetime.now() - start_time).total_seconds()
 
@@ -213,12 +229,14 @@ def scrape_all_urls(url_file):
 
     try:
         with open(url_file, 'r', encoding='utf-8') as f:
-            urls = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+            urls = dedupe_urls(line.strip() for line in f if line.strip() and not line.startswith('#'))
 
-        print(f"\nLoaded {len(urls)} URLs from {url_file}")
+        print(f"\nLoaded {len(urls)} unique URLs from {url_file}")
 
-        # Estimate scraping time
-        estimated_time = len(urls) * 1.5  # ~1.5 seconds per URL on average
+        # Estimate scraping time from the host rate limits and the timings of earlier runs
+        metrics_file = ScrapeMetrics.job_path(url_file)
+        estimated_time = estimate_scrape_seconds(urls, get_rate_limiter(), concurrent=True,
+                                                 metrics_file=metrics_file)
         print(f"Estimated scraping time: {estimated_time/60:.0f} minutes ({estimated_time/3600:.1f} hours)")
 
         response = input("\nProceed with scraping? (y/n): ")
@@ -230,11 +248,21 @@ def scrape_all_urls(url_file):
         print("This will take a while...\n")
 
         from iron_ore_scraper import IronOreForecastScraper
+        from scrape_journal import ScrapeJournal
 
         start_time = datetime.now()
 
-        scraper = IronOreForecastScraper()
-        scraper.scrape_urls(urls)
+        scraper = IronOreForecastScraper(metrics=ScrapeMetrics(metrics_file))
+        scraper.dedupe()  # The same headline shows up on several listing/category pages
+
+        # Progress is journaled, an interrupted run continues where it stopped
+        journal_file = ScrapeJournal.job_path(url_file)
+        with ScrapeJournal(journal_file) as journal, scraper.metrics:
+            try:
+                scraper.scrape_urls(urls, concurrent=True, journal=journal)  # Many hosts in flight, 1s per host
+            except KeyboardInterrupt:
+                print(f"\nInterrupted - progress saved to {journal_file}, run again to resume")
+                return
 
         elapsed = (datetime.now() - start_time).total_seconds()
 
@@ -316,6 +344,8 @@ def main():
     pages = input("\nEnter pages per category (default 50): ").strip()
     pages_per_category = int(pages) if pages.isdigit() else 50
 
+    incremental = input("Incremental (stop at pages already seen in earlier runs)? (y/n): ").strip().lower() == 'y'
+
     print("\nWhat would you like to do?")
     print("1. Search for URLs (Step 1)")
     print("2. Scrape existing URL file (Step 2)")
@@ -324,7 +354,7 @@ def main():
     choice = input("\nEnter choice (1-3): ").strip()
 
     if choice == "1":
-        urls, filename = search_maximum_categories(pages_per_category)
+        urls, filename = search_maximum_categories(pages_per_category, incremental)
 
         if urls:
             print(f"\n{'='*80}")
@@ -360,7 +390,7 @@ def main():
 
     elif choice == "3":
         # Complete workflow
-        urls, filename = search_maximum_categories(pages_per_category)
+        urls, filename = search_maximum_categories(pages_per_category, incremental)
 
         if urls:
             print(f"\nStep 1 complete: {len(urls)} URLs found")
@@ -369,4 +399,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with budget_from_args():
+        main()
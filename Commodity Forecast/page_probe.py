@@ -0,0 +1,152 @@
+"""
+Relevance probe for candidate pages
+Streams the start of a page and stops reading as soon as the <title>, the
+meta description and the opening body text are in, so candidates can be
+filtered on that prefix without downloading and parsing the whole document.
+Pages that pass are fetched in full later (by the scraper).
+"""
+
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+import requests
+from lxml import etree
+
+from scrape_metrics import fetch_timing
+
+
+# Characters of body text read before deciding (the filters used to check the first 1000)
+PROBE_TEXT_CHARS = 1000
+
+# Bytes read at most, e.g. for pages with large inline scripts before the body text
+MAX_PROBE_BYTES = 256 * 1024
+
+# Bytes read from the network at a time
+CHUNK_SIZE = 16 * 1024
+
+# Elements whose content is not page text
+_SKIPPED_TAGS = {'script', 'style', 'noscript', 'template', 'svg'}
+
+
+class PageHead(NamedTuple):
+    url: str
+    title: str
+    description: str
+    text: str           # Opening body text, up to PROBE_TEXT_CHARS characters
+    bytes_read: int
+    complete: bool      # True if the whole page was read
+
+    @property
+    def summary(self) -> str:
+        """Title, description and opening text in one string, for keyword checks"""
+        return ' '.join(part for part in (self.title, self.description, self.text) if part)
+
+
+class _HeadTarget:
+    """lxml parser target collecting title, meta description and the first body text"""
+
+    def __init__(self, text_chars: int):
+        self.text_chars = text_chars
+        self.title: List[str] = []
+        self.description = ''
+        self.text: List[str] = []
+        self.text_length = 0
+        self.in_title = False
+        self.title_done = False
+        self.in_body = False
+        self.skip_depth = 0
+
+    @property
+    def done(self) -> bool:
+        """Enough read: the head is over and the opening text is complete"""
+        return self.in_body and self.text_length >= self.text_chars
+
+    def start(self, tag, attrib):
+        if tag in _SKIPPED_TAGS:
+            self.skip_depth += 1
+        elif tag == 'title' and not self.title_done:
+            self.in_title = True
+        elif tag == 'meta' and not self.description:
+            name = (attrib.get('name') or attrib.get('property') or '').lower()
+            if name in ('description', 'og:description'):
+                self.description = ' '.join((attrib.get('content') or '').split())
+        elif tag == 'body':
+            self.in_body = True
+
+    def end(self, tag):
+        if tag in _SKIPPED_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+        elif tag == 'title' and self.in_title:
+            self.in_title = False
+            self.title_done = True
+
+    def data(self, data):
+        if self.in_title:
+            self.title.append(data)
+        elif self.in_body and not self.skip_depth and self.text_length < self.text_chars:
+            text = data.strip()
+            if text:
+                self.text.append(text)
+                self.text_length += len(text) + 1
+
+    def close(self):
+        return self
+
+
+def probe_page(session: requests.Session, url: str, text_chars: int = PROBE_TEXT_CHARS,
+               max_bytes: int = MAX_PROBE_BYTES, timing: Optional[Dict] = None) -> PageHead:
+    """
+    Read the start of a page until title, description and opening text are known
+
+    Raises the request errors of session.get (and HTTPError for error statuses).
+
+    Args:
+        session: Session from http_client.create_session
+        url: Page to probe
+        text_chars: Characters of body text to collect
+        max_bytes: Stop after this many bytes even if the text is incomplete
+        timing: Dict that receives fetch/parse metrics (as for scrape_metrics), if given
+    """
+    start = time.perf_counter()
+    response = session.get(url, timeout=30, stream=True)
+    parse = 0.0
+    bytes_read = 0
+    complete = False
+    try:
+        response.raise_for_status()
+
+        # Without a declared charset lxml looks for a <meta charset> itself
+        content_type = response.headers.get('Content-Type', '').lower()
+        encoding = response.encoding if 'charset' in content_type else None
+        target = _HeadTarget(text_chars)
+        parser = etree.HTMLParser(target=target, encoding=encoding)
+
+        chunks = response.iter_content(CHUNK_SIZE)
+        for chunk in chunks:
+            bytes_read += len(chunk)
+            parse_start = time.perf_counter()
+            parser.feed(chunk)
+            parse += time.perf_counter() - parse_start
+            if target.done or bytes_read >= max_bytes:
+                break
+        else:
+            complete = True
+
+        try:
+            parser.close()
+        except etree.XMLSyntaxError:
+            pass  # Empty or cut-off document, keep what was collected
+    finally:
+        response.close()
+        if timing is not None:
+            timing.update(fetch_timing(response, time.perf_counter() - start - parse, size=bytes_read),
+                          parse=parse)
+
+    return PageHead(
+        url=url,
+        title=' '.join(''.join(target.title).split()),
+        description=target.description,
+        text=' '.join(target.text)[:text_chars],
+        bytes_read=bytes_read,
+        complete=complete,
+    )
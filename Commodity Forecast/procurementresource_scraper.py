@@ -3,37 +3,34 @@ Procurement Resource Scraper - Iron Ore Forecasts and Reports
 Same expanded approach as Trading Economics and IndexMundi
 """
 
-import requests
+from http_client import create_session
+from url_canonical import UrlSet
+from link_extractor import LinkRules
+from crawl_budget import budget_allows, budget_from_args, finish_domain
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
-import time
 from datetime import datetime
 
 
-def extract_article_urls(soup, base_url):
-    """Extract article URLs from Procurement Resource page"""
-    urls = []
+# Links kept by extract_article_urls
+ARTICLE_LINKS = LinkRules(
+    'procurementresource.com',
+    # Include reports, price trends, news, resources
+    include=[
+        '/resource', '/reports', '/price-trends', '/websearch', '/industries', '/news',
+        '/blog', '/market', '/forecast'
+    ],
+    # Exclude non-content pages
+    exclude=[
+        '/login', '/register', '/signup', '/contact', '/about', '/privacy', '/terms',
+        '/cookie', '/dashboard', '/account', '/user'
+    ],
+)
 
-    for link in soup.find_all('a', href=True):
-        url = urljoin(base_url, link['href'])
 
-        # Filter for Procurement Resource content
-        if 'procurementresource.com' in url and url not in urls:
-            # Exclude non-content pages
-            exclude_patterns = [
-                '/login', '/register', '/signup', '/contact',
-                '/about', '/privacy', '/terms', '/cookie',
-                '/dashboard', '/account', '/user'
-            ]
-
-            if not any(pattern in url for pattern in exclude_patterns):
-                # Include reports, price trends, news, resources
-                if any(pattern in url for pattern in ['/resource', '/reports', '/price-trends',
-                                                      '/websearch', '/industries', '/news',
-                                                      '/blog', '/market', '/forecast']):
-                    urls.append(url)
-
-    return urls
+def extract_article_urls(page, base_url):
+    """Extract article URLs from Procurement Resource page (raw HTML or a parsed soup)"""
+    return ARTICLE_LINKS.extract(page, base_url)
 
 
 def get_direct_iron_ore_pages():
@@ -105,8 +102,7 @@ def search_procurementresource(max_crawl=50):
     print("# PROCUREMENT RESOURCE IRON ORE SCRAPER (EXPANDED)")
     print("#"*80)
 
-    session = requests.Session()
-    session.headers.update({
+    session = create_session({
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
         'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
         'Accept-Language': 'en-US,en;q=0.9',
@@ -157,7 +153,6 @@ def search_procurementresource(max_crawl=50):
                         all_urls.add(full_url)
 
             print(f"  Found {len(all_urls)} total URLs so far")
-            time.sleep(2)
 
         except Exception as e:
             print(f"  Error: {e}")
@@ -170,11 +165,13 @@ def search_procurementresource(max_crawl=50):
     print(f"\nCrawling {min(len(all_urls), max_crawl)} pages to find sublinks...")
 
     urls_to_crawl = list(all_urls.copy())
-    crawled = set()
+    crawled = UrlSet()
 
     for i, page_url in enumerate(urls_to_crawl[:max_crawl], 1):
         if page_url in crawled:
             continue
+        if not budget_allows(page_url):
+            break
 
         print(f"[{i}/{max_crawl}] Crawling: {page_url[:60]}... ", end='', flush=True)
         crawled.add(page_url)
@@ -210,8 +207,6 @@ def search_procurementresource(max_crawl=50):
             else:
                 print(f"no new links")
 
-            time.sleep(1.5)
-
         except Exception as e:
             print(f"error: {e}")
 
@@ -246,6 +241,8 @@ def search_procurementresource(max_crawl=50):
 
     all_urls = list(all_urls)
 
+    finish_domain('https://www.procurementresource.com/')
+
     print(f"\n{'='*80}")
     print(f"SEARCH COMPLETE")
     print(f"{'='*80}")
@@ -401,4 +398,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with budget_from_args():
+        main()
@@ -5,6 +5,7 @@ Goes directly to iron ore category instead of crawling everything
 
 from url_finder import IronOreArticleFinder
 from iron_ore_scraper import IronOreForecastScraper
+from crawl_budget import budget_from_args
 
 
 def scrape_mining_com_iron_ore():
@@ -98,4 +99,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with budget_from_args():
+        main()
@@ -0,0 +1,154 @@
+"""
+Per-host rate limiting for all fetch paths
+One token bucket per host, so waiting only happens when the same host
+would otherwise be hit too fast
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+
+# Requests per second and burst size per domain (subdomains included).
+# These replace the delays that used to be hard-coded in each collector.
+DEFAULT_DOMAIN_LIMITS: Dict[str, Tuple[float, int]] = {
+    'reddit.com': (0.5, 1),           # 2 seconds between requests
+    'steelorbis.com': (1 / 1.5, 1),
+    'gmk.center': (1 / 1.5, 1),
+    'indexmundi.com': (1 / 1.5, 1),
+    'procurementresource.com': (1 / 1.5, 1),
+    'tradingeconomics.com': (1 / 1.5, 1),
+    'capital.com': (2.0, 2),
+    'mining.com': (1.0, 2),
+}
+
+DEFAULT_RATE = 1.0   # requests per second for hosts without an explicit limit
+DEFAULT_BURST = 1
+
+
+class TokenBucket:
+    """Token bucket that hands out time slots instead of rejecting requests"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def reserve(self) -> float:
+        """
+        Take one token and return how many seconds the caller has to wait
+
+        Tokens may go negative: each caller then gets the next free slot, so
+        concurrent callers are spaced 1/rate seconds apart.
+        """
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def defer(self, seconds: float):
+        """Make the next free slot at least seconds from now (e.g. after a 429)"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens = min(self.tokens, 1 - seconds * self.rate)
+
+
+class HostRateLimiter:
+    """
+    Rate-limiting scheduler keyed by host
+
+    Limits are looked up by domain suffix, so a limit for 'mining.com' also
+    covers 'www.mining.com'. Thread-safe; one instance is shared by all
+    sessions created with http_client.create_session.
+    """
+
+    def __init__(self, default_rate: float = DEFAULT_RATE, default_burst: int = DEFAULT_BURST,
+                 domain_limits: Optional[Dict[str, Tuple[float, int]]] = None):
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self.domain_limits = dict(DEFAULT_DOMAIN_LIMITS if domain_limits is None else domain_limits)
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def configure(self, domain: str, rate: float, burst: int = 1):
+        """Set the limit for a domain (applies to hosts seen from now on)"""
+        with self.lock:
+            self.domain_limits[domain.lower()] = (rate, burst)
+            # Drop existing buckets of this domain so the new limit is used
+            for host in [h for h in self.buckets if self._matches(h, domain.lower())]:
+                del self.buckets[host]
+
+    @staticmethod
+    def _matches(host: str, domain: str) -> bool:
+        return host == domain or host.endswith('.' + domain)
+
+    def limit_for(self, host: str) -> Tuple[float, int]:
+        """Get (rate, burst) for a host, the most specific domain wins"""
+        matches = [d for d in self.domain_limits if self._matches(host, d)]
+        if not matches:
+            return self.default_rate, self.default_burst
+        return self.domain_limits[max(matches, key=len)]
+
+    def _bucket(self, url: str) -> TokenBucket:
+        host = (urlparse(url).hostname or '').lower()
+        bucket = self.buckets.get(host)
+        if bucket is None:
+            bucket = self.buckets[host] = TokenBucket(*self.limit_for(host))
+        return bucket
+
+    def reserve(self, url: str) -> float:
+        """Reserve the next slot for the URL's host, returns the seconds to wait"""
+        with self.lock:
+            return self._bucket(url).reserve()
+
+    def defer(self, url: str, seconds: float):
+        """
+        Hold back all requests to the URL's host for the given time
+
+        Used when a host throttles us (429 / Retry-After): every request to it,
+        not just the one being retried, waits - and afterwards the normal rate
+        applies again straight away.
+        """
+        with self.lock:
+            self._bucket(url).defer(seconds)
+
+    def wait(self, url: str) -> float:
+        """Block until a request to the URL's host is allowed, returns the time waited"""
+        if getattr(self.local, 'prepaid', False):
+            return 0.0
+
+        delay = self.reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    @contextmanager
+    def prepaid(self):
+        """
+        Skip waiting in this thread, for callers that already waited for their
+        slot themselves (e.g. with asyncio.sleep on the value of reserve())
+        """
+        self.local.prepaid = True
+        try:
+            yield
+        finally:
+            self.local.prepaid = False
+
+
+_default_limiter: Optional[HostRateLimiter] = None
+_default_lock = threading.Lock()
+
+
+def get_rate_limiter() -> HostRateLimiter:
+    """Get the process-wide limiter shared by all sessions"""
+    global _default_limiter
+    with _default_lock:
+        if _default_limiter is None:
+            _default_limiter = HostRateLimiter()
+        return _default_limiter
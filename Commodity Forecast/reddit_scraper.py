@@ -3,8 +3,10 @@ Reddit Scraper - Iron Ore Discussions and Forecasts
 Uses Reddit's JSON API (no authentication required for public data)
 """
 
-import requests
-import time
+from http_client import create_session
+from keyword_matcher import get_matcher
+from corpus_extraction import scan_texts
+from crawl_budget import budget_from_args
 from datetime import datetime
 import json
 
@@ -26,8 +28,7 @@ def search_reddit_posts(query, subreddit=None, max_results=100, sort='relevance'
 
     all_posts = []
 
-    session = requests.Session()
-    session.headers.update({
+    session = create_session({
         'User-Agent': 'IronOreResearchBot/1.0 (Educational Research)'
     })
 
@@ -59,12 +60,7 @@ def search_reddit_posts(query, subreddit=None, max_results=100, sort='relevance'
         try:
             print(f"Fetching posts {retrieved+1}-{min(retrieved+25, max_results)}... ", end='', flush=True)
 
-            response = session.get(base_url, params=params, timeout=30)
-
-            if response.status_code == 429:
-                print("Rate limited, waiting 60 seconds...")
-                time.sleep(60)
-                continue
+            response = session.get(base_url, params=params, timeout=30)  # 429s are retried by the session
 
             response.raise_for_status()
 
@@ -98,8 +94,6 @@ def search_reddit_posts(query, subreddit=None, max_results=100, sort='relevance'
                 print("No more pages available")
                 break
 
-            time.sleep(2)  # Reddit rate limiting - be polite
-
         except Exception as e:
             print(f"Error: {e}")
             break
@@ -123,8 +117,7 @@ def get_subreddit_posts(subreddit, sort='new', limit=100):
 
     all_posts = []
 
-    session = requests.Session()
-    session.headers.update({
+    session = create_session({
         'User-Agent': 'IronOreResearchBot/1.0 (Educational Research)'
     })
 
@@ -146,12 +139,7 @@ def get_subreddit_posts(subreddit, sort='new', limit=100):
         try:
             print(f"Fetching posts {retrieved+1}-{min(retrieved+25, limit)}... ", end='', flush=True)
 
-            response = session.get(base_url, params=params, timeout=30)
-
-            if response.status_code == 429:
-                print("Rate limited, waiting 60 seconds...")
-                time.sleep(60)
-                continue
+            response = session.get(base_url, params=params, timeout=30)  # 429s are retried by the session
 
             if response.status_code == 404:
                 print(f"Subreddit r/{subreddit} not found")
@@ -188,8 +176,6 @@ def get_subreddit_posts(subreddit, sort='new', limit=100):
             if not after:
                 break
 
-            time.sleep(2)
-
         except Exception as e:
             print(f"Error: {e}")
             break
@@ -220,13 +206,18 @@ def filter_iron_ore_posts(posts):
         'bull', 'bear', 'rally', 'crash'
     ]
 
+    # One pass over each post finds the keywords of both lists
+    matcher = get_matcher(iron_ore_keywords + forecast_keywords)
+    iron_ore_set = set(iron_ore_keywords)
+    forecast_set = set(forecast_keywords)
+
     filtered = []
 
     for post in posts:
-        text = (post['title'] + ' ' + post['selftext']).lower()
+        hits = matcher.find_all(post['title'] + ' ' + post['selftext'])
 
-        has_iron_ore = any(kw in text for kw in iron_ore_keywords)
-        has_forecast = any(kw in text for kw in forecast_keywords)
+        has_iron_ore = not hits.isdisjoint(iron_ore_set)
+        has_forecast = not hits.isdisjoint(forecast_set)
 
         if has_iron_ore:
             post['has_forecast_keywords'] = has_forecast
@@ -268,7 +259,6 @@ def search_iron_ore_comprehensive():
     for query in search_queries:
         posts = search_reddit_posts(query, max_results=50, sort='relevance', time_filter='all')
         all_posts.extend(posts)
-        time.sleep(3)  # Be polite
 
     # Strategy 2: Relevant subreddits
     print("\n" + "="*80)
@@ -294,7 +284,6 @@ def search_iron_ore_comprehensive():
                 sort='relevance'
             )
             all_posts.extend(posts)
-            time.sleep(3)
         except Exception as e:
             print(f"  Error with r/{subreddit}: {e}")
 
@@ -375,68 +364,33 @@ def save_reddit_posts(posts, filename_prefix='reddit_iron_ore'):
     return json_file, csv_file, urls_file
 
 
-def extract_forecasts_from_reddit(posts):
+def extract_forecasts_from_reddit(posts, workers=None):
     """
     Extract forecast information directly from Reddit posts
-    (Uses the same patterns as iron_ore_scraper but adapted for Reddit)
+    (Same extraction engine and patterns as iron_ore_scraper; large batches
+    of posts are spread over all cores, see corpus_extraction.scan_texts)
+
+    Args:
+        posts: Posts from search_reddit_posts / get_subreddit_posts
+        workers: Number of worker processes (default: all cores)
     """
     print(f"\n{'='*80}")
     print(f"EXTRACTING FORECASTS FROM {len(posts)} REDDIT POSTS")
     print(f"{'='*80}")
 
-    import re
-
     forecasts = []
 
-    # Price patterns
-    price_patterns = [
-        r'\$(\d+(?:\.\d{1,2})?)\s*(?:per|/|a)?\s*(?:tonne|ton|mt|t)?',
-        r'(\d+(?:\.\d{1,2})?)\s*(?:USD|dollars)',
-        r'price[s]?\s+(?:of|at|to|around|near)\s+\$?(\d+(?:\.\d{1,2})?)',
-    ]
-
-    # Date patterns
-    date_patterns = [
-        r'(?:in|by|for)\s+(January|February|March|April|May|June|July|August|September|October|November|December)\s+(\d{4})',
-        r'(?:in|by|for|end of)\s+(\d{4})',
-        r'(Q[1-4])\s+(\d{4})',
-        r'next\s+(year|quarter|month)',
-    ]
-
-    for post in posts:
-        text = post['title'] + ' ' + post['selftext']
-        text_lower = text.lower()
-
-        # Check for iron ore mention
-        if 'iron ore' not in text_lower and 'iron-ore' not in text_lower:
-            continue
+    # Only posts mentioning iron ore
+    iron_ore = get_matcher(['iron ore', 'iron-ore'])
+    texts = [post['title'] + ' ' + post['selftext'] for post in posts]
+    candidates = [(post, text) for post, text in zip(posts, texts) if iron_ore.contains_any(text)]
 
-        # Extract prices
+    scanned = scan_texts((text for _, text in candidates), workers=workers)
+    for (post, text), (prices, dates) in zip(candidates, scanned):
         prices_found = []
-        for pattern in price_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                try:
-                    if isinstance(match, tuple):
-                        price = float(match[0])
-                    else:
-                        price = float(match)
-
-                    # Filter reasonable iron ore prices
-                    if 20 <= price <= 300:
-                        prices_found.append(price)
-                except:
-                    pass
-
-        # Extract dates
-        dates_found = []
-        for pattern in date_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                if isinstance(match, tuple):
-                    dates_found.append(' '.join(match))
-                else:
-                    dates_found.append(match)
+        for price in prices:
+            prices_found.extend([price.min, price.max] if price.kind == 'range' else [price.price])
+        dates_found = [date.parsed for date in dates]
 
         # If we found prices and dates, this is likely a forecast
         if prices_found and dates_found:
@@ -573,4 +527,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with budget_from_args():
+        main()
@@ -0,0 +1,155 @@
+"""
+Retry policy for all fetch paths
+Exponential backoff with jitter, Retry-After support, per-status rules and a
+retry budget, applied centrally by http_client.ScraperAdapter
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+import requests
+
+
+# Status code -> maximum retries. Codes not listed are never retried.
+DEFAULT_STATUS_RULES: Dict[int, int] = {
+    408: 3,   # Request Timeout
+    425: 3,   # Too Early
+    429: 6,   # Too Many Requests (throttled - usually with Retry-After)
+    500: 2,
+    502: 4,
+    503: 4,
+    504: 4,
+}
+
+# Connection errors and timeouts are retried like this many times
+DEFAULT_ERROR_RETRIES = 3
+
+# Only idempotent requests are repeated
+RETRY_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class RetryBudget:
+    """
+    Limits retries to a share of all requests, so a site that is down does
+    not multiply the traffic (and the run time) by the retry count
+    """
+
+    def __init__(self, ratio: float = 0.2, min_retries: int = 20):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.requests = 0
+        self.retries = 0
+        self.lock = threading.Lock()
+
+    def record_request(self):
+        with self.lock:
+            self.requests += 1
+
+    def try_spend(self) -> bool:
+        """Take one retry from the budget, False if it is used up"""
+        with self.lock:
+            if self.retries >= self.min_retries + self.ratio * self.requests:
+                return False
+            self.retries += 1
+            return True
+
+
+class RetryPolicy:
+    """
+    Decides whether and when a failed request is repeated
+
+    The delay is full-jitter exponential backoff (random between 0 and
+    backoff_base * 2**attempt, capped at backoff_max), or the server's
+    Retry-After if it sends one.
+    """
+
+    def __init__(self, status_rules: Optional[Dict[int, int]] = None,
+                 error_retries: int = DEFAULT_ERROR_RETRIES,
+                 backoff_base: float = 1.0, backoff_max: float = 60.0,
+                 max_retry_after: float = 300.0,
+                 budget: Optional[RetryBudget] = None):
+        """
+        Args:
+            status_rules: Status code -> maximum retries (default DEFAULT_STATUS_RULES)
+            error_retries: Maximum retries after a connection error or timeout
+            backoff_base: First backoff step in seconds
+            backoff_max: Longest backoff in seconds
+            max_retry_after: Give up instead of honoring a longer Retry-After
+            budget: Shared retry budget (default: 20% of requests, at least 20)
+        """
+        self.status_rules = dict(DEFAULT_STATUS_RULES if status_rules is None else status_rules)
+        self.error_retries = error_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retry_after = max_retry_after
+        self.budget = budget or RetryBudget()
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter delay before retry number attempt (starting at 0)"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    @staticmethod
+    def retry_after(response: requests.Response) -> Optional[float]:
+        """Seconds from the Retry-After header (delta-seconds or HTTP date), or None"""
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def max_retries(self, method: str, response: Optional[requests.Response] = None,
+                    error: Optional[Exception] = None) -> int:
+        """How often a request that got this response (or error) may be retried"""
+        if method.upper() not in RETRY_METHODS:
+            return 0
+        if error is not None:
+            if isinstance(error, requests.exceptions.SSLError):
+                return 0
+            if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+                return self.error_retries
+            return 0
+        return self.status_rules.get(response.status_code, 0)
+
+    def delay(self, attempt: int, method: str, response: Optional[requests.Response] = None,
+              error: Optional[Exception] = None) -> Optional[float]:
+        """
+        Seconds to wait before retry number attempt, None to give up
+
+        Retries are spent from the shared budget.
+        """
+        if attempt >= self.max_retries(method, response, error):
+            return None
+
+        delay = self.backoff(attempt)
+        if response is not None:
+            retry_after = self.retry_after(response)
+            if retry_after is not None:
+                if retry_after > self.max_retry_after:
+                    return None
+                delay = retry_after
+
+        if not self.budget.try_spend():
+            return None
+        return delay
+
+
+_default_policy: Optional[RetryPolicy] = None
+_default_lock = threading.Lock()
+
+
+def get_retry_policy() -> RetryPolicy:
+    """Get the process-wide policy (and retry budget) shared by all sessions"""
+    global _default_policy
+    with _default_lock:
+        if _default_policy is None:
+            _default_policy = RetryPolicy()
+        return _default_policy
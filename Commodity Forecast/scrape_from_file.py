@@ -4,6 +4,7 @@ Works with any URL file (mining.com, capital.com, etc.)
 """
 
 from iron_ore_scraper import IronOreForecastScraper
+from crawl_budget import budget_from_args
 from datetime import datetime
 
 
@@ -151,4 +152,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with budget_from_args():
+        main()
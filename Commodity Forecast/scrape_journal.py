@@ -0,0 +1,128 @@
+"""
+Checkpoint journal for long scrape jobs
+Records every processed URL together with its extracted forecasts, so an
+interrupted job can be restarted and continues where it stopped
+"""
+
+import json
+import os
+import threading
+from typing import Dict, Iterator, List, Optional
+
+from iron_ore_scraper import ForecastData
+from url_canonical import canonicalize_url
+
+
+class ScrapeJournal:
+    """
+    Append-only JSON Lines journal, one line per processed URL:
+
+        {"url": "...", "status": "ok", "rows": [{...ForecastData...}, ...]}
+
+    URLs whose fetch failed are recorded with status "failed" and are tried
+    again on the next run. Each line is flushed as soon as it is written, so a
+    crash or Ctrl-C loses at most the URL that was in progress.
+
+    Only the completed URLs (with the file offset of their line) are kept in
+    memory; their forecast rows are read back from the file when needed.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.completed: Dict[str, int] = {}  # URL -> offset of its latest "ok" line
+        self.lock = threading.Lock()
+
+        cut_off = False
+        if os.path.exists(path):
+            cut_off = self._load()
+
+        self.file = open(path, 'ab')
+        if cut_off:
+            self.file.write(b'\n')  # Don't append to a half-written line
+            self.file.flush()
+        # Lines before this offset were written by earlier runs
+        self.resume_offset = self.file.tell()
+        self.reader = None
+
+    def _load(self) -> bool:
+        """Index earlier records, returns True if the file ends in a cut-off line"""
+        line = b'\n'
+        offset = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                start, offset = offset, offset + len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # Last line cut off by a crash
+
+                if record.get('status') == 'ok':
+                    self.completed[canonicalize_url(record['url'])] = start
+
+        return not line.endswith(b'\n')
+
+    def _read_rows(self, offset: int) -> List[ForecastData]:
+        """Forecast rows of the line at a file offset (call with the lock held)"""
+        if self.reader is None:
+            self.reader = open(self.path, 'rb')
+        self.reader.seek(offset)
+        record = json.loads(self.reader.readline())
+        return [ForecastData(**row) for row in record.get('rows', [])]
+
+    @staticmethod
+    def job_path(url_file: str) -> str:
+        """Journal file belonging to a URL list file (urls.txt -> urls.journal.jsonl)"""
+        return os.path.splitext(url_file)[0] + '.journal.jsonl'
+
+    def is_done(self, url: str) -> bool:
+        return canonicalize_url(url) in self.completed
+
+    def pending(self, urls: List[str]) -> List[str]:
+        """URLs not completed in an earlier run, in their original order"""
+        return [url for url in urls if not self.is_done(url)]
+
+    def forecasts_for(self, url: str) -> List[ForecastData]:
+        """Forecasts recorded for a completed URL"""
+        with self.lock:
+            return self._read_rows(self.completed[canonicalize_url(url)])
+
+    def iter_forecasts(self) -> Iterator[List[ForecastData]]:
+        """Forecasts extracted by earlier runs, one list per URL, read from the file"""
+        with self.lock:
+            offsets = sorted(offset for offset in self.completed.values() if offset < self.resume_offset)
+        for offset in offsets:
+            with self.lock:
+                rows = self._read_rows(offset)
+            yield rows
+
+    def load_forecasts(self) -> List[ForecastData]:
+        """Forecasts extracted by earlier runs"""
+        return [forecast for rows in self.iter_forecasts() for forecast in rows]
+
+    def record(self, url: str, forecasts: Optional[List[ForecastData]]):
+        """Record a processed URL, forecasts=None marks a failed fetch"""
+        url = canonicalize_url(url)
+        status = 'failed' if forecasts is None else 'ok'
+        line = json.dumps({
+            'url': url,
+            'status': status,
+            'rows': [f.to_dict() for f in forecasts or []],
+        })
+
+        with self.lock:
+            offset = self.file.tell()
+            self.file.write(line.encode('utf-8') + b'\n')
+            self.file.flush()
+            if status == 'ok':
+                self.completed[url] = offset
+
+    def close(self):
+        self.file.close()
+        if self.reader is not None:
+            self.reader.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,189 @@
+"""
+Per-URL timing metrics for scrapers and URL finders
+Records where the time goes for every page (rate limit wait, connect, first
+byte, download, parse, extraction) and aggregates it per host
+"""
+
+import json
+import os
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlparse
+
+
+# Timing fields (seconds) aggregated per host
+TIMING_FIELDS = ('rate_wait', 'backoff', 'connect', 'ttfb', 'download', 'parse', 'extract')
+
+
+class ScrapeMetrics:
+    """
+    Per-URL metrics, one JSON line per page in the metrics file:
+
+        {"url", "host", "status", "cache", "bytes", "rate_wait", "backoff",
+         "connect", "ttfb", "download", "parse", "extract", "rows", "retries"}
+
+    `download` is the time from sending the request until the whole body was
+    read (it includes connect and ttfb). Only per-host totals are kept in
+    memory, so long crawls don't grow it. Thread-safe.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: JSON Lines file for the per-URL records (None: aggregates only).
+                  Host aggregates are written next to it as <name>.hosts.json.
+        """
+        self.path = path
+        self.lock = threading.Lock()
+        self.hosts: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self.file = open(path, 'a', encoding='utf-8') if path else None
+
+    @staticmethod
+    def job_path(url_file: str) -> str:
+        """Metrics file belonging to a URL list file (urls.txt -> urls.metrics.jsonl)"""
+        return os.path.splitext(url_file)[0] + '.metrics.jsonl'
+
+    def record(self, url: str, **values):
+        """Record the metrics of one URL (missing timings count as 0)"""
+        host = urlparse(url).netloc
+        record = {'url': url, 'host': host, **values}
+
+        with self.lock:
+            if self.file:
+                self.file.write(json.dumps(record) + '\n')
+                self.file.flush()
+
+            totals = self.hosts[host]
+            totals['pages'] += 1
+            if values.get('status') != 200:
+                totals['failed'] += 1
+            if values.get('cache') == 'hit':
+                totals['cache_hits'] += 1
+            totals['bytes'] += values.get('bytes') or 0
+            totals['rows'] += values.get('rows') or 0
+            totals['retries'] += values.get('retries') or 0
+            for field in TIMING_FIELDS:
+                seconds = values.get(field) or 0.0
+                totals[field] += seconds
+                totals[f'max_{field}'] = max(totals[f'max_{field}'], seconds)
+
+    def host_summary(self) -> Dict[str, Dict[str, float]]:
+        """Per-host aggregates: counts, totals, mean and max of each timing"""
+        with self.lock:
+            summary = {}
+            for host, totals in self.hosts.items():
+                pages = totals['pages']
+                stats = {key: totals[key] for key in ('pages', 'failed', 'cache_hits', 'bytes', 'rows', 'retries')}
+                for field in TIMING_FIELDS:
+                    stats[f'mean_{field}'] = totals[field] / pages
+                    stats[f'max_{field}'] = totals[f'max_{field}']
+                stats['mean_seconds_per_page'] = sum(totals[f] for f in ('rate_wait', 'backoff', 'download', 'parse', 'extract')) / pages
+                stats['download_mb_per_s'] = totals['bytes'] / 1e6 / totals['download'] if totals['download'] else 0.0
+                # The stage this host spends most of its time in
+                stats['slowest_stage'] = max(('rate_wait', 'backoff', 'download', 'parse', 'extract'), key=lambda f: totals[f])
+                summary[host] = stats
+            return summary
+
+    def summary_path(self) -> Optional[str]:
+        return os.path.splitext(self.path)[0] + '.hosts.json' if self.path else None
+
+    def write_summary(self, path: Optional[str] = None):
+        """Write the per-host aggregates as JSON"""
+        path = path or self.summary_path()
+        if not path:
+            return
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.host_summary(), f, indent=2)
+        print(f"Host metrics written to {path}")
+
+    def print_summary(self, top: int = 10):
+        """Print the hosts that took the most time"""
+        summary = self.host_summary()
+        if not summary:
+            return
+
+        print(f"\n{'='*60}")
+        print("Timing by host (mean seconds per page)")
+        print(f"{'='*60}")
+        print(f"{'host':30s} {'pages':>6s} {'wait':>6s} {'ttfb':>6s} {'dl':>6s} {'parse':>6s} {'extr':>6s}  slowest")
+        hosts = sorted(summary.items(), key=lambda item: -item[1]['mean_seconds_per_page'] * item[1]['pages'])
+        for host, stats in hosts[:top]:
+            print(f"{host[:30]:30s} {stats['pages']:6.0f} {stats['mean_rate_wait']:6.2f} {stats['mean_ttfb']:6.2f} "
+                  f"{stats['mean_download']:6.2f} {stats['mean_parse']:6.2f} {stats['mean_extract']:6.2f}  {stats['slowest_stage']}")
+
+    def close(self):
+        if self.file:
+            self.file.close()
+        self.write_summary()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def fetch_timing(response, elapsed: float, size: Optional[int] = None) -> Dict:
+    """
+    Fetch metrics of a response from http_client (response may be None if the
+    request failed), elapsed = seconds the whole session.get() call took,
+    size = bytes read of a streamed response (default: the whole body)
+    """
+    if response is None:
+        return {'status': None, 'download': elapsed}
+
+    timings = getattr(response, 'timings', None) or {}
+    waited = (timings.get('rate_wait') or 0.0) + (timings.get('backoff') or 0.0)
+    return {
+        'status': response.status_code,
+        'bytes': len(response.content) if size is None else size,
+        **timings,
+        'download': max(0.0, elapsed - waited),
+    }
+
+
+def load_host_summary(path: str) -> Dict[str, Dict[str, float]]:
+    """Aggregate an existing metrics file per host (e.g. one from an earlier run)"""
+    metrics = ScrapeMetrics()
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                metrics.record(record.pop('url'), **{k: v for k, v in record.items() if k != 'host'})
+    return metrics.host_summary()
+
+
+def estimate_scrape_seconds(urls: Iterable[str], rate_limiter, concurrent: bool = False,
+                            metrics_file: Optional[str] = None) -> float:
+    """
+    Estimate how long scraping the URLs takes
+
+    Per host, a page takes the mean time measured in an earlier run
+    (metrics_file), but never less than the host's rate limit allows. In
+    concurrent mode hosts run in parallel, so the slowest host decides.
+    """
+    history = load_host_summary(metrics_file) if metrics_file else {}
+
+    pages_per_host: Dict[str, int] = defaultdict(int)
+    for url in urls:
+        pages_per_host[urlparse(url).netloc] += 1
+
+    host_seconds = []
+    for host, pages in pages_per_host.items():
+        rate, _ = rate_limiter.limit_for((urlparse('//' + host).hostname or '').lower())
+        per_page = 1 / rate
+        if host in history:
+            measured = history[host]['mean_seconds_per_page']
+            # Waiting for the rate limiter is already covered by 1/rate
+            measured -= history[host]['mean_rate_wait']
+            per_page = max(per_page, measured)
+        host_seconds.append(pages * per_page)
+
+    if not host_seconds:
+        return 0.0
+    return max(host_seconds) if concurrent else sum(host_seconds)
+
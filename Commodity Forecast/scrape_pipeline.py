@@ -0,0 +1,220 @@
+"""
+Pipelined scraping for large URL lists
+Downloads run on I/O threads, HTML parsing and forecast extraction on a
+process pool, and results are handed to a sink - all connected by bounded
+queues so downloads keep streaming while every core parses
+"""
+
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from crawl_budget import record_yield
+from iron_ore_scraper import IronOreForecastScraper, ForecastData
+
+
+# Marks the end of a stage's input
+_DONE = object()
+
+# Scraper instance of each worker process (holds the compiled patterns)
+_worker_scraper: Optional[IronOreForecastScraper] = None
+
+
+def _init_worker(config: Optional[Dict] = None):
+    global _worker_scraper
+    if config is None:
+        _worker_scraper = IronOreForecastScraper(cache_dir=None)
+    else:
+        _worker_scraper = IronOreForecastScraper.from_extraction_config(config)
+
+
+def extract_forecasts_from_html(url: str, content: bytes, source_name: str) -> List[ForecastData]:
+    """Parse a downloaded page and extract its forecasts (runs in a worker process)"""
+    if _worker_scraper is None:
+        _init_worker()
+
+    document = _worker_scraper.parse_document(content)
+    return _worker_scraper.analyze_document(url, document, source_name)
+
+
+def _extract_timed(url: str, content: bytes, source_name: str) -> Tuple[List[ForecastData], Dict]:
+    """Like extract_forecasts_from_html, also returns the parse/extract timings"""
+    if _worker_scraper is None:
+        _init_worker()
+
+    timing = {}
+    forecasts = _worker_scraper.extract_from_content(url, content, source_name, timing)
+    return forecasts, timing
+
+
+class ScrapePipeline:
+    """
+    Three-stage scrape pipeline: fetch -> parse/extract -> sink
+
+    Each stage only blocks when the queue in front of the next stage is full,
+    so memory stays bounded by queue_size pages.
+    """
+
+    def __init__(self, scraper: IronOreForecastScraper, fetch_workers: int = 8,
+                 parse_workers: Optional[int] = None, queue_size: int = 64,
+                 sink: Optional[Callable[[List[ForecastData]], None]] = None,
+                 journal=None):
+        """
+        Args:
+            scraper: Scraper whose session (cache, rate limiter) is used for fetching
+            fetch_workers: Number of download threads
+            parse_workers: Number of parser processes (default: all cores)
+            queue_size: Maximum pages waiting between two stages
+            sink: Called with the forecasts of each page, default hands them
+                  to scraper.add_forecasts (self.forecasts and/or stream_to file)
+            journal: Optional ScrapeJournal, URLs completed in an earlier run
+                     are not fetched again (their rows go to the sink first)
+        """
+        self.scraper = scraper
+        self.fetch_workers = fetch_workers
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.sink = sink or scraper.add_forecasts
+        self.journal = journal
+
+        self.pages_fetched = 0
+        self.pages_failed = 0
+        self.pages_duplicate = 0
+        self.rows_written = 0
+        self.parse_error: Optional[BaseException] = None
+        self.stats_lock = threading.Lock()
+
+    def _feed(self, urls: Iterable[str], url_queue: queue.Queue):
+        for url in urls:
+            if self.journal and self.journal.is_done(url):
+                self.scraper.seen_urls.add(url)
+                continue
+            if not self.scraper.seen_urls.add(url):
+                continue  # Already scraped under an equivalent URL
+            url_queue.put(url)
+        for _ in range(self.fetch_workers):
+            url_queue.put(_DONE)
+
+    def _fetch(self, url_queue: queue.Queue, page_queue: queue.Queue):
+        while True:
+            url = url_queue.get()
+            if url is _DONE:
+                return
+
+            timing = {}
+            content = self.scraper.fetch_html(url, timing=timing)
+            with self.stats_lock:
+                if content is None:
+                    self.pages_failed += 1
+                else:
+                    self.pages_fetched += 1
+
+            if content is None:
+                self.scraper.seen_urls.discard(url)  # Not scraped, may be tried again
+                self.scraper.record_metrics(url, timing)
+                if self.journal:
+                    self.journal.record(url, None)
+            elif self.scraper.is_duplicate_page(url, content):
+                with self.stats_lock:
+                    self.pages_duplicate += 1
+                self.scraper.record_metrics(url, timing)
+                if self.journal:
+                    self.journal.record(url, [])
+            else:
+                page_queue.put((url, content, timing))
+
+    def _parse(self, page_queue: queue.Queue, result_queue: queue.Queue):
+        # Bound the pages submitted to the pool but not yet written
+        in_flight = threading.BoundedSemaphore(self.queue_size)
+
+        def on_done(future, url, timing):
+            try:
+                forecasts, extract_timing = future.result()
+                timing.update(extract_timing)
+                result_queue.put((url, forecasts, timing))
+            except Exception as e:
+                print(f"Error extracting {url}: {e}")
+            finally:
+                in_flight.release()
+
+        try:
+            with ProcessPoolExecutor(max_workers=self.parse_workers, initializer=_init_worker,
+                                     initargs=(self.scraper.extraction_config(),)) as pool:
+                while True:
+                    item = page_queue.get()
+                    if item is _DONE:
+                        break
+
+                    url, content, timing = item
+                    in_flight.acquire()
+                    future = pool.submit(_extract_timed, url, content, urlparse(url).netloc)
+                    future.add_done_callback(lambda f, url=url, timing=timing: on_done(f, url, timing))
+        except BaseException as e:
+            # E.g. the pool could not start or broke; run() re-raises it
+            self.parse_error = e
+        finally:
+            result_queue.put(_DONE)
+
+    def run(self, urls: Iterable[str]) -> int:
+        """
+        Scrape all URLs through the pipeline
+
+        Results reach the sink in completion order, not input order.
+
+        Returns:
+            Number of forecast rows written to the sink
+        """
+        url_queue = queue.Queue(maxsize=self.queue_size)
+        page_queue = queue.Queue(maxsize=self.queue_size)
+        result_queue = queue.Queue(maxsize=self.queue_size)
+
+        feeder = threading.Thread(target=self._feed, args=(urls, url_queue), daemon=True)
+        fetchers = [
+            threading.Thread(target=self._fetch, args=(url_queue, page_queue), daemon=True)
+            for _ in range(self.fetch_workers)
+        ]
+        parser = threading.Thread(target=self._parse, args=(page_queue, result_queue), daemon=True)
+
+        def close_fetch_stage():
+            for fetcher in fetchers:
+                fetcher.join()
+            page_queue.put(_DONE)
+
+        # The sink runs on the calling thread. Earlier rows go first, before
+        # any fetcher can append to the journal
+        if self.journal:
+            for previous in self.journal.iter_forecasts():
+                self.sink(previous)
+                self.rows_written += len(previous)
+            print(f"Resuming: {len(self.journal.completed)} URLs already done")
+
+        feeder.start()
+        for fetcher in fetchers:
+            fetcher.start()
+        parser.start()
+        threading.Thread(target=close_fetch_stage, daemon=True).start()
+
+        while True:
+            item = result_queue.get()
+            if item is _DONE:
+                break
+
+            url, forecasts, timing = item
+            self.sink(forecasts)
+            self.scraper.record_metrics(url, timing)
+            if self.journal:
+                self.journal.record(url, forecasts)
+            if forecasts:
+                record_yield(url)
+            self.rows_written += len(forecasts)
+            print(f"  {url[:70]}: {len(forecasts)} forecast entries")
+
+        parser.join()
+        if self.parse_error is not None:
+            raise self.parse_error
+        print(f"\nPipeline done: {self.pages_fetched} pages fetched, {self.pages_failed} failed, "
+              f"{self.pages_duplicate} duplicates, {self.rows_written} forecasts")
+        return self.rows_written
@@ -3,10 +3,13 @@ Simple Capital.com Scraper
 Direct approach - just scrape all analysis articles and filter by content
 """
 
-import requests
+from http_client import create_session
+from url_canonical import canonicalize_url
+from keyword_matcher import get_matcher
+from page_probe import probe_page
+from crawl_budget import budget_from_args
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
-import time
 from datetime import datetime
 
 
@@ -23,8 +26,7 @@ def get_all_analysis_articles(base_url, max_pages=100):
 
     all_urls = set()
 
-    session = requests.Session()
-    session.headers.update({
+    session = create_session({
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
     })
 
@@ -64,7 +66,7 @@ def get_all_analysis_articles(base_url, max_pages=100):
                     if 'capital.com' in full_url and '/analysis/' in full_url:
                         # Exclude obvious non-articles
                         if not any(x in full_url for x in ['/login', '/signup', '/account', '#']):
-                            page_article_urls.add(full_url)
+                            page_article_urls.add(canonicalize_url(full_url))
 
                 new_urls = page_article_urls - all_urls
 
@@ -79,8 +81,6 @@ def get_all_analysis_articles(base_url, max_pages=100):
                         print(f"no new articles, stopping")
                         return list(all_urls)
 
-                time.sleep(1)
-
             except Exception as e:
                 print(f"error: {e}")
                 continue
@@ -93,19 +93,24 @@ def get_all_analysis_articles(base_url, max_pages=100):
     return list(all_urls)
 
 
-def filter_for_iron_ore_content(urls):
+def filter_for_iron_ore_content(urls, probe=True):
     """
     Check each URL's content for iron ore keywords
     This is slower but more accurate
+
+    Args:
+        urls: Article URLs to check
+        probe: Check only the title, description and opening text of each page
+               (reads a few KB per page); False downloads and checks the whole page
     """
     print(f"\n{'='*80}")
     print(f"FILTERING {len(urls)} ARTICLES FOR IRON ORE CONTENT")
     print(f"{'='*80}\n")
 
     iron_ore_urls = []
+    bytes_read = 0
 
-    session = requests.Session()
-    session.headers.update({
+    session = create_session({
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
     })
 
@@ -113,21 +118,30 @@ def filter_for_iron_ore_content(urls):
         print(f"[{i}/{len(urls)}] Checking: {url[:70]}... ", end='', flush=True)
 
         try:
-            response = session.get(url, timeout=30)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
+            if probe:
+                head = probe_page(session, url)
+                bytes_read += head.bytes_read
 
-            # Get page text
-            page_text = soup.get_text().lower()
-            title = soup.find('title')
-            title_text = title.get_text().lower() if title else ""
+                # Get the opening text
+                page_text = head.summary.lower()
+                title_text = head.title.lower()
+            else:
+                response = session.get(url, timeout=30)
+                response.raise_for_status()
+                bytes_read += len(response.content)
+                soup = BeautifulSoup(response.content, 'html.parser')
+
+                # Get page text
+                page_text = soup.get_text().lower()
+                title = soup.find('title')
+                title_text = title.get_text().lower() if title else ""
 
             # Check for iron ore content
             has_iron_ore = 'iron ore' in page_text or 'iron-ore' in page_text or 'iron ore' in url.lower()
 
             # Check for forecast content
             forecast_keywords = ['forecast', 'prediction', 'outlook', 'expect', 'price']
-            has_forecast = any(kw in page_text or kw in title_text for kw in forecast_keywords)
+            has_forecast = get_matcher(forecast_keywords).contains_any(page_text, title_text)
 
             if has_iron_ore and has_forecast:
                 iron_ore_urls.append(url)
@@ -140,8 +154,6 @@ def filter_for_iron_ore_content(urls):
                     status.append("no forecast")
                 print(f"✗ ({', '.join(status)})")
 
-            time.sleep(0.5)  # Be polite
-
         except Exception as e:
             print(f"error: {e}")
 
@@ -150,6 +162,7 @@ def filter_for_iron_ore_content(urls):
     print(f"{'='*80}")
     print(f"Total articles checked: {len(urls)}")
     print(f"Iron ore forecast articles found: {len(iron_ore_urls)}")
+    print(f"Downloaded: {bytes_read / 1024:.0f} KB" + (" (page starts only)" if probe else ""))
 
     return iron_ore_urls
 
@@ -285,4 +298,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with budget_from_args():
+        main()
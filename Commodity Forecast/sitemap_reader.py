@@ -0,0 +1,218 @@
+"""
+Streaming sitemap reader
+Walks sitemap.xml files and nested sitemap indexes (plain or .xml.gz) without
+loading them into memory, and filters the page URLs by <lastmod> against
+DATE_RANGE and by a URL keyword prefilter before any page is fetched
+
+Usage:
+    python sitemap_reader.py https://www.mining.com/sitemap_index.xml [iron]
+"""
+
+import gzip
+import io
+import sys
+import xml.etree.ElementTree as ET
+from collections import deque
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional
+
+import requests
+
+from config_urls import DATE_RANGE
+from date_normalizer import normalize_date
+from http_client import create_session
+from keyword_matcher import get_matcher
+
+
+# Sitemap files read at most per walk (an index can list thousands)
+MAX_SITEMAPS = 1000
+
+# Levels of nested sitemap indexes followed
+MAX_INDEX_DEPTH = 3
+
+# Bytes read from the network at a time
+CHUNK_SIZE = 64 * 1024
+
+_GZIP_MAGIC = b'\x1f\x8b'
+
+
+class _ChunkStream(io.RawIOBase):
+    """File-like view of a response's body chunks, read as the parser needs them"""
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self.chunks = chunks
+        self.pending = b''
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self.pending:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                return 0
+            self.pending = chunk
+        size = min(len(buffer), len(self.pending))
+        buffer[:size] = self.pending[:size]
+        self.pending = self.pending[size:]
+        return size
+
+
+class SitemapEntry(NamedTuple):
+    url: str
+    lastmod: Optional[str]
+
+
+def _local_name(tag: str) -> str:
+    """Tag without its XML namespace ('{http://www.sitemaps.org/...}loc' -> 'loc')"""
+    return tag.rpartition('}')[2]
+
+
+class SitemapReader:
+    """
+    Yields the page URLs of a sitemap or sitemap index, filtered on the fly
+
+    Each file is streamed and parsed element by element (iterparse), and
+    gzip bodies are decompressed while they are read, so memory stays small
+    even for sitemaps with tens of thousands of entries. Entries are dropped
+    if their <lastmod> lies outside the year range or their URL fails the
+    filter; child sitemaps last modified before the range are not fetched
+    at all. Entries without <lastmod> are kept.
+    """
+
+    def __init__(self, session: Optional[requests.Session] = None,
+                 date_range: Optional[Dict[str, int]] = None,
+                 url_filter: Optional[Callable[[str], bool]] = None,
+                 max_sitemaps: int = MAX_SITEMAPS):
+        """
+        Args:
+            session: Session used for the sitemap requests (default: a new shared-setup session)
+            date_range: {'start_year': ..., 'end_year': ...} (default: config_urls.DATE_RANGE)
+            url_filter: Keeps a page URL if it returns True (default: keep all)
+            max_sitemaps: Sitemap files read at most
+        """
+        self.session = session or create_session(cache_dir=None)
+        self.date_range = date_range or DATE_RANGE
+        self.url_filter = url_filter
+        self.max_sitemaps = max_sitemaps
+        self.stats = {'sitemaps': 0, 'entries': 0, 'kept': 0, 'too_old': 0, 'too_new': 0,
+                      'filtered': 0, 'sitemaps_skipped': 0, 'errors': 0}
+
+    def year_check(self, lastmod: Optional[str]) -> int:
+        """-1 if lastmod is before the date range, 1 if after it, 0 if inside or unknown"""
+        parsed = normalize_date(lastmod.strip()) if lastmod else None
+        if parsed is None:
+            return 0
+        if parsed.year < self.date_range['start_year']:
+            return -1
+        if parsed.year > self.date_range['end_year']:
+            return 1
+        return 0
+
+    def _open(self, response: requests.Response) -> io.BufferedReader:
+        """Body stream of a sitemap response, gunzipped if it is a .xml.gz file"""
+        # iter_content undoes a Content-Encoding: gzip, a .gz file is still compressed
+        stream = io.BufferedReader(_ChunkStream(response.iter_content(CHUNK_SIZE)))
+        if stream.peek(2)[:2] == _GZIP_MAGIC:
+            return io.BufferedReader(gzip.GzipFile(fileobj=stream))
+        return stream
+
+    def _read(self, sitemap_url: str, children: List[SitemapEntry]) -> Iterator[SitemapEntry]:
+        """Entries of one sitemap file; child sitemaps of an index go to children"""
+        response = self.session.get(sitemap_url, timeout=30, stream=True)
+        try:
+            response.raise_for_status()
+            self.stats['sitemaps'] += 1
+
+            root = None
+            for event, element in ET.iterparse(self._open(response), events=('start', 'end')):
+                if event == 'start':
+                    if root is None:
+                        root = element
+                    continue
+
+                name = _local_name(element.tag)
+                if name not in ('url', 'sitemap'):
+                    continue
+
+                loc = lastmod = None
+                for child in element:
+                    child_name = _local_name(child.tag)
+                    if child_name == 'loc':
+                        loc = (child.text or '').strip()
+                    elif child_name == 'lastmod':
+                        lastmod = (child.text or '').strip()
+
+                if loc:
+                    if name == 'sitemap':
+                        children.append(SitemapEntry(loc, lastmod))
+                    else:
+                        yield SitemapEntry(loc, lastmod)
+
+                # Entries already handled are dropped from the tree
+                root.clear()
+        finally:
+            response.close()
+
+    def iter_entries(self, sitemap_url: str) -> Iterator[SitemapEntry]:
+        """Page entries of a sitemap or sitemap index that pass the filters"""
+        pending = deque([(sitemap_url, 0)])
+        seen = {sitemap_url}
+
+        while pending and self.stats['sitemaps'] < self.max_sitemaps:
+            url, depth = pending.popleft()
+            children: List[SitemapEntry] = []
+            try:
+                for entry in self._read(url, children):
+                    self.stats['entries'] += 1
+                    check = self.year_check(entry.lastmod)
+                    if check < 0:
+                        self.stats['too_old'] += 1
+                    elif check > 0:
+                        self.stats['too_new'] += 1
+                    elif self.url_filter is not None and not self.url_filter(entry.url):
+                        self.stats['filtered'] += 1
+                    else:
+                        self.stats['kept'] += 1
+                        yield entry
+            except (requests.RequestException, ET.ParseError, OSError, EOFError) as e:
+                self.stats['errors'] += 1
+                print(f"  Could not read sitemap {url[:80]}: {e}")
+
+            if depth >= MAX_INDEX_DEPTH:
+                continue
+            for child in children:
+                # A child sitemap last changed before the range only lists older pages
+                if child.url in seen or self.year_check(child.lastmod) < 0:
+                    self.stats['sitemaps_skipped'] += 1
+                    continue
+                seen.add(child.url)
+                pending.append((child.url, depth + 1))
+
+    def iter_urls(self, sitemap_url: str) -> Iterator[str]:
+        """Page URLs of a sitemap or sitemap index that pass the filters"""
+        for entry in self.iter_entries(sitemap_url):
+            yield entry.url
+
+    def print_stats(self):
+        s = self.stats
+        print(f"  Sitemaps read: {s['sitemaps']} ({s['sitemaps_skipped']} skipped by lastmod, {s['errors']} errors)")
+        print(f"  Entries: {s['entries']}, kept {s['kept']} "
+              f"(outside {self.date_range['start_year']}-{self.date_range['end_year']}: "
+              f"{s['too_old'] + s['too_new']}, filtered by URL: {s['filtered']})")
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return
+
+    terms = sys.argv[2:]
+    reader = SitemapReader(url_filter=get_matcher(terms).contains_any if terms else None)
+    print(f"\nReading {sys.argv[1]}")
+    for entry in reader.iter_entries(sys.argv[1]):
+        print(f"{entry.lastmod or '-':25s} {entry.url}")
+    reader.print_stats()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,38 +3,38 @@ SteelOrbis Scraper - Iron Ore Prices, News, and Forecasts
 Same expanded approach as other scrapers
 """
 
-import requests
+from http_client import create_session
+from url_canonical import UrlSet, dedupe_urls
+from link_extractor import LinkRules
+from crawl_budget import budget_allows, budget_from_args, finish_domain
+from category_watermark import open_watermark
+from rate_limiter import get_rate_limiter
+from scrape_metrics import ScrapeMetrics, estimate_scrape_seconds
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
-import time
 from datetime import datetime
 
 
-def extract_article_urls(soup, base_url):
-    """Extract article URLs from SteelOrbis page"""
-    urls = []
+# Links kept by extract_article_urls
+ARTICLE_LINKS = LinkRules(
+    'steelorbis.com',
+    # Include news, prices, markets, statistics
+    include=[
+        '/steel-news/', '/steel-prices/', '/steel-market/', '/statistics/', '/interviews/',
+        '/steel-matters/', '/latest-news/', '/weekly-steel-prices/', '/daily-prices/',
+        '/forecasters/'
+    ],
+    # Exclude non-content pages
+    exclude=[
+        '/login', '/register', '/signup', '/subscribe', '/contact', '/about', '/privacy',
+        '/terms', '/user', '/account', '/profile', '/settings'
+    ],
+)
 
-    for link in soup.find_all('a', href=True):
-        url = urljoin(base_url, link['href'])
 
-        # Filter for SteelOrbis content
-        if 'steelorbis.com' in url and url not in urls:
-            # Exclude non-content pages
-            exclude_patterns = [
-                '/login', '/register', '/signup', '/subscribe',
-                '/contact', '/about', '/privacy', '/terms',
-                '/user', '/account', '/profile', '/settings'
-            ]
-
-            if not any(pattern in url for pattern in exclude_patterns):
-                # Include news, prices, markets, statistics
-                if any(pattern in url for pattern in ['/steel-news/', '/steel-prices/', '/steel-market/',
-                                                      '/statistics/', '/interviews/', '/steel-matters/',
-                                                      '/latest-news/', '/weekly-steel-prices/',
-                                                      '/daily-prices/', '/forecasters/']):
-                    urls.append(url)
-
-    return urls
+def extract_article_urls(page, base_url):
+    """Extract article URLs from SteelOrbis page (raw HTML or a parsed soup)"""
+    return ARTICLE_LINKS.extract(page, base_url)
 
 
 def get_direct_iron_ore_pages():
@@ -96,16 +96,18 @@ def get_direct_iron_ore_pages():
     return iron_ore_pages
 
 
-def search_steelorbis(max_crawl=50):
+def search_steelorbis(max_crawl=50, incremental=False):
     """
     Search SteelOrbis for iron ore content (EXPANDED)
+
+    With incremental=True, news pagination stops at the first page with
+    only URLs from earlier runs (see category_watermark.py)
     """
     print("\n" + "#"*80)
     print("# STEELORBIS IRON ORE SCRAPER (EXPANDED)")
     print("#"*80)
 
-    session = requests.Session()
-    session.headers.update({
+    session = create_session({
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
         'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
         'Accept-Language': 'en-US,en;q=0.9',
@@ -131,9 +133,12 @@ def search_steelorbis(max_crawl=50):
         "https://www.steelorbis.com/steel-news/latest-news/",
         "https://www.steelorbis.com/steel-prices/steel-matters/",
     ]
+    watermark = open_watermark(incremental)
 
     for section in news_sections:
         print(f"\nChecking: {section}")
+        section_links = []
+        complete = True
 
         # Try multiple pages (pagination)
         for page in range(1, 11):  # First 10 pages
@@ -143,6 +148,10 @@ def search_steelorbis(max_crawl=50):
                 # SteelOrbis pagination pattern
                 page_url = f"{section}?page={page}"
 
+            if not budget_allows(page_url):
+                complete = False
+                break
+
             try:
                 response = session.get(page_url, timeout=30)
 
@@ -167,6 +176,11 @@ def search_steelorbis(max_crawl=50):
                         if 'steelorbis.com' in full_url:
                             page_links.append(full_url)
 
+                section_links.extend(page_links)
+                if watermark is not None and watermark.is_known_page(section, page_links):
+                    print(f"  Page {page}: only URLs from earlier runs, stopping")
+                    break
+
                 new_links = [u for u in page_links if u not in all_urls]
 
                 if new_links:
@@ -176,12 +190,14 @@ def search_steelorbis(max_crawl=50):
                     if page > 1:
                         break
 
-                time.sleep(1.5)
-
             except Exception as e:
                 print(f"  Error on page {page}: {e}")
+                complete = False
                 break
 
+        if watermark is not None:
+            watermark.record(section, section_links, complete)
+
     # Strategy 3: Regional markets
     print("\n" + "="*80)
     print("STRATEGY 3: Regional Markets")
@@ -214,7 +230,6 @@ def search_steelorbis(max_crawl=50):
                         all_urls.add(full_url)
 
             print(f"  Total URLs: {len(all_urls)}")
-            time.sleep(1.5)
 
         except Exception as e:
             print(f"  Error: {e}")
@@ -227,11 +242,13 @@ def search_steelorbis(max_crawl=50):
     print(f"\nCrawling {min(len(all_urls), max_crawl)} pages to find sublinks...")
 
     urls_to_crawl = list(all_urls.copy())
-    crawled = set()
+    crawled = UrlSet()
 
     for i, page_url in enumerate(urls_to_crawl[:max_crawl], 1):
         if page_url in crawled:
             continue
+        if not budget_allows(page_url):
+            break
 
         print(f"[{i}/{max_crawl}] Crawling: {page_url[:60]}... ", end='', flush=True)
         crawled.add(page_url)
@@ -267,13 +284,13 @@ def search_steelorbis(max_crawl=50):
             else:
                 print(f"no new links")
 
-            time.sleep(1.5)
-
         except Exception as e:
             print(f"error: {e}")
 
     all_urls = list(all_urls)
 
+    finish_domain('https://www.steelorbis.com/')
+
     print(f"\n{'='*80}")
     print(f"SEARCH COMPLETE")
     print(f"{'='*80}")
@@ -319,12 +336,13 @@ def scrape_steelorbis_urls(url_file):
 
     try:
         with open(url_file, 'r', encoding='utf-8') as f:
-            urls = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+            urls = dedupe_urls(line.strip() for line in f if line.strip() and not line.startswith('#'))
 
-        print(f"\nLoaded {len(urls)} URLs from {url_file}")
+        print(f"\nLoaded {len(urls)} unique URLs from {url_file}")
 
-        # Estimate
-        estimated_time = len(urls) * 1.5
+        # Estimate from the host rate limit and the timings of earlier runs
+        metrics_file = ScrapeMetrics.job_path(url_file)
+        estimated_time = estimate_scrape_seconds(urls, get_rate_limiter(), metrics_file=metrics_file)
         print(f"Estimated time: {estimated_time/60:.0f} minutes ({estimated_time/3600:.1f} hours)")
 
         response = input("\nProceed with scraping? (y/n): ")
@@ -333,17 +351,32 @@ def scrape_steelorbis_urls(url_file):
             return
 
         from iron_ore_scraper import IronOreForecastScraper
+        from scrape_journal import ScrapeJournal
 
         start_time = datetime.now()
-        scraper = IronOreForecastScraper()
+        scraper = IronOreForecastScraper(metrics=ScrapeMetrics(metrics_file))
+        scraper.dedupe()  # The same headline shows up on several listing/category pages
 
-        for i, url in enumerate(urls, 1):
-            print(f"\n[{i}/{len(urls)}] {url[:80]}...")
-            scraper.scrape_url(url)
+        # Progress is journaled, an interrupted run continues where it stopped
+        journal_file = ScrapeJournal.job_path(url_file)
+        with ScrapeJournal(journal_file) as journal, scraper.metrics:
+            print(f"Already done in an earlier run: {len(urls) - len(journal.pending(urls))} URLs")
 
-            if i % 10 == 0:
-                elapsed = (datetime.now() - start_time).total_seconds()
-                print(f"  Progress: {i/len(urls)*100:.1f}% | Forecasts: {len(scraper.forecasts)} | Time: {elapsed/60:.1f}min")
+            try:
+                for i, url in enumerate(urls, 1):
+                    if journal.is_done(url):
+                        scraper.add_forecasts(journal.forecasts_for(url))
+                        continue
+
+                    print(f"\n[{i}/{len(urls)}] {url[:80]}...")
+                    journal.record(url, scraper.scrape_url(url))
+
+                    if i % 10 == 0:
+                        elapsed = (datetime.now() - start_time).total_seconds()
+                        print(f"  Progress: {i/len(urls)*100:.1f}% | Forecasts: {len(scraper.forecasts)} | Time: {elapsed/60:.1f}min")
+            except KeyboardInterrupt:
+                print(f"\nInterrupted - progress saved to {journal_file}, run again to resume")
+                return
 
         elapsed = (datetime.now() - start_time).total_seconds()
 
@@ -396,6 +429,8 @@ def main():
     crawl_pages = input("Max pages to crawl (default 50): ").strip()
     max_crawl = int(crawl_pages) if crawl_pages.isdigit() else 50
 
+    incremental = input("Incremental (stop at pages already seen in earlier runs)? (y/n): ").strip().lower() == 'y'
+
     print("\nWhat would you like to do?")
     print("1. Search for URLs (Step 1)")
     print("2. Scrape existing URL file (Step 2)")
@@ -404,7 +439,7 @@ def main():
     choice = input("\nEnter choice (1-3): ").strip()
 
     if choice == "1":
-        urls, filename = search_steelorbis(max_crawl)
+        urls, filename = search_steelorbis(max_crawl, incremental)
 
         if urls:
             print(f"\n✅ URLs collected: {len(urls)}")
@@ -423,10 +458,11 @@ def main():
             scrape_steelorbis_urls(filename)
 
     elif choice == "3":
-        urls, filename = search_steelorbis(max_crawl)
+        urls, filename = search_steelorbis(max_crawl, incremental)
         if urls:
             scrape_steelorbis_urls(filename)
 
 
 if __name__ == "__main__":
-    main()
+    with budget_from_args():
+        main()
@@ -3,35 +3,33 @@ Trading Economics Scraper - Iron Ore Forecasts
 Same algorithm as mining.com and capital.com
 """
 
-import requests
+from http_client import create_session
+from url_canonical import UrlSet
+from link_extractor import LinkRules
+from crawl_budget import budget_allows, budget_from_args, finish_domain
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
-import time
 from datetime import datetime
 
 
-def extract_article_urls(soup, base_url):
-    """Extract article URLs from Trading Economics page"""
-    urls = []
+# Links kept by extract_article_urls
+ARTICLE_LINKS = LinkRules(
+    'tradingeconomics.com',
+    # Include forecasts, news, articles
+    include=[
+        '/forecast/', '/news/', '/commodity/', '/article/'
+    ],
+    # Exclude non-content pages
+    exclude=[
+        '/login', '/register', '/subscribe', '/pricing', '/contact', '/about', '/api',
+        '/analytics', '/user/', '/account/', '/settings/'
+    ],
+)
 
-    for link in soup.find_all('a', href=True):
-        url = urljoin(base_url, link['href'])
 
-        # Filter for Trading Economics content
-        if 'tradingeconomics.com' in url and url not in urls:
-            # Exclude non-content pages
-            exclude_patterns = [
-                '/login', '/register', '/subscribe', '/pricing',
-                '/contact', '/about', '/api', '/analytics',
-                '/user/', '/account/', '/settings/'
-            ]
-
-            if not any(pattern in url for pattern in exclude_patterns):
-                # Include forecasts, news, articles
-                if any(pattern in url for pattern in ['/forecast/', '/news/', '/commodity/', '/article/']):
-                    urls.append(url)
-
-    return urls
+def extract_article_urls(page, base_url):
+    """Extract article URLs from Trading Economics page (raw HTML or a parsed soup)"""
+    return ARTICLE_LINKS.extract(page, base_url)
 
 
 def get_direct_iron_ore_pages():
@@ -99,8 +97,7 @@ def search_tradingeconomics(max_pages=20):
     print("# TRADING ECONOMICS IRON ORE SCRAPER")
     print("#"*80)
 
-    session = requests.Session()
-    session.headers.update({
+    session = create_session({
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
         'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
         'Accept-Language': 'en-US,en;q=0.9',
@@ -155,7 +152,6 @@ def search_tradingeconomics(max_pages=20):
                         all_urls.add(full_url)
 
             print(f"  Found {len(all_urls)} total URLs so far")
-            time.sleep(2)
 
         except Exception as e:
             print(f"  Error: {e}")
@@ -168,11 +164,13 @@ def search_tradingeconomics(max_pages=20):
     print(f"\nCrawling {len(all_urls)} pages to find sublinks...")
 
     urls_to_crawl = list(all_urls.copy())
-    crawled = set()
+    crawled = UrlSet()
 
     for i, page_url in enumerate(urls_to_crawl[:50], 1):  # Limit to first 50 to avoid too long
         if page_url in crawled:
             continue
+        if not budget_allows(page_url):
+            break
 
         print(f"[{i}/50] Crawling: {page_url[:60]}... ", end='', flush=True)
         crawled.add(page_url)
@@ -207,8 +205,6 @@ def search_tradingeconomics(max_pages=20):
             else:
                 print(f"no new links")
 
-            time.sleep(1.5)
-
         except Exception as e:
             print(f"error: {e}")
 
@@ -234,21 +230,19 @@ def search_tradingeconomics(max_pages=20):
                 print(f"  Error {response.status_code}")
                 continue
 
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            urls = extract_article_urls(soup, search_url)
+            urls = extract_article_urls(response.content, search_url)
             iron_ore_urls = [u for u in urls if 'iron' in u.lower() or 'ore' in u.lower()]
 
             all_urls.update(iron_ore_urls)
             print(f"  Found {len(iron_ore_urls)} iron ore URLs")
 
-            time.sleep(2)
-
         except Exception as e:
             print(f"  Error: {e}")
 
     all_urls = list(all_urls)
 
+    finish_domain('https://tradingeconomics.com/')
+
     print(f"\n{'='*80}")
     print(f"SEARCH COMPLETE")
     print(f"{'='*80}")
@@ -393,4 +387,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with budget_from_args():
+        main()
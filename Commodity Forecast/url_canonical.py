@@ -0,0 +1,278 @@
+"""
+URL canonicalization and deduplication
+Maps the different spellings of a page URL (fragments, tracking parameters,
+parameter order, regional mirrors, rel=canonical) to one key, so every page
+is downloaded and extracted only once
+"""
+
+import hashlib
+import math
+import re
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional
+from urllib.parse import urlsplit, urlunsplit, quote_plus, unquote_plus, urljoin
+
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid',
+    'mc_cid', 'mc_eid', '_ga', '_gl',
+}
+TRACKING_PREFIXES = ('utm_',)
+
+# Sites serving the same article under regional path prefixes, mapped to the
+# prefix that is removed (the article is also served without it)
+LOCALE_MIRRORS = {
+    'capital.com': re.compile(r'^/en-[a-z]{2}(?=/)'),   # /en-au/analysis/... -> /analysis/...
+}
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# From this many expected URLs on, visited_set() returns a BloomUrlSet
+COMPACT_VISITED_THRESHOLD = 100_000
+
+# False positive rate of a BloomUrlSet (share of new URLs wrongly reported as seen)
+DEFAULT_ERROR_RATE = 1e-4
+
+_link_tag = re.compile(rb'<link\b[^>]*>', re.IGNORECASE)
+_rel_canonical = re.compile(rb'''\brel\s*=\s*["']?canonical\b''', re.IGNORECASE)
+_href = re.compile(rb'''\bhref\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))''', re.IGNORECASE)
+_head_end = re.compile(rb'</head\s*>', re.IGNORECASE)
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Canonical form of an http(s) URL
+
+    Lowercases scheme and host, drops default ports, fragments and tracking
+    parameters, sorts the remaining query parameters by name and removes
+    regional mirror prefixes (see LOCALE_MIRRORS). Repeated parameters keep
+    their order and parameters without a value keep their form ('?amp'),
+    both can change what a server returns. Other URLs are returned unchanged.
+
+    This is a dedupe key: fetch the URL as it was given.
+    """
+    url = url.strip()
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.netloc:
+        return url
+
+    host = (parts.hostname or '').rstrip('.')
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = host if port in (None, DEFAULT_PORTS[scheme]) else f"{host}:{port}"
+
+    path = parts.path or '/'
+    for domain, prefix in LOCALE_MIRRORS.items():
+        if host == domain or host.endswith('.' + domain):
+            path = prefix.sub('', path, count=1)
+
+    params = []
+    for param in parts.query.split('&'):
+        if not param:
+            continue
+        key, sep, value = param.partition('=')
+        key = unquote_plus(key)
+        if key.lower() in TRACKING_PARAMS or key.lower().startswith(TRACKING_PREFIXES):
+            continue
+        # Same encoding for every spelling, '=' only where the URL has one
+        params.append((key, quote_plus(key) + sep + quote_plus(unquote_plus(value))))
+    params.sort(key=lambda param: param[0])  # Stable: repeated keys keep their order
+    query = '&'.join(param for _, param in params)
+
+    return urlunsplit((scheme, netloc, path, query, ''))
+
+
+def dedupe_urls(urls: Iterable[str]) -> List[str]:
+    """Canonical form of each URL, duplicates removed, first occurrence order kept"""
+    return list(dict.fromkeys(canonicalize_url(url) for url in urls))
+
+
+def unique_urls(urls: Iterable[str]) -> List[str]:
+    """The URLs as given, without later spellings of a page already listed (order kept)"""
+    first: Dict[str, str] = {}
+    for url in urls:
+        first.setdefault(canonicalize_url(url), url.strip())
+    return list(first.values())
+
+
+def find_canonical_link(content: bytes, base_url: str) -> Optional[str]:
+    """
+    Target of the page's <link rel="canonical">, or None
+
+    Only the <head> is scanned with a regex, so this is cheap enough to run on
+    every download before the page is parsed.
+    """
+    head_end = _head_end.search(content)
+    head = content[:head_end.start()] if head_end else content
+
+    for tag in _link_tag.finditer(head):
+        if not _rel_canonical.search(tag.group(0)):
+            continue
+        href = _href.search(tag.group(0))
+        if href:
+            target = next(group for group in href.groups() if group is not None)
+            target = target.decode('utf-8', errors='replace').strip()
+            if target:
+                return canonicalize_url(urljoin(base_url, target))
+    return None
+
+
+class UrlSet:
+    """
+    Insertion-ordered, thread-safe set of canonical URLs
+
+    Membership tests and adds canonicalize first, so '...?page=5' and
+    '...?page=5#top' are the same entry. Iterating yields canonical URLs.
+    """
+
+    def __init__(self, urls: Iterable[str] = ()):
+        self.urls: Dict[str, None] = {}
+        self.lock = threading.Lock()
+        self.update(urls)
+
+    def add(self, url: str) -> bool:
+        """Add a URL, returns False if it (or an equivalent spelling) was already there"""
+        key = canonicalize_url(url)
+        with self.lock:
+            if key in self.urls:
+                return False
+            self.urls[key] = None
+            return True
+
+    def update(self, urls: Iterable[str]):
+        for url in urls:
+            self.add(url)
+
+    def add_canonical(self, url: str, canonical_url: Optional[str]) -> bool:
+        """
+        Register the rel=canonical target of a downloaded page
+
+        Returns False if the page is a duplicate, i.e. its canonical URL was
+        already seen under another address.
+        """
+        if not canonical_url or canonicalize_url(url) == canonical_url:
+            return True
+        return self.add(canonical_url)
+
+    def discard(self, url: str):
+        """Remove a URL if it is there (e.g. its download failed and may be retried)"""
+        with self.lock:
+            self.urls.pop(canonicalize_url(url), None)
+
+    def __contains__(self, url: str) -> bool:
+        return canonicalize_url(url) in self.urls
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self.urls))
+
+    def __len__(self) -> int:
+        return len(self.urls)
+
+
+def url_fingerprint(url: str) -> int:
+    """64-bit hash of the canonical form of a URL"""
+    digest = hashlib.blake2b(canonicalize_url(url).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+class BloomUrlSet:
+    """
+    Compact, thread-safe set of canonical URLs for very large crawls
+
+    A Bloom filter over 64-bit URL fingerprints: about 3 bytes per URL at
+    the default error rate instead of ~150 for a URL string in a set. The
+    price is a small false positive rate: a URL never added may be reported
+    as seen (and skipped), an added URL is never reported as new. URLs
+    cannot be listed again, so only use it for "already visited?" checks.
+
+    Adding more URLs than the capacity adds a filter twice as large with
+    half the error rate, so the overall rate stays below 2 * error_rate.
+    """
+
+    def __init__(self, capacity: int = COMPACT_VISITED_THRESHOLD, error_rate: float = DEFAULT_ERROR_RATE):
+        """
+        Args:
+            capacity: Expected number of URLs
+            error_rate: Target false positive rate
+        """
+        if capacity < 1 or not 0 < error_rate < 1:
+            raise ValueError(f"Invalid Bloom filter size: capacity={capacity}, error_rate={error_rate}")
+
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.filters: List[List] = []   # [bits, number of bits, number of hashes, capacity, count]
+        self.count = 0
+        self.lock = threading.Lock()
+        self._add_filter(capacity, error_rate / 2)
+
+    def _add_filter(self, capacity: int, error_rate: float):
+        size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        hashes = max(1, round(size / capacity * math.log(2)))
+        self.filters.append([bytearray((size + 7) // 8), size, hashes, capacity, 0])
+
+    @staticmethod
+    def _positions(fingerprint: int, size: int, hashes: int) -> Iterator[int]:
+        # Double hashing: the k bit positions from the two halves of the fingerprint
+        low, high = fingerprint & 0xFFFFFFFF, (fingerprint >> 32) | 1
+        return ((low + i * high) % size for i in range(hashes))
+
+    def _contains(self, fingerprint: int) -> bool:
+        for bits, size, hashes, _, _ in self.filters:
+            if all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(fingerprint, size, hashes)):
+                return True
+        return False
+
+    def add(self, url: str) -> bool:
+        """Add a URL, returns False if it was (probably) already there"""
+        fingerprint = url_fingerprint(url)
+        with self.lock:
+            if self._contains(fingerprint):
+                return False
+
+            current = self.filters[-1]
+            if current[4] >= current[3]:
+                self._add_filter(current[3] * 2, self.error_rate / 2 ** (len(self.filters) + 1))
+                current = self.filters[-1]
+
+            bits, size, hashes = current[0], current[1], current[2]
+            for pos in self._positions(fingerprint, size, hashes):
+                bits[pos >> 3] |= 1 << (pos & 7)
+            current[4] += 1
+            self.count += 1
+            return True
+
+    def update(self, urls: Iterable[str]):
+        for url in urls:
+            self.add(url)
+
+    def add_canonical(self, url: str, canonical_url: Optional[str]) -> bool:
+        """Register the rel=canonical target of a downloaded page (see UrlSet.add_canonical)"""
+        if not canonical_url or canonicalize_url(url) == canonical_url:
+            return True
+        return self.add(canonical_url)
+
+    def __contains__(self, url: str) -> bool:
+        fingerprint = url_fingerprint(url)
+        with self.lock:
+            return self._contains(fingerprint)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def nbytes(self) -> int:
+        """Memory used by the bit arrays"""
+        return sum(len(f[0]) for f in self.filters)
+
+
+def visited_set(expected_urls: Optional[int] = None, error_rate: float = DEFAULT_ERROR_RATE):
+    """
+    Set for "already visited?" checks: an exact UrlSet, or a BloomUrlSet when
+    at least COMPACT_VISITED_THRESHOLD URLs are expected
+    """
+    if expected_urls is not None and expected_urls >= COMPACT_VISITED_THRESHOLD:
+        return BloomUrlSet(expected_urls, error_rate)
+    return UrlSet()
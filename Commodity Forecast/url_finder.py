@@ -3,23 +3,52 @@ URL Finder - Discovers iron ore forecast articles on websites
 Helps you find relevant article URLs to scrape
 """
 
-import requests
+from http_client import create_session, DEFAULT_CACHE_DIR
+from url_canonical import canonicalize_url, visited_set
+from scrape_metrics import ScrapeMetrics, fetch_timing
+from keyword_matcher import get_matcher
+from crawl_frontier import CrawlFrontier, PersistentFrontier
+from link_extractor import resolve_links
+from page_probe import PageHead, probe_page
+from crawl_budget import budget_allows, budget_from_args, record_yield
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urlparse
 import re
-from typing import List, Set
 import time
+from typing import Dict, List, Optional, Union
 
 
 class IronOreArticleFinder:
     """Finds iron ore forecast articles on websites"""
 
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
+    # A relevant page mentions iron ore and one of the forecast terms
+    IRON_ORE_TERMS = ['iron ore', 'iron-ore', 'ironore']
+    FORECAST_TERMS = [
+        'forecast', 'outlook', 'prediction', 'expect',
+        'plummeted', 'raise', 'fall', 'increasing',
+        'long-term', 'short-term'
+    ]
+
+    # Crawl priority of a link: bonuses for an article URL and for iron ore /
+    # forecast terms in the link text or URL, a penalty per level of depth
+    LINK_SCORES = {'article_url': 2.0, 'iron_ore_terms': 3.0, 'forecast_terms': 1.0, 'depth': -1.0}
+
+    def __init__(self, cache_dir: Optional[str] = DEFAULT_CACHE_DIR, offline: bool = False,
+                 metrics: Optional[ScrapeMetrics] = None, expected_urls: Optional[int] = None):
+        """
+        Args:
+            cache_dir: Directory of the on-disk response cache (None disables it)
+            offline: Reuse cached pages without revalidating them
+            metrics: Records per-URL timings (see scrape_metrics.py)
+            expected_urls: Number of URLs the finder will visit; from
+                           COMPACT_VISITED_THRESHOLD on, visited URLs are kept in a
+                           compact Bloom filter (see url_canonical.BloomUrlSet)
+        """
+        self.metrics = metrics
+        self.session = create_session({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
-        self.visited_urls: Set[str] = set()
+        }, cache_dir=cache_dir, offline=offline)
+        self.visited_urls = visited_set(expected_urls)  # Canonical URLs, see url_canonical.py
         self.found_articles: List[dict] = []
 
         # Keywords that indicate iron ore forecast content
@@ -44,57 +73,121 @@ class IronOreArticleFinder:
             r'/[a-z\-]+-[a-z\-]+-[a-z\-]+/',  # Matches URLs with multiple hyphens (common article pattern)
         ]
 
-    def fetch_page(self, url: str) -> BeautifulSoup:
-        """Fetch and parse a webpage"""
+    def fetch_page(self, url: str, timing: Optional[Dict] = None) -> BeautifulSoup:
+        """Fetch and parse a webpage, adding fetch/parse metrics to timing if given"""
+        start = time.perf_counter()
+        response = None
         try:
             response = self.session.get(url, timeout=30)
+            fetched = time.perf_counter()
             response.raise_for_status()
-            return BeautifulSoup(response.content, 'html.parser')
+            soup = BeautifulSoup(response.content, 'html.parser')
+            if timing is not None:
+                timing.update(fetch_timing(response, fetched - start), parse=time.perf_counter() - fetched)
+            return soup
+        except Exception as e:
+            print(f"Error fetching {url}: {e}")
+            if timing is not None:
+                timing.update(fetch_timing(response, time.perf_counter() - start))
+            return None
+
+    def probe_page(self, url: str, timing: Optional[Dict] = None) -> Optional[PageHead]:
+        """Read only the start of a page (title, description, opening text), see page_probe"""
+        start = time.perf_counter()
+        try:
+            return probe_page(self.session, url, timing=timing)
         except Exception as e:
             print(f"Error fetching {url}: {e}")
+            if timing is not None and 'status' not in timing:
+                timing.update(fetch_timing(None, time.perf_counter() - start))
             return None
 
+    def record_metrics(self, url: str, timing: Dict):
+        if self.metrics is not None:
+            self.metrics.record(url, **timing)
+
     def is_article_url(self, url: str) -> bool:
         """Check if URL looks like an article"""
         return any(re.search(pattern, url, re.IGNORECASE) for pattern in self.article_patterns)
 
     def contains_iron_ore_keywords(self, text: str, url: str) -> bool:
         """Check if text or URL contains iron ore keywords"""
-        text_lower = text.lower()
-        url_lower = url.lower()
-
         # Must contain "iron ore" or "iron-ore"
-        iron_ore_found = any(keyword in text_lower or keyword in url_lower
-                            for keyword in ['iron ore', 'iron-ore', 'ironore'])
-
-        if not iron_ore_found:
+        if not get_matcher(self.IRON_ORE_TERMS).contains_any(text, url):
             return False
 
         # Should also contain forecast-related keywords
-        forecast_found = any(keyword in text_lower or keyword in url_lower
-                           for keyword in [
-                               'forecast', 'outlook', 'prediction', 'expect',
-                               'plummeted', 'raise', 'fall', 'increasing',
-                               'long-term', 'short-term'
-                           ])
-
-        return iron_ore_found and forecast_found
+        return get_matcher(self.FORECAST_TERMS).contains_any(text, url)
 
     def extract_links(self, soup: BeautifulSoup, base_url: str) -> List[str]:
         """Extract all links from a page"""
-        links = []
-        for link in soup.find_all('a', href=True):
-            url = urljoin(base_url, link['href'])
-
-            # Keep only same domain
-            if urlparse(url).netloc == urlparse(base_url).netloc:
-                # Remove fragments and queries for deduplication
-                url_clean = url.split('#')[0].split('?')[0]
-                links.append(url_clean)
+        return list(self.extract_link_texts(soup, base_url))
+
+    def extract_link_texts(self, soup: BeautifulSoup, base_url: str) -> Dict[str, str]:
+        """Same-domain links of a page with their anchor text (texts of repeated links joined)"""
+        links: Dict[str, str] = {}
+        base = urlparse(base_url)
+        origin = f"{base.scheme}://{base.netloc}"
+        anchors = soup.find_all('a', href=True)
+        for link, url in zip(anchors, resolve_links((a['href'] for a in anchors), base_url)):
+            # Keep only same domain (checked on the string for links under the page's origin)
+            same_origin = url.startswith(origin) and url[len(origin):len(origin) + 1] in ('', '/', '?', '#')
+            if same_origin or urlparse(url).netloc == base.netloc:
+                # Remove queries (and fragments, locale mirrors...) for deduplication
+                url = canonicalize_url(url.split('?')[0])
+                text = link.get_text(' ', strip=True)
+                links[url] = f"{links[url]} {text}" if url in links else text
+
+        return links
+
+    def score_link(self, url: str, anchor_text: str, depth: int, article_bonus: bool = True) -> float:
+        """Crawl priority of a link (see LINK_SCORES), higher is crawled first"""
+        scores = self.LINK_SCORES
+        score = scores['depth'] * depth
+        if article_bonus and self.is_article_url(url):
+            score += scores['article_url']
+        if get_matcher(self.IRON_ORE_TERMS).contains_any(anchor_text, url):
+            score += scores['iron_ore_terms']
+        if get_matcher(self.FORECAST_TERMS).contains_any(anchor_text, url):
+            score += scores['forecast_terms']
+        return score
+
+    def queue_links(self, frontier: Union[CrawlFrontier, PersistentFrontier], soup: BeautifulSoup,
+                    page_url: str, depth: int, article_bonus: bool = True) -> int:
+        """Queue the links of a page at depth + 1, returns the number of new links"""
+        queued = 0
+        for link, anchor_text in self.extract_link_texts(soup, page_url).items():
+            if link in self.visited_urls:
+                continue
+            if frontier.push(link, depth + 1, self.score_link(link, anchor_text, depth + 1, article_bonus)):
+                queued += 1
+        return queued
 
-        return list(set(links))
+    def open_frontier(self, start_url: str, frontier_path: Optional[str] = None):
+        """
+        Frontier of a search, with the start URL queued
 
-    def search_website(self, start_url: str, max_pages: int = 50, max_depth: int = 2):
+        With a path, the frontier is a SQLite file (see PersistentFrontier): a
+        stopped search resumes where it stopped, and articles found by earlier
+        runs or other processes are added to found_articles.
+        """
+        if not frontier_path:
+            frontier = CrawlFrontier()
+        else:
+            frontier = PersistentFrontier(frontier_path)
+            known = {article['url'] for article in self.found_articles}
+            resumed = [a for a in frontier.results('article') if a['url'] not in known]
+            self.found_articles.extend(resumed)
+            counts = frontier.counts()
+            if counts:
+                print(f"Resuming frontier {frontier_path}: {counts.get('queued', 0)} queued, "
+                      f"{sum(counts.values()) - counts.get('queued', 0)} crawled, {len(resumed)} articles")
+
+        frontier.push(start_url, 0)
+        return frontier
+
+    def search_website(self, start_url: str, max_pages: int = 50, max_depth: int = 2,
+                       frontier_path: Optional[str] = None):
         """
         Search a website for iron ore forecast articles
 
@@ -102,57 +195,72 @@ class IronOreArticleFinder:
             start_url: Starting URL (e.g., homepage or news section)
             max_pages: Maximum number of pages to crawl
             max_depth: How many levels deep to crawl (1 = only start page, 2 = start + linked pages)
+            frontier_path: Optional SQLite file keeping the frontier, to pause and resume
+                           the search or run it in several processes
         """
         print(f"\nSearching {start_url} for iron ore forecast articles...")
         print(f"Max pages: {max_pages}, Max depth: {max_depth}")
 
-        to_visit = [(start_url, 0)]  # (url, depth)
+        # Most promising links first (see score_link), every URL queued once
+        to_visit = self.open_frontier(start_url, frontier_path)
         pages_crawled = 0
 
-        while to_visit and pages_crawled < max_pages:
-            current_url, depth = to_visit.pop(0)
-
-            # Skip if already visited or too deep
-            if current_url in self.visited_urls or depth > max_depth:
-                continue
-
-            self.visited_urls.add(current_url)
-            pages_crawled += 1
-
-            print(f"[{pages_crawled}/{max_pages}] Crawling: {current_url[:80]}...")
-
-            soup = self.fetch_page(current_url)
-            if not soup:
-                continue
-
-            # Check if this page itself is an article about iron ore
-            page_text = soup.get_text(separator=' ', strip=True)[:1000]  # First 1000 chars
-            title = soup.find('title')
-            title_text = title.get_text() if title else ""
-
-            if self.is_article_url(current_url) and self.contains_iron_ore_keywords(page_text + title_text, current_url):
-                article_info = {
-                    'url': current_url,
-                    'title': title_text.strip(),
-                    'found_at_depth': depth
-                }
-                self.found_articles.append(article_info)
-                print(f"  ✓ Found article: {title_text[:60]}...")
-
-            # Extract and queue more links if not at max depth
-            if depth < max_depth:
-                links = self.extract_links(soup, current_url)
-
-                # Prioritize article-looking URLs
-                article_links = [l for l in links if self.is_article_url(l)]
-                other_links = [l for l in links if not self.is_article_url(l)]
-
-                # Add article links first, then others
-                for link in article_links + other_links:
-                    if link not in self.visited_urls:
-                        to_visit.append((link, depth + 1))
-
-            time.sleep(1)  # Be polite
+        try:
+            while pages_crawled < max_pages:
+                item = to_visit.pop()
+                if item is None:
+                    break
+                current_url, depth, _ = item
+
+                # Skip if already visited or too deep
+                if current_url in self.visited_urls or depth > max_depth:
+                    to_visit.complete(current_url, 'skipped')
+                    continue
+
+                # Stop when the crawl budget of the site (or the run) is used up;
+                # the URL stays queued in a persistent frontier
+                if not budget_allows(current_url):
+                    break
+
+                self.visited_urls.add(current_url)
+                pages_crawled += 1
+
+                print(f"[{pages_crawled}/{max_pages}] Crawling: {current_url[:80]}...")
+
+                timing = {}
+                soup = self.fetch_page(current_url, timing)
+                if not soup:
+                    self.record_metrics(current_url, timing)
+                    to_visit.complete(current_url, 'failed')
+                    continue
+                start = time.perf_counter()
+                articles_before = len(self.found_articles)
+
+                # Check if this page itself is an article about iron ore
+                page_text = soup.get_text(separator=' ', strip=True)[:1000]  # First 1000 chars
+                title = soup.find('title')
+                title_text = title.get_text() if title else ""
+
+                article_info = None
+                if self.is_article_url(current_url) and self.contains_iron_ore_keywords(page_text + title_text, current_url):
+                    article_info = {
+                        'url': current_url,
+                        'title': title_text.strip(),
+                        'found_at_depth': depth
+                    }
+                    self.found_articles.append(article_info)
+                    record_yield(current_url)
+                    print(f"  ✓ Found article: {title_text[:60]}...")
+
+                # Extract and queue more links if not at max depth
+                if depth < max_depth:
+                    self.queue_links(to_visit, soup, current_url, depth)
+                to_visit.complete(current_url, 'article' if article_info else 'done', article_info)
+
+                timing.update(extract=time.perf_counter() - start, rows=len(self.found_articles) - articles_before)
+                self.record_metrics(current_url, timing)
+        finally:
+            to_visit.close()
 
         print(f"\nSearch complete!")
         print(f"Pages crawled: {pages_crawled}")
@@ -160,7 +268,7 @@ class IronOreArticleFinder:
 
         return self.found_articles
 
-    def search_news_section(self, news_url: str, max_articles: int = 30):
+    def search_news_section(self, news_url: str, max_articles: int = 30, probe: bool = True):
         """
         Search a news/articles section for iron ore content
         Better for sites with news archives
@@ -168,6 +276,8 @@ class IronOreArticleFinder:
         Args:
             news_url: URL to news section (e.g., https://www.mining.com/news/)
             max_articles: Maximum articles to check
+            probe: Decide from the start of each page (title, description and
+                   opening text) instead of downloading it completely
         """
         print(f"\nSearching news section: {news_url}")
 
@@ -185,19 +295,33 @@ class IronOreArticleFinder:
         for url in article_links:
             if url in self.visited_urls:
                 continue
+            if not budget_allows(url):
+                break
 
             self.visited_urls.add(url)
             checked += 1
 
             print(f"[{checked}/{len(article_links)}] Checking: {url[:80]}...")
 
-            soup = self.fetch_page(url)
-            if not soup:
-                continue
-
-            page_text = soup.get_text(separator=' ', strip=True)[:1000]
-            title = soup.find('title')
-            title_text = title.get_text() if title else ""
+            timing = {}
+            if probe:
+                head = self.probe_page(url, timing)
+                if not head:
+                    self.record_metrics(url, timing)
+                    continue
+                start = time.perf_counter()
+                page_text = head.summary
+                title_text = head.title
+            else:
+                soup = self.fetch_page(url, timing)
+                if not soup:
+                    self.record_metrics(url, timing)
+                    continue
+                start = time.perf_counter()
+                page_text = soup.get_text(separator=' ', strip=True)[:1000]
+                title = soup.find('title')
+                title_text = title.get_text() if title else ""
+            articles_before = len(self.found_articles)
 
             if self.contains_iron_ore_keywords(page_text + title_text, url):
                 article_info = {
@@ -206,9 +330,11 @@ class IronOreArticleFinder:
                     'source': news_url
                 }
                 self.found_articles.append(article_info)
+                record_yield(url)
                 print(f"  ✓ Found: {title_text[:60]}...")
 
-            time.sleep(1)
+            timing.update(extract=time.perf_counter() - start, rows=len(self.found_articles) - articles_before)
+            self.record_metrics(url, timing)
 
         print(f"\nFound {len(self.found_articles)} relevant articles")
         return self.found_articles
@@ -275,4 +401,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with budget_from_args():
+        main()